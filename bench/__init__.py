@@ -0,0 +1,6 @@
+"""
+Benchmarks for the local server.
+
+`python -m bench.run` generates a synthetic place (see `bench.place`), drives the
+server endpoints through Flask's test client and writes the results as JSON.
+"""
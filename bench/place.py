@@ -0,0 +1,278 @@
+"""
+Synthetic place generator.
+
+Produces payloads shaped like the plugin's `buildPayload` (scripts) and
+`buildInstancesPayload` (UI trees), deterministically from a seed.
+"""
+
+import json
+import random
+import zlib
+
+SCRIPT_SERVICES = ["ServerScriptService", "ReplicatedStorage", "StarterPlayer", "Workspace"]
+SCRIPT_CLASSES = ["ModuleScript", "Script", "LocalScript"]
+UI_CLASSES = ["Frame", "TextLabel", "TextButton", "ImageLabel", "ScrollingFrame"]
+
+_SOURCE_LINES = [
+	'local ReplicatedStorage = game:GetService("ReplicatedStorage")',
+	"local Shared = require(ReplicatedStorage:WaitForChild(\"Shared\"))",
+	"local function update{n}(dt)",
+	"\tlocal value = Shared.compute({n}, dt) * 0.{n}",
+	"\tif value > {n} then",
+	"\t\treturn value - {n}",
+	"\tend",
+	"\treturn value",
+	"end",
+	"-- {n}: keep this in sync with the server config",
+	"",
+]
+
+
+def make_source(rng: random.Random, size: int) -> str:
+	"""Lua-looking text of roughly `size` bytes."""
+	lines: list[str] = []
+	used = 0
+	while used < size:
+		line = rng.choice(_SOURCE_LINES).replace("{n}", str(rng.randint(0, 9999)))
+		lines.append(line)
+		used += len(line) + 1
+	return "\n".join(lines) + "\n"
+
+
+def _studio_float(rng: random.Random) -> float:
+	# Studio serializes float32 values, so most numbers carry long tails (0.11372549019607843).
+	return rng.randint(0, 255) / 255
+
+
+def _ui_props(rng: random.Random, class_name: str, name: str) -> dict:
+	props = {
+		"Name": name,
+		"Visible": rng.random() > 0.1,
+		"ZIndex": rng.randint(1, 5),
+		"AnchorPoint": {"__t": "Vector2", "x": _studio_float(rng), "y": _studio_float(rng)},
+		"Position": {
+			"__t": "UDim2",
+			"xScale": _studio_float(rng),
+			"xOffset": rng.randint(-200, 200),
+			"yScale": _studio_float(rng),
+			"yOffset": rng.randint(-200, 200),
+		},
+		"Size": {
+			"__t": "UDim2",
+			"xScale": _studio_float(rng),
+			"xOffset": rng.randint(0, 400),
+			"yScale": _studio_float(rng),
+			"yOffset": rng.randint(0, 400),
+		},
+		"BackgroundColor3": {"__t": "Color3", "r": _studio_float(rng), "g": _studio_float(rng), "b": _studio_float(rng)},
+		"BackgroundTransparency": _studio_float(rng),
+	}
+	if class_name in ("TextLabel", "TextButton"):
+		props["Text"] = f"Label {rng.randint(0, 9999)}"
+		props["TextSize"] = rng.randint(8, 48)
+		props["Font"] = {"__t": "Enum", "enumType": "Font", "name": "Gotham"}
+	if class_name == "ImageLabel":
+		props["Image"] = f"rbxassetid://{rng.randint(1, 10**10)}"
+	return props
+
+
+def make_ui_tree(rng: random.Random, class_name: str, name: str, depth: int, breadth: int, dup_ratio: float) -> dict:
+	children = []
+	if depth > 0:
+		count = rng.randint(max(1, breadth // 2), breadth)
+		names: list[str] = []
+		for i in range(count):
+			if names and rng.random() < dup_ratio:
+				child_name = rng.choice(names)
+			else:
+				child_name = f"Item{i}"
+				names.append(child_name)
+			child_class = rng.choice(UI_CLASSES)
+			children.append(make_ui_tree(rng, child_class, child_name, depth - 1, breadth, dup_ratio))
+	# Roblox's JSONEncode turns an empty attribute table into `[]`.
+	attrs = {"Tag": f"t{rng.randint(0, 99)}", "Weight": _studio_float(rng)} if rng.random() < 0.2 else []
+	return {
+		"class": class_name,
+		"name": name,
+		"props": _ui_props(rng, class_name, name),
+		"attrs": attrs,
+		"children": children,
+	}
+
+
+def generate_place(
+	scripts: int = 1000,
+	source_bytes: int = 2000,
+	depth: int = 4,
+	dup_ratio: float = 0.05,
+	ui_roots: int = 20,
+	ui_depth: int = 3,
+	ui_breadth: int = 6,
+	output_folder: str = "bench_output",
+	seed: int = 1,
+) -> tuple[dict, dict]:
+	"""
+	Return `(scripts_payload, instances_payload)`.
+
+	- `depth`: max folder nesting below the service; about 10% of scripts are nested
+	  under another ModuleScript so parent-script folders are exercised.
+	- `dup_ratio`: chance that a script or UI child reuses a sibling's name.
+	- `source_bytes`: average source size (sizes vary between 0.25x and 1.75x).
+	"""
+	rng = random.Random(seed)
+	items_by_service: dict[str, list[dict]] = {service: [] for service in SCRIPT_SERVICES}
+	modules: list[list[str]] = []
+	names_by_parent: dict[tuple[str, ...], list[str]] = {}
+
+	for i in range(scripts):
+		if modules and rng.random() < 0.1:
+			parent = list(rng.choice(modules))
+		else:
+			service = rng.choice(SCRIPT_SERVICES)
+			parent = [service] + [f"Folder{rng.randint(0, 3)}" for _ in range(rng.randint(0, depth))]
+		siblings = names_by_parent.setdefault(tuple(parent), [])
+		if siblings and rng.random() < dup_ratio:
+			name = rng.choice(siblings)
+		else:
+			name = f"Script{i}"
+			siblings.append(name)
+		class_name = rng.choice(SCRIPT_CLASSES)
+		path = parent + [name]
+		if class_name == "ModuleScript":
+			modules.append(path)
+		size = int(source_bytes * rng.uniform(0.25, 1.75))
+		items_by_service[path[0]].append(
+			{"path": path, "name": name, "class": class_name, "source": make_source(rng, size)}
+		)
+
+	flags = {"scripts": True, "ui": ui_roots > 0, "objects": False}
+	scripts_payload = {
+		"studioPlaceName": "BenchPlace",
+		"generatedAt": 0,
+		"outputFolderName": output_folder,
+		"exportFlags": flags,
+		"roots": [{"service": service, "items": items} for service, items in items_by_service.items() if items],
+	}
+
+	instances = []
+	for i in range(ui_roots):
+		name = f"Gui{i}"
+		instances.append(
+			{
+				"service": "StarterGui",
+				"path": ["StarterGui", name],
+				"name": name,
+				"class": "ScreenGui",
+				"mode": "ui",
+				"tree": make_ui_tree(rng, "ScreenGui", name, ui_depth, ui_breadth, dup_ratio),
+			}
+		)
+	instances_payload = {
+		"studioPlaceName": "BenchPlace",
+		"generatedAt": 0,
+		"outputFolderName": output_folder,
+		"exportFlags": flags,
+		"instances": instances,
+	}
+	return scripts_payload, instances_payload
+
+
+def mutate_place(scripts_payload: dict, instances_payload: dict, ratio: float, seed: int = 2) -> tuple[dict, dict]:
+	"""Copies of the payloads with about `ratio` of scripts/UI roots edited (as if changed in Studio)."""
+	rng = random.Random(seed)
+	roots = []
+	for root in scripts_payload["roots"]:
+		items = []
+		for item in root["items"]:
+			if rng.random() < ratio:
+				item = dict(item, source=item["source"] + f"-- edited {rng.randint(0, 9999)}\n")
+			items.append(item)
+		roots.append({"service": root["service"], "items": items})
+	instances = []
+	for inst in instances_payload["instances"]:
+		if rng.random() < ratio:
+			tree = dict(inst["tree"], props=dict(inst["tree"]["props"], Visible=not inst["tree"]["props"]["Visible"]))
+			inst = dict(inst, tree=tree)
+		instances.append(inst)
+	return dict(scripts_payload, roots=roots), dict(instances_payload, instances=instances)
+
+
+def chunk_scripts(payload: dict, max_bytes: int = 900 * 1024) -> list[dict]:
+	"""Split like the plugin's `postInChunks` (by encoded size, uncompressed)."""
+	chunks: list[dict] = []
+	current: dict[str, list[dict]] = {}
+	used = 0
+	for root in payload["roots"]:
+		for item in root["items"]:
+			size = len(json.dumps(item))
+			if current and used + size > max_bytes:
+				chunks.append(_scripts_chunk(payload, current))
+				current, used = {}, 0
+			current.setdefault(root["service"], []).append(item)
+			used += size
+	if current:
+		chunks.append(_scripts_chunk(payload, current))
+	return chunks
+
+
+def _scripts_chunk(payload: dict, by_service: dict[str, list[dict]]) -> dict:
+	return dict(payload, roots=[{"service": service, "items": items} for service, items in by_service.items()])
+
+
+def source_digest(source: str) -> str:
+	"""The plugin's `sourceDigest`: "<length>:<crc32>" of the LF-normalized UTF-8 source."""
+	data = source.replace("\r\n", "\n").encode("utf-8")
+	return f"{len(data)}:{zlib.crc32(data) & 0xFFFFFFFF:08x}"
+
+
+def digest_scripts(payload: dict) -> dict:
+	"""Like the plugin's `buildDigestPayload`: ids "1", "2", ... in flattened order, no sources."""
+	roots = []
+	next_id = 0
+	for root in payload["roots"]:
+		items = []
+		for item in root["items"]:
+			next_id += 1
+			items.append(
+				{
+					"id": str(next_id),
+					"path": item["path"],
+					"name": item["name"],
+					"class": item["class"],
+					"digest": source_digest(item["source"]),
+				}
+			)
+		roots.append({"service": root["service"], "items": items})
+	return dict({k: v for k, v in payload.items() if k != "roots"}, mode="digest", roots=roots)
+
+
+def filter_scripts(payload: dict, ids: list) -> dict:
+	"""The scripts of `payload` whose `digest_scripts` id is in `ids` (the plugin's `filterPayloadByIds`)."""
+	wanted = {str(i) for i in ids}
+	roots = []
+	next_id = 0
+	for root in payload["roots"]:
+		items = []
+		for item in root["items"]:
+			next_id += 1
+			if str(next_id) in wanted:
+				items.append(item)
+		if items:
+			roots.append({"service": root["service"], "items": items})
+	return dict(payload, roots=roots)
+
+
+def chunk_instances(payload: dict, max_bytes: int = 900 * 1024) -> list[dict]:
+	chunks: list[dict] = []
+	current: list[dict] = []
+	used = 0
+	for inst in payload["instances"]:
+		size = len(json.dumps(inst))
+		if current and used + size > max_bytes:
+			chunks.append(dict(payload, instances=current))
+			current, used = [], 0
+		current.append(inst)
+		used += size
+	if current:
+		chunks.append(dict(payload, instances=current))
+	return chunks
@@ -0,0 +1,298 @@
+"""
+Run the server benchmarks.
+
+    python -m bench.run --scripts 6000 --ui-roots 50 --output bench_results.json
+    python -m bench.run --baseline bench_results.json   # compare against an earlier run
+
+Each scenario posts plugin-shaped, plugin-sized chunks through Flask's test client
+and reports throughput, p50/p99 request latency and peak traced memory.
+"""
+
+import argparse
+import json
+import math
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from .place import chunk_instances, chunk_scripts, digest_scripts, filter_scripts, generate_place, mutate_place
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_server_app():
+	sys.path.insert(0, str(REPO_ROOT / "server"))
+	import app as server_app
+
+	return server_app
+
+
+def percentile(values: list[float], pct: float) -> float:
+	if not values:
+		return 0.0
+	ordered = sorted(values)
+	rank = max(1, math.ceil(pct / 100 * len(ordered)))
+	return ordered[rank - 1]
+
+
+def git_revision() -> str:
+	try:
+		out = subprocess.run(
+			["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10
+		)
+	except (OSError, subprocess.SubprocessError):
+		return ""
+	return out.stdout.strip()
+
+
+class Scenario:
+	"""
+	One benchmarked endpoint. `prepare()` runs before every pass (untimed) and returns
+	the request bodies to post; `items` is how many scripts/instances one pass covers.
+	`run(client, bodies, latencies)` replaces posting each body to `endpoint` for
+	multi-request flows.
+	"""
+
+	def __init__(
+		self,
+		name: str,
+		endpoint: str,
+		items: int,
+		prepare: Callable[[], list[dict]],
+		run: Optional[Callable[[object, list[dict], list[float]], None]] = None,
+	):
+		self.name = name
+		self.endpoint = endpoint
+		self.items = items
+		self.prepare = prepare
+		self.run = run
+
+
+def timed_post(client, endpoint: str, body: dict, latencies: list[float]) -> dict:
+	t0 = time.perf_counter()
+	resp = client.post(endpoint, json=body)
+	latencies.append(time.perf_counter() - t0)
+	if resp.status_code != 200:
+		raise RuntimeError(f"{endpoint} returned {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+	return resp.get_json()
+
+
+def run_session_export(client, bodies: list[dict], latencies: list[float]) -> None:
+	"""
+	The plugin's negotiated export: `/export_begin`, script digests to `/upload_plan`,
+	`/upload` of the needed scripts only, `/export_commit`. Each body is
+	`{"plan": digest chunks, "source": full scripts payload}`.
+	"""
+	for body in bodies:
+		source = body["source"]
+		begin = timed_post(
+			client,
+			"/export_begin",
+			{"outputFolderName": source["outputFolderName"], "exportFlags": source.get("exportFlags")},
+			latencies,
+		)
+		session_id = begin["sessionId"]
+		need: list = []
+		for chunk in body["plan"]:
+			need.extend(timed_post(client, "/upload_plan", dict(chunk, sessionId=session_id), latencies)["need"])
+		if need:
+			for chunk in chunk_scripts(filter_scripts(source, need)):
+				timed_post(client, "/upload", dict(chunk, sessionId=session_id), latencies)
+		timed_post(client, "/export_commit", {"sessionId": session_id}, latencies)
+
+
+def run_pass(client, scenario: Scenario) -> tuple[list[float], float]:
+	bodies = scenario.prepare()
+	latencies: list[float] = []
+	start = time.perf_counter()
+	if scenario.run is not None:
+		scenario.run(client, bodies, latencies)
+	else:
+		for body in bodies:
+			timed_post(client, scenario.endpoint, body, latencies)
+	return latencies, time.perf_counter() - start
+
+
+def run_scenario(client, scenario: Scenario, repeat: int) -> dict:
+	latencies: list[float] = []
+	total_seconds = 0.0
+	for _ in range(repeat):
+		pass_latencies, seconds = run_pass(client, scenario)
+		latencies.extend(pass_latencies)
+		total_seconds += seconds
+
+	# Separate pass under tracemalloc: it slows allocation-heavy code down too much to time.
+	tracemalloc.start()
+	try:
+		run_pass(client, scenario)
+		_current, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+
+	return {
+		"endpoint": scenario.endpoint,
+		"passes": repeat,
+		"requests": len(latencies),
+		"items": scenario.items,
+		"seconds": round(total_seconds, 6),
+		"itemsPerSecond": round(scenario.items * repeat / total_seconds, 2) if total_seconds > 0 else None,
+		"requestsPerSecond": round(len(latencies) / total_seconds, 2) if total_seconds > 0 else None,
+		"p50Ms": round(percentile(latencies, 50) * 1000, 3),
+		"p99Ms": round(percentile(latencies, 99) * 1000, 3),
+		"peakTracedBytes": peak,
+	}
+
+
+def build_scenarios(args, work_dir: Path) -> tuple[list[Scenario], list[dict], list[dict]]:
+	"""Scenarios plus the chunks of the untimed export that diff/index scenarios run against."""
+	scripts_payload, instances_payload = generate_place(
+		scripts=args.scripts,
+		source_bytes=args.source_bytes,
+		depth=args.depth,
+		dup_ratio=args.dup_ratio,
+		ui_roots=args.ui_roots,
+		ui_depth=args.ui_depth,
+		ui_breadth=args.ui_breadth,
+		seed=args.seed,
+	)
+	edited_scripts, edited_instances = mutate_place(scripts_payload, instances_payload, args.modified_ratio, args.seed + 1)
+	script_count = sum(len(root["items"]) for root in scripts_payload["roots"])
+	instance_count = len(instances_payload["instances"])
+
+	export_dir = work_dir / "export"
+
+	# One output dir per scenario, emptied (or reset) before each pass: every new dir would
+	# start another local index watcher.
+	def empty_dir(name: str) -> str:
+		path = work_dir / name
+		shutil.rmtree(path, ignore_errors=True)
+		return str(path)
+
+	def copy_of_export(name: str) -> str:
+		path = work_dir / name
+		shutil.rmtree(path, ignore_errors=True)
+		shutil.copytree(export_dir, path)
+		return str(path)
+
+	def with_output(chunks: list[dict], output: str) -> list[dict]:
+		return [dict(chunk, outputFolderName=output) for chunk in chunks]
+
+	script_chunks = chunk_scripts(scripts_payload)
+	instance_chunks = chunk_instances(instances_payload)
+	edited_script_chunks = with_output(chunk_scripts(edited_scripts), str(export_dir))
+	edited_instance_chunks = with_output(chunk_instances(edited_instances), str(export_dir))
+	edited_digest_chunks = chunk_scripts(digest_scripts(edited_scripts))
+
+	def session_bodies() -> list[dict]:
+		output = copy_of_export("upload_session")
+		return [{"plan": with_output(edited_digest_chunks, output), "source": dict(edited_scripts, outputFolderName=output)}]
+	services = sorted({root["service"] for root in scripts_payload["roots"]} | {"StarterGui"})
+	index_body = {"outputFolderName": str(export_dir), "services": services}
+
+	scenarios = [
+		Scenario("upload", "/upload", script_count, lambda: with_output(script_chunks, empty_dir("upload"))),
+		Scenario(
+			"upload_instances",
+			"/upload_instances",
+			instance_count,
+			lambda: with_output(instance_chunks, empty_dir("upload_instances")),
+		),
+		# Re-export of the edited place over the first export: only the edited scripts are sent.
+		Scenario(
+			"upload_session",
+			"/upload_plan",
+			script_count,
+			session_bodies,
+			run=run_session_export,
+		),
+		Scenario("diff", "/diff", script_count, lambda: edited_script_chunks),
+		Scenario("diff_digest", "/diff", script_count, lambda: with_output(edited_digest_chunks, str(export_dir))),
+		Scenario("diff_instances", "/diff_instances", instance_count, lambda: edited_instance_chunks),
+		Scenario("local_index", "/local_index", script_count, lambda: [index_body]),
+		Scenario("local_index_instances", "/local_index_instances", instance_count, lambda: [index_body]),
+	]
+	return scenarios, with_output(script_chunks, str(export_dir)), with_output(instance_chunks, str(export_dir))
+
+
+def print_table(results: dict, baseline: dict) -> None:
+	header = f"{'scenario':<24}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>10}"
+	if baseline:
+		header += f"{'p50 vs base':>14}"
+	print(header)
+	for name, res in results.items():
+		line = (
+			f"{name:<24}{res['itemsPerSecond'] or 0:>12.1f}{res['p50Ms']:>10.2f}"
+			f"{res['p99Ms']:>10.2f}{res['peakTracedBytes'] / 1e6:>10.1f}"
+		)
+		base = baseline.get(name)
+		if base and base.get("p50Ms"):
+			change = (res["p50Ms"] - base["p50Ms"]) / base["p50Ms"] * 100
+			line += f"{change:>+13.1f}%"
+		print(line)
+
+
+def main(argv=None) -> int:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--scripts", type=int, default=1000)
+	parser.add_argument("--source-bytes", type=int, default=2000)
+	parser.add_argument("--depth", type=int, default=4)
+	parser.add_argument("--dup-ratio", type=float, default=0.05)
+	parser.add_argument("--ui-roots", type=int, default=20)
+	parser.add_argument("--ui-depth", type=int, default=3)
+	parser.add_argument("--ui-breadth", type=int, default=6)
+	parser.add_argument("--modified-ratio", type=float, default=0.1, help="share of scripts/UI roots edited for the diff runs")
+	parser.add_argument("--seed", type=int, default=1)
+	parser.add_argument("--repeat", type=int, default=3, help="timed passes per scenario")
+	parser.add_argument("--only", action="append", help="run only these scenarios (repeatable)")
+	parser.add_argument("--output", default="bench_results.json")
+	parser.add_argument("--baseline", help="earlier results JSON to compare p50 latency against")
+	args = parser.parse_args(argv)
+
+	server_app = load_server_app()
+	client = server_app.app.test_client()
+
+	work_dir = Path(tempfile.mkdtemp(prefix="rbx-parse-bench-"))
+	try:
+		scenarios, export_scripts, export_instances = build_scenarios(args, work_dir)
+		# diff/index scenarios compare against one untimed export.
+		for body in export_scripts:
+			client.post("/upload", json=body)
+		for body in export_instances:
+			client.post("/upload_instances", json=body)
+
+		results: dict[str, dict] = {}
+		for scenario in scenarios:
+			if args.only and scenario.name not in args.only:
+				continue
+			results[scenario.name] = run_scenario(client, scenario, max(1, args.repeat))
+	finally:
+		shutil.rmtree(work_dir, ignore_errors=True)
+
+	report = {
+		"version": 1,
+		"createdAt": datetime.now(timezone.utc).isoformat(),
+		"gitRevision": git_revision(),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "only")},
+		"results": results,
+	}
+	Path(args.output).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+	baseline: dict = {}
+	if args.baseline:
+		baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")).get("results", {})
+	print_table(results, baseline)
+	print(f"Saved {args.output}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -58,6 +58,11 @@ pcall(function()
 	ScriptEditorService = game:GetService("ScriptEditorService")
 end)
 
+local EncodingService = nil
+pcall(function()
+	EncodingService = game:GetService("EncodingService")
+end)
+
 local function wireButtonStyle(btn, baseColor, hoverColor, downColor, baseScale, hoverScale, downScale)
 	if not btn then
 		return
@@ -785,11 +790,30 @@ diffTabs.BackgroundTransparency = 1
 diffTabs.ZIndex = 51
 diffTabs.Parent = diffModal
 
+local diffChangesTab = Instance.new("TextButton")
+diffChangesTab.Name = "ChangesTab"
+diffChangesTab.Size = UDim2.new(1 / 3, -8, 1, 0)
+diffChangesTab.Position = UDim2.fromOffset(0, 0)
+diffChangesTab.BackgroundColor3 = ACCENT
+diffChangesTab.BorderSizePixel = 0
+diffChangesTab.AutoButtonColor = false
+diffChangesTab.Text = "Changes"
+diffChangesTab.TextColor3 = TEXT
+diffChangesTab.Font = Enum.Font.GothamBold
+diffChangesTab.TextSize = 14
+diffChangesTab.ZIndex = 52
+diffChangesTab.Parent = diffTabs
+
+local diffChangesCorner = Instance.new("UICorner")
+diffChangesCorner.CornerRadius = UDim.new(0, 8)
+diffChangesCorner.Parent = diffChangesTab
+wireButtonStyle(diffChangesTab, nil, nil, nil, 1, 1.02, 0.99)
+
 local diffLocalTab = Instance.new("TextButton")
 diffLocalTab.Name = "LocalTab"
-diffLocalTab.Size = UDim2.new(0.5, -6, 1, 0)
-diffLocalTab.Position = UDim2.fromOffset(0, 0)
-diffLocalTab.BackgroundColor3 = ACCENT
+diffLocalTab.Size = UDim2.new(1 / 3, -8, 1, 0)
+diffLocalTab.Position = UDim2.new(1 / 3, 4, 0, 0)
+diffLocalTab.BackgroundColor3 = DARK_BG
 diffLocalTab.BorderSizePixel = 0
 diffLocalTab.AutoButtonColor = false
 diffLocalTab.Text = "Local"
@@ -806,8 +830,8 @@ wireButtonStyle(diffLocalTab, nil, nil, nil, 1, 1.02, 0.99)
 
 local diffStudioTab = Instance.new("TextButton")
 diffStudioTab.Name = "StudioTab"
-diffStudioTab.Size = UDim2.new(0.5, -6, 1, 0)
-diffStudioTab.Position = UDim2.new(0.5, 6, 0, 0)
+diffStudioTab.Size = UDim2.new(1 / 3, -8, 1, 0)
+diffStudioTab.Position = UDim2.new(2 / 3, 8, 0, 0)
 diffStudioTab.BackgroundColor3 = DARK_BG
 diffStudioTab.BorderSizePixel = 0
 diffStudioTab.AutoButtonColor = false
@@ -1366,6 +1390,44 @@ local function prettyJson(value, depth)
 	return "{\n" .. table.concat(parts, ",\n") .. "\n" .. indent .. "}"
 end
 
+local function sortedKeys(map)
+	local keys = {}
+	for k in pairs(map) do
+		table.insert(keys, tostring(k))
+	end
+	table.sort(keys)
+	return keys
+end
+
+local function formatInstancePatch(patch)
+	local lines = {}
+	for _, op in ipairs(patch or {}) do
+		local segs = {}
+		for _, step in ipairs(op.path or {}) do
+			table.insert(segs, tostring(step[2]))
+		end
+		local where = (#segs > 0) and table.concat(segs, "/") or "(root)"
+		if type(op.name) == "string" then
+			table.insert(lines, where .. ": rename -> " .. op.name)
+		end
+		local props = type(op.props) == "table" and op.props or {}
+		for _, k in ipairs(sortedKeys(props)) do
+			table.insert(lines, where .. ": " .. k .. " = " .. prettyJson(props[k]))
+		end
+		local attrs = type(op.attrs) == "table" and op.attrs or {}
+		for _, k in ipairs(sortedKeys(attrs)) do
+			table.insert(lines, where .. ": @" .. k .. " = " .. prettyJson(attrs[k]))
+		end
+		for _, child in ipairs(op.added or {}) do
+			table.insert(lines, where .. ": + " .. tostring(child.name) .. " [" .. tostring(child.class) .. "]")
+		end
+		for _, step in ipairs(op.removed or {}) do
+			table.insert(lines, where .. ": - " .. tostring(step[2]) .. " [" .. tostring(step[1]) .. "]")
+		end
+	end
+	return table.concat(lines, "\n")
+end
+
 local function collectGuiRoots(root)
 	local roots = {}
 	for _, desc in ipairs(root:GetDescendants()) do
@@ -1596,6 +1658,16 @@ local function readAttributes(instance)
 	return attrs
 end
 
+-- Children an instance tree of this mode leaves out besides scripts (nil: none).
+local function instanceChildFilter(mode)
+	if mode == "object" then
+		return function(child)
+			return not isUiInstance(child)
+		end
+	end
+	return nil
+end
+
 local function serializeInstanceTree(instance, mode, childFilter)
 	local node = {
 		class = instance.ClassName,
@@ -1605,19 +1677,30 @@ local function serializeInstanceTree(instance, mode, childFilter)
 		children = {},
 	}
 
-	for _, child in ipairs(instance:GetChildren()) do
+	local ordered = {}
+	for index, child in ipairs(instance:GetChildren()) do
 		if isLuaScript(child) then
 			continue
 		end
 		if childFilter and not childFilter(child) then
 			continue
 		end
-		table.insert(node.children, serializeInstanceTree(child, mode, childFilter))
+		table.insert(ordered, { index = index, node = serializeInstanceTree(child, mode, childFilter) })
 	end
 
-	table.sort(node.children, function(a, b)
-		return string.lower(tostring(a.name)) < string.lower(tostring(b.name))
+	-- Keep GetChildren order among equal names: the server addresses duplicate
+	-- (class,name) siblings by their occurrence in this order (see applyInstancePatch).
+	table.sort(ordered, function(a, b)
+		local an = string.lower(tostring(a.node.name))
+		local bn = string.lower(tostring(b.node.name))
+		if an ~= bn then
+			return an < bn
+		end
+		return a.index < b.index
 	end)
+	for _, entry in ipairs(ordered) do
+		table.insert(node.children, entry.node)
+	end
 
 	return node
 end
@@ -1709,7 +1792,7 @@ local function buildInstancesPayload()
 						name = rootInst.Name,
 						class = rootInst.ClassName,
 						mode = "ui",
-						tree = serializeInstanceTree(rootInst, "ui", nil),
+						tree = serializeInstanceTree(rootInst, "ui", instanceChildFilter("ui")),
 					})
 				end
 			end
@@ -1721,9 +1804,7 @@ local function buildInstancesPayload()
 						name = rootInst.Name,
 						class = rootInst.ClassName,
 						mode = "object",
-						tree = serializeInstanceTree(rootInst, "object", function(child)
-							return not isUiInstance(child)
-						end),
+						tree = serializeInstanceTree(rootInst, "object", instanceChildFilter("object")),
 					})
 				end
 			end
@@ -1743,11 +1824,35 @@ local function buildInstancesPayload()
 	}
 end
 
-local function postToServer(url, payload)
-	local json = HttpService:JSONEncode(payload)
+-- Request bodies are sent gzip-compressed when the server advertises support for it
+-- (see `ensureServerCapabilities`); the server decodes `Content-Encoding: gzip`.
+local serverAcceptsGzip = false
+local MAX_RAW_CHUNK_BYTES = 8 * 1024 * 1024
+
+-- Bytes a JSON body will occupy on the wire. With compression on this is an estimate of the
+-- gzip size (measured with Zstd, plus a safety margin); otherwise the raw length.
+local function measureBodyBytes(json)
+	local n = #json
+	if n > MAX_RAW_CHUNK_BYTES then
+		return math.huge
+	end
+	if not serverAcceptsGzip or not EncodingService then
+		return n
+	end
+	local ok, compressedSize = pcall(function()
+		local compressed = EncodingService:CompressBuffer(buffer.fromstring(json), Enum.CompressionAlgorithm.Zstd, 1)
+		return buffer.len(compressed)
+	end)
+	if not ok or type(compressedSize) ~= "number" then
+		return n
+	end
+	return math.min(n, math.ceil(compressedSize * 1.15) + 64)
+end
+
+local function postBodyToServer(url, json)
 	local response
 	local ok, err = pcall(function()
-		response = HttpService:PostAsync(url, json, Enum.HttpContentType.ApplicationJson, false)
+		response = HttpService:PostAsync(url, json, Enum.HttpContentType.ApplicationJson, serverAcceptsGzip)
 	end)
 	if not ok then
 		return false, tostring(err)
@@ -1755,8 +1860,12 @@ local function postToServer(url, payload)
 	return true, response
 end
 
-local function postToServerJson(url, payload)
-	local ok, resp = postToServer(url, payload)
+local function postToServer(url, payload)
+	return postBodyToServer(url, HttpService:JSONEncode(payload))
+end
+
+local function postBodyToServerJson(url, json)
+	local ok, resp = postBodyToServer(url, json)
 	if not ok then
 		return false, resp
 	end
@@ -1769,6 +1878,10 @@ local function postToServerJson(url, payload)
 	return true, decoded
 end
 
+local function postToServerJson(url, payload)
+	return postBodyToServerJson(url, HttpService:JSONEncode(payload))
+end
+
 local function deriveEndpointUrl(url, endpoint)
 	local replaced
 	local newUrl, n = string.gsub(url, "/upload/?$", "/" .. endpoint)
@@ -1779,6 +1892,55 @@ local function deriveEndpointUrl(url, endpoint)
 	return newUrl
 end
 
+local capabilitiesUrl = nil
+local serverFeatures = {}
+
+-- Asks the server which optional protocol features it supports (once per server URL).
+local function ensureServerCapabilities()
+	local url = deriveEndpointUrl(serverInput.Text, "capabilities")
+	if capabilitiesUrl == url then
+		return
+	end
+	serverAcceptsGzip = false
+	serverFeatures = {}
+	local ok, resp = pcall(function()
+		return HttpService:PostAsync(url, "{}", Enum.HttpContentType.ApplicationJson, false)
+	end)
+	if ok then
+		local decodedOk, data = pcall(function()
+			return HttpService:JSONDecode(resp)
+		end)
+		if decodedOk and type(data) == "table" and type(data.features) == "table" then
+			for _, feature in ipairs(data.features) do
+				serverFeatures[feature] = true
+				if feature == "gzip" then
+					serverAcceptsGzip = true
+				end
+			end
+		end
+	end
+	capabilitiesUrl = url
+end
+
+-- Servers with a `paths` map resolve exported files without our Studio paths; they are
+-- only sent when the server reports unmapped files it can't place (`needsStudioPaths`).
+local function postLocalIndex(url, selectedServices, studioPaths)
+	local body = {
+		outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
+		services = selectedServices,
+	}
+	if not serverFeatures["path_map"] then
+		body.studioPaths = studioPaths
+		return postToServerJson(url, body)
+	end
+	local ok, data = postToServerJson(url, body)
+	if ok and type(data) == "table" and data.needsStudioPaths == true and studioPaths then
+		body.studioPaths = studioPaths
+		return postToServerJson(url, body)
+	end
+	return ok, data
+end
+
 local function getLocalIndex(studioPayload)
 	local url = deriveEndpointUrl(serverInput.Text, "local_index")
 	local selectedServices = {}
@@ -1803,11 +1965,7 @@ local function getLocalIndex(studioPayload)
 		end
 	end
 
-	return postToServerJson(url, {
-		outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
-		services = selectedServices,
-		studioPaths = studioPaths,
-	})
+	return postLocalIndex(url, selectedServices, studioPaths)
 end
 
 local function getLocalIndexInstances(studioPayload)
@@ -1830,11 +1988,7 @@ local function getLocalIndexInstances(studioPayload)
 		end
 	end
 
-	return postToServerJson(url, {
-		outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
-		services = selectedServices,
-		studioPaths = studioPaths,
-	})
+	return postLocalIndex(url, selectedServices, studioPaths)
 end
 
 local function getLocalSource(relPath)
@@ -1853,6 +2007,211 @@ local function getLocalInstance(relPath)
 	})
 end
 
+local function getLocalMany(relPaths, onFile)
+	if not serverFeatures["local_get_many"] then
+		-- Older servers: one /local_get(_instances) request per file, failures reported per file as below.
+		for _, relPath in ipairs(relPaths) do
+			local ok, data
+			if string.sub(string.lower(relPath), -4) == ".lua" then
+				ok, data = getLocalSource(relPath)
+			else
+				ok, data = getLocalInstance(relPath)
+			end
+			if ok and type(data) == "table" then
+				data.relPath = relPath
+				onFile(data)
+			else
+				onFile({ ok = false, relPath = relPath, error = tostring(data) })
+			end
+		end
+		return true, nil
+	end
+
+	local url = deriveEndpointUrl(serverInput.Text, "local_get_many")
+	local cursor = 0
+	while cursor ~= nil do
+		local ok, data = postToServerJson(url, {
+			outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
+			relPaths = relPaths,
+			cursor = cursor,
+			maxBytes = 900 * 1024,
+		})
+		if not ok then
+			return false, data
+		end
+		if type(data) ~= "table" or data.ok ~= true then
+			return false, "Failed: invalid response"
+		end
+		for _, file in ipairs(data.files or {}) do
+			onFile(file)
+		end
+		cursor = data.nextCursor
+		if type(cursor) ~= "number" then
+			cursor = nil
+		end
+	end
+	return true, nil
+end
+
+-- Reassembles a file over the server's 900KB read limit from /local_get_range pieces.
+-- The first piece's sha256 pins the file version; if a later piece fails (the file
+-- changed in between), the download starts over.
+local function getLocalRanged(relPath, kind)
+	local url = deriveEndpointUrl(serverInput.Text, "local_get_range")
+	local lastErr = nil
+	for _ = 1, 3 do
+		local parts = {}
+		local offset = 0
+		local sha = nil
+		while offset ~= nil do
+			local ok, data = postToServerJson(url, {
+				outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
+				relPath = relPath,
+				kind = kind,
+				offset = offset,
+				sha256 = sha,
+				maxBytes = 900 * 1024,
+			})
+			if not ok or type(data) ~= "table" or data.ok ~= true then
+				lastErr = ok and "invalid response" or tostring(data)
+				break
+			end
+			sha = data.sha256
+			table.insert(parts, data.data or "")
+			offset = data.next
+			if type(offset) ~= "number" then
+				offset = nil
+			end
+		end
+		if offset == nil and lastErr == nil then
+			return true, table.concat(parts)
+		end
+		if sha == nil then
+			-- Failed on the first piece: not a version change, so retrying won't help.
+			break
+		end
+		lastErr = nil
+	end
+	return false, lastErr or "File kept changing during download"
+end
+
+-- Fills `localSource` / `localTree` for entries that don't have them yet, a few requests per group.
+local function prefetchLocalEntries(entries)
+	local relPaths = {}
+	local byRelPath = {}
+	for _, entry in ipairs(entries) do
+		if entry.localSource == nil and type(entry.relPath) == "string" and byRelPath[entry.relPath] == nil then
+			byRelPath[entry.relPath] = entry
+			table.insert(relPaths, entry.relPath)
+		end
+	end
+	if #relPaths == 0 then
+		return true, nil
+	end
+	local ranged = {}
+	local ok, err = getLocalMany(relPaths, function(file)
+		local entry = byRelPath[file.relPath]
+		if not entry then
+			return
+		end
+		if file.ok ~= true then
+			if file.ranged == true then
+				table.insert(ranged, entry)
+			end
+			return
+		end
+		if entry.entryType == "instance" then
+			entry.localTree = file.tree
+			entry.localSource = file.pretty or (file.tree and prettyJson(file.tree)) or ""
+		else
+			entry.localSource = file.source or ""
+		end
+	end)
+	if not ok then
+		return false, err
+	end
+
+	-- Files over the read limit come back as `ranged` and are fetched piece by piece.
+	for _, entry in ipairs(ranged) do
+		entry.large = true
+		local okText, text = getLocalRanged(entry.relPath, entry.entryType == "instance" and "instance" or "script")
+		if okText and entry.entryType == "instance" then
+			local decodedOk, tree = pcall(function()
+				return HttpService:JSONDecode(text)
+			end)
+			if decodedOk and type(tree) == "table" then
+				entry.localTree = tree
+				entry.localSource = text
+			end
+		elseif okText then
+			entry.localSource = text
+		end
+	end
+	return true, nil
+end
+
+-- Asks the server for the line diff (Studio -> local) of one review entry and formats it
+-- as unified hunks. Only the changed regions (plus context) are downloaded.
+local function fetchDiffHunksText(entry)
+	local url = deriveEndpointUrl(serverInput.Text, "diff_hunks")
+	local payload = {
+		outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
+		relPath = entry.relPath,
+		maxBytes = 900 * 1024,
+	}
+	if entry.entryType == "instance" then
+		payload.kind = "instance"
+		payload.studioTree = entry.studioTree
+	else
+		payload.studioSource = entry.studioSource or ""
+	end
+	local ok, data = postToServerJson(url, payload)
+	if not ok then
+		return false, tostring(data)
+	end
+	if type(data) ~= "table" or data.ok ~= true then
+		return false, (type(data) == "table" and data.error) or "invalid response"
+	end
+	local hunks = data.hunks or {}
+	if #hunks == 0 then
+		return true, "No line changes."
+	end
+	local parts = {}
+	for _, hunk in ipairs(hunks) do
+		table.insert(parts, string.format("@@ -%d,%d +%d,%d @@", hunk.oldStart, hunk.oldLines, hunk.newStart, hunk.newLines))
+		table.insert(parts, table.concat(hunk.lines or {}, "\n"))
+	end
+	if data.truncated then
+		table.insert(parts, "[More changes not shown]")
+	end
+	return true, table.concat(parts, "\n")
+end
+
+local function beginExportSession(basePayload)
+	local url = deriveEndpointUrl(serverInput.Text, "export_begin")
+	local ok, data = postToServerJson(url, {
+		studioPlaceName = basePayload.studioPlaceName,
+		outputFolderName = basePayload.outputFolderName,
+		exportFlags = basePayload.exportFlags,
+	})
+	-- Older servers don't know sessions; fall back to per-chunk manifest writes.
+	if ok and type(data) == "table" and data.ok == true and type(data.sessionId) == "string" then
+		return data.sessionId
+	end
+	return nil
+end
+
+local function commitExportSession(sessionId, outputFolderName)
+	if not sessionId then
+		return true, nil
+	end
+	local url = deriveEndpointUrl(serverInput.Text, "export_commit")
+	return postToServerJson(url, {
+		outputFolderName = outputFolderName,
+		sessionId = sessionId,
+	})
+end
+
 local function makeKey(service, pathSegments)
 	if type(pathSegments) ~= "table" then
 		return tostring(service) .. "|"
@@ -1875,6 +2234,89 @@ local function buildStudioSourceMap(payload)
 	return map
 end
 
+-- Digests for the hash-first /diff protocol ("<length>:<crc32>", matches server `digest_bytes`).
+local CRC32_TABLE = {}
+for i = 0, 255 do
+	local c = i
+	for _ = 1, 8 do
+		if bit32.band(c, 1) == 1 then
+			c = bit32.bxor(0xEDB88320, bit32.rshift(c, 1))
+		else
+			c = bit32.rshift(c, 1)
+		end
+	end
+	CRC32_TABLE[i] = c
+end
+
+local function sourceDigest(source)
+	local text = string.gsub(tostring(source or ""), "\r\n", "\n")
+	local n = #text
+	local crc = 0xFFFFFFFF
+	local i = 1
+	while i <= n do
+		local j = math.min(i + 4095, n)
+		local bytes = { string.byte(text, i, j) }
+		for k = 1, #bytes do
+			crc = bit32.bxor(bit32.rshift(crc, 8), CRC32_TABLE[bit32.band(bit32.bxor(crc, bytes[k]), 0xFF)])
+		end
+		i = j + 1
+	end
+	return string.format("%d:%08x", n, bit32.bxor(crc, 0xFFFFFFFF))
+end
+
+-- Items get ids in flattened order ("1", "2", ...) so `/upload_plan` answers can be
+-- mapped back onto the full payload (see `filterPayloadByIds`).
+local function buildDigestPayload(payload)
+	local roots = {}
+	local nextId = 0
+	for _, root in ipairs(payload.roots or {}) do
+		local items = {}
+		for _, item in ipairs(root.items or {}) do
+			nextId += 1
+			table.insert(items, {
+				id = tostring(nextId),
+				path = item.path,
+				name = item.name,
+				class = item.class,
+				digest = sourceDigest(item.source),
+			})
+		end
+		table.insert(roots, { service = root.service, items = items })
+	end
+	return {
+		studioPlaceName = payload.studioPlaceName,
+		generatedAt = payload.generatedAt,
+		outputFolderName = payload.outputFolderName,
+		exportFlags = payload.exportFlags,
+		mode = "digest",
+		roots = roots,
+	}
+end
+
+local function filterPayloadByIds(payload, ids)
+	local wanted = {}
+	for _, id in ipairs(ids) do
+		wanted[tostring(id)] = true
+	end
+	local roots = {}
+	local nextId = 0
+	for _, root in ipairs(payload.roots or {}) do
+		local items = {}
+		for _, item in ipairs(root.items or {}) do
+			nextId += 1
+			if wanted[tostring(nextId)] then
+				table.insert(items, item)
+			end
+		end
+		if #items > 0 then
+			table.insert(roots, { service = root.service, items = items })
+		end
+	end
+	local filtered = table.clone(payload)
+	filtered.roots = roots
+	return filtered
+end
+
 -- Chunking support to avoid HttpService 1MB limit
 local function flattenEntries(roots)
     local entries = {}
@@ -1886,30 +2328,199 @@ local function flattenEntries(roots)
     return entries
 end
 
-local function groupEntriesByService(entries)
-    local byService = {}
-    for _, e in ipairs(entries) do
-        local list = byService[e.service]
-        if not list then
-            list = {}
-            byService[e.service] = list
-        end
-        table.insert(list, e.item)
-    end
-    local roots = {}
-    for service, items in pairs(byService) do
-        table.insert(roots, { service = service, items = items })
-    end
-    return roots
+local function buildChunkHeader(basePayload)
+	return {
+		studioPlaceName = basePayload.studioPlaceName,
+		generatedAt = basePayload.generatedAt,
+		outputFolderName = basePayload.outputFolderName,
+		sessionId = basePayload.sessionId,
+		mode = basePayload.mode,
+	}
 end
 
-local function buildChunkPayload(basePayload, entries)
-    return {
-        studioPlaceName = basePayload.studioPlaceName,
-        generatedAt = basePayload.generatedAt,
-        outputFolderName = basePayload.outputFolderName,
-        roots = groupEntriesByService(entries),
-    }
+-- Splits `entries` into request bodies under `maxBytes` in one pass. Each entry is
+-- JSON-encoded once and bodies are assembled from those fragments: the `header` fields plus
+-- `listKey` holding the values, or `{ service, items }` objects when `grouped` (then `entries`
+-- are `flattenEntries` results). Sizes are summed from the fragments; a body is only built
+-- and measured when compression might let it go past the raw limit.
+-- Returns an iterator over chunks ({ body, count, last }, `last` = last entry index covered)
+-- and the skipped entries ({ index, reason }), filled in order while iterating.
+local function packJsonChunks(header, listKey, grouped, entries, maxBytes, maxEntryBytes)
+	local headerJson = HttpService:JSONEncode(header)
+	local prefix = (#headerJson > 2 and string.sub(headerJson, 1, -2) .. "," or "{") .. '"' .. listKey .. '":['
+	local groupPrefixes = {}
+	local function groupPrefix(group)
+		local p = groupPrefixes[group]
+		if not p then
+			p = string.sub(HttpService:JSONEncode({ service = group }), 1, -2) .. ',"items":['
+			groupPrefixes[group] = p
+		end
+		return p
+	end
+
+	local function assemble(parts)
+		if not grouped then
+			local fragments = table.create(#parts)
+			for k, part in ipairs(parts) do
+				fragments[k] = part.json
+			end
+			return prefix .. table.concat(fragments, ",") .. "]}"
+		end
+		local order, byGroup = {}, {}
+		for _, part in ipairs(parts) do
+			local list = byGroup[part.group]
+			if not list then
+				list = {}
+				byGroup[part.group] = list
+				table.insert(order, part.group)
+			end
+			table.insert(list, part.json)
+		end
+		local bodies = table.create(#order)
+		for k, group in ipairs(order) do
+			bodies[k] = groupPrefix(group) .. table.concat(byGroup[group], ",") .. "]}"
+		end
+		return prefix .. table.concat(bodies, ",") .. "]}"
+	end
+
+	-- A body under construction: its raw size so far and the fragments to assemble it from.
+	local function newBody()
+		return { bytes = #prefix + 2, parts = {}, groups = {}, groupCount = 0 }
+	end
+	local function addedBytes(body, part)
+		if not grouped then
+			return #part.json + (#body.parts > 0 and 1 or 0)
+		end
+		if body.groups[part.group] then
+			return #part.json + 1
+		end
+		return #groupPrefix(part.group) + 2 + (body.groupCount > 0 and 1 or 0) + #part.json
+	end
+	local function push(body, part)
+		body.bytes += addedBytes(body, part)
+		if grouped and not body.groups[part.group] then
+			body.groups[part.group] = true
+			body.groupCount += 1
+		end
+		table.insert(body.parts, part)
+	end
+	-- `measureBodyBytes(assemble(parts)) <= limit`, assembling only when the raw size doesn't fit.
+	local function fits(limit, bytes, parts)
+		if bytes <= limit then
+			return true
+		end
+		if not serverAcceptsGzip or not EncodingService or bytes > MAX_RAW_CHUNK_BYTES then
+			return false
+		end
+		return measureBodyBytes(assemble(parts)) <= limit
+	end
+
+	local skipped = {}
+	local encoded = {}
+	local function partAt(k)
+		local part = encoded[k]
+		if part == nil then
+			local entry = entries[k]
+			local ok, json = pcall(function()
+				return HttpService:JSONEncode(grouped and entry.item or entry)
+			end)
+			if not ok then
+				part = false
+				table.insert(skipped, { index = k, reason = "json encode failed" })
+			else
+				part = { group = grouped and entry.service or nil, json = json }
+				local single = newBody()
+				push(single, part)
+				if not fits(maxEntryBytes, single.bytes, single.parts) then
+					part = false
+					table.insert(skipped, { index = k, reason = "entry too large" })
+				end
+			end
+			encoded[k] = part
+		end
+		return part
+	end
+
+	local total = #entries
+	local i = 1
+	local function nextChunk()
+		while i <= total do
+			local body = newBody()
+			local j = i
+			local over = false
+			while j <= total do
+				local part = partAt(j)
+				if part then
+					-- The first entry always goes in, even alone over the limit.
+					if #body.parts > 0 and body.bytes + addedBytes(body, part) > maxBytes then
+						over = true
+						break
+					end
+					push(body, part)
+				end
+				j += 1
+			end
+			local count = #body.parts
+			local last = j - 1
+
+			if over and serverAcceptsGzip and EncodingService then
+				-- Compressed, more entries may fit. Keep pushing candidates and find how many fit by
+				-- galloping, then binary search: O(log n) measured bodies instead of one per entry.
+				local base = count
+				local indices, sizes = {}, {}
+				local nextIndex = j
+				local function extend(m)
+					while #indices < m and nextIndex <= total do
+						local part = partAt(nextIndex)
+						if part then
+							push(body, part)
+							table.insert(indices, nextIndex)
+							table.insert(sizes, body.bytes)
+						end
+						nextIndex += 1
+					end
+					return math.min(m, #indices)
+				end
+				local function test(m)
+					return fits(maxBytes, sizes[m], table.move(body.parts, 1, base + m, 1, {}))
+				end
+				local lo, hi = 0, nil
+				local m = 1
+				while true do
+					local reached = extend(m)
+					if not test(reached) then
+						hi = reached
+						break
+					end
+					lo = reached
+					if reached < m or nextIndex > total and reached == #indices then
+						break -- everything left fits
+					end
+					m *= 2
+				end
+				if hi then
+					while hi - lo > 1 do
+						local mid = (lo + hi) // 2
+						if test(mid) then
+							lo = mid
+						else
+							hi = mid
+						end
+					end
+				end
+				count = base + lo
+				last = indices[lo + 1] and indices[lo + 1] - 1 or total
+			end
+
+			i = last + 1
+			if count > 0 then
+				local parts = count < #body.parts and table.move(body.parts, 1, count, 1, {}) or body.parts
+				return { body = assemble(parts), count = count, last = last }
+			end
+		end
+		return nil
+	end
+	return nextChunk, skipped
 end
 
 local function buildSkippedPayload(basePayload, skipped)
@@ -1940,79 +2551,87 @@ local function postInChunks(url, basePayload)
 
     local maxBytes = 900 * 1024 -- stay under 1MB
     local maxEntryBytes = 800 * 1024
-    local skipped = {}
-    local i = 1
+    local nextChunk, skippedEntries = packJsonChunks(buildChunkHeader(basePayload), "roots", true, entries, maxBytes, maxEntryBytes)
     local lastResp = nil
-    while i <= total do
-        local chunk = {}
-        local j = i
-        while j <= total do
-            local candidate = entries[j]
-            -- Pre-test single entry size/encodability
-            local singleOk, singleJson = pcall(function()
-                return HttpService:JSONEncode(buildChunkPayload(basePayload, { candidate }))
-            end)
-            if not singleOk or #singleJson > maxEntryBytes then
-                table.insert(skipped, {
-                    service = candidate.service,
-                    name = candidate.item.name,
-                    class = candidate.item.class,
-                    path = candidate.item.path,
-                    reason = singleOk and "entry too large" or "json encode failed",
-                })
-                j += 1
-            else
-                table.insert(chunk, candidate)
-                local testPayload = buildChunkPayload(basePayload, chunk)
-                local okEncode, encoded = pcall(function()
-                    return HttpService:JSONEncode(testPayload)
-                end)
-                if not okEncode then
-                    -- remove and skip this one
-                    table.remove(chunk, #chunk)
-                    table.insert(skipped, {
-                        service = candidate.service,
-                        name = candidate.item.name,
-                        class = candidate.item.class,
-                        path = candidate.item.path,
-                        reason = "json encode failed",
-                    })
-                    j += 1
-                elseif #encoded > maxBytes then
-					-- if first entry already exceeds limit, send it alone
-                    if j == i then
-                        chunk = { candidate }
-                        j += 1
-                    else
-                        table.remove(chunk, #chunk)
-                    end
-                    break
-                else
-                    j += 1
-                end
-            end
+    while true do
+        local chunk = nextChunk()
+        if not chunk then
+            break
         end
-
-        local payload = buildChunkPayload(basePayload, chunk)
-        local ok, resp = postToServer(url, payload)
+        local ok, resp = postBodyToServer(url, chunk.body)
         lastResp = resp
         if not ok then
             return false, resp
         end
 
         -- progress update
-        local sentCount = j - 1
-        if sentCount < i then sentCount = i end
-        local alpha = math.clamp(sentCount / total, 0, 1)
-        setProgressAlpha(alpha)
-        i = sentCount + 1
+        setProgressAlpha(math.clamp(chunk.last / total, 0, 1))
     end
     -- send skipped metadata if any
+    local skipped = {}
+    for _, skip in ipairs(skippedEntries) do
+        local candidate = entries[skip.index]
+        table.insert(skipped, {
+            service = candidate.service,
+            name = candidate.item.name,
+            class = candidate.item.class,
+            path = candidate.item.path,
+            reason = skip.reason,
+        })
+    end
     postSkipped(url, basePayload, skipped)
     return true, lastResp
 end
 
-local function postInChunksJson(url, basePayload, onProgress)
+-- Posts one /diff or /diff_instances chunk body. When the server paginates, later pages are
+-- asked for with `pageToken` + `cursor` until `nextCursor` is null, and the pages are merged
+-- into one answer. If the server lost the token, the chunk is re-posted with `cursor`.
+-- With `onPage`, each page's `changes` go to it as soon as the page arrives instead of
+-- into the merged answer.
+local function postPagedJson(url, body, onPage)
+	if not serverFeatures["diff_pages"] then
+		return postBodyToServerJson(url, body)
+	end
+	local function withCursor(cursor)
+		return '{"cursor":' .. tostring(cursor) .. "," .. string.sub(body, 2)
+	end
+	local ok, data = postBodyToServerJson(url, withCursor(0))
+	if onPage and ok and type(data) == "table" and data.ok == true then
+		onPage(data.changes or {})
+		data.changes = {}
+	end
+	local pageToken = (ok and type(data) == "table") and data.pageToken or nil
+	while ok and type(data) == "table" and data.ok == true and type(data.nextCursor) == "number" do
+		local pageOk, page = false, nil
+		if type(pageToken) == "string" then
+			pageOk, page = postToServerJson(url, { cursor = data.nextCursor, pageToken = pageToken })
+		end
+		if not pageOk then
+			pageOk, page = postBodyToServerJson(url, withCursor(data.nextCursor))
+		end
+		if not pageOk then
+			return false, page
+		end
+		if type(page) ~= "table" or page.ok ~= true then
+			return false, "Failed: invalid response"
+		end
+		if onPage then
+			onPage(page.changes or {})
+			page.changes = nil
+		end
+		for _, field in ipairs({ "changes", "missingLocal", "skippedLarge" }) do
+			data[field] = data[field] or {}
+			for _, value in ipairs(page[field] or {}) do
+				table.insert(data[field], value)
+			end
+		end
+		data.nextCursor = page.nextCursor
+		pageToken = page.pageToken
+	end
+	return ok, data
+end
+
+local function postInChunksJson(url, basePayload, onProgress, onPage)
 	local entries = flattenEntries(basePayload.roots or {})
 	local total = #entries
 	if total == 0 then
@@ -2021,92 +2640,62 @@ local function postInChunksJson(url, basePayload, onProgress)
 
 	local maxBytes = 900 * 1024 -- stay under 1MB
 	local maxEntryBytes = 800 * 1024
-	local skippedRequest = {}
+	local nextChunk, skippedEntries = packJsonChunks(buildChunkHeader(basePayload), "roots", true, entries, maxBytes, maxEntryBytes)
 
 	local allChanges = {}
 	local allMissing = {}
 	local allSkippedLarge = {}
+	local allNeed = {}
+	local responseMode = nil
 
-	local i = 1
-	while i <= total do
-		local chunk = {}
-		local j = i
-		while j <= total do
-			local candidate = entries[j]
-			local singleOk, singleJson = pcall(function()
-				return HttpService:JSONEncode(buildChunkPayload(basePayload, { candidate }))
-			end)
-			if not singleOk or #singleJson > maxEntryBytes then
-				table.insert(skippedRequest, {
-					service = candidate.service,
-					name = candidate.item.name,
-					class = candidate.item.class,
-					path = candidate.item.path,
-					reason = singleOk and "entry too large" or "json encode failed",
-				})
-				j += 1
-			else
-				table.insert(chunk, candidate)
-				local okEncode, encoded = pcall(function()
-					return HttpService:JSONEncode(buildChunkPayload(basePayload, chunk))
-				end)
-				if not okEncode then
-					table.remove(chunk, #chunk)
-					table.insert(skippedRequest, {
-						service = candidate.service,
-						name = candidate.item.name,
-						class = candidate.item.class,
-						path = candidate.item.path,
-						reason = "json encode failed",
-					})
-					j += 1
-				elseif #encoded > maxBytes then
-					if j == i then
-						chunk = { candidate }
-						j += 1
-					else
-						table.remove(chunk, #chunk)
-					end
-					break
-				else
-					j += 1
-				end
-			end
+	while true do
+		local chunk = nextChunk()
+		if not chunk then
+			break
 		end
-
-		if #chunk > 0 then
-			local payload = buildChunkPayload(basePayload, chunk)
-			local ok, data = postToServerJson(url, payload)
-			if not ok then
-				return false, data
-			end
-			if type(data) ~= "table" or data.ok ~= true then
-				return false, "Failed: invalid response"
-			end
-
-			for _, change in ipairs(data.changes or {}) do
-				table.insert(allChanges, change)
-			end
-			for _, miss in ipairs(data.missingLocal or {}) do
-				table.insert(allMissing, miss)
-			end
-			for _, skip in ipairs(data.skippedLarge or {}) do
-				table.insert(allSkippedLarge, skip)
-			end
+		local ok, data = postPagedJson(url, chunk.body, onPage)
+		if not ok then
+			return false, data
+		end
+		if type(data) ~= "table" or data.ok ~= true then
+			return false, "Failed: invalid response"
 		end
 
-		local sentCount = j - 1
-		if sentCount < i then
-			sentCount = i
+		responseMode = responseMode or data.mode
+		for _, change in ipairs(data.changes or {}) do
+			table.insert(allChanges, change)
+		end
+		for _, miss in ipairs(data.missingLocal or {}) do
+			table.insert(allMissing, miss)
+		end
+		for _, skip in ipairs(data.skippedLarge or {}) do
+			table.insert(allSkippedLarge, skip)
 		end
+		for _, id in ipairs(data.need or {}) do
+			table.insert(allNeed, id)
+		end
+
 		if onProgress then
-			onProgress(math.clamp(sentCount / total, 0, 1))
+			onProgress(math.clamp(chunk.last / total, 0, 1))
 		end
-		i = sentCount + 1
+	end
+
+	local skippedRequest = {}
+	for _, skip in ipairs(skippedEntries) do
+		local candidate = entries[skip.index]
+		table.insert(skippedRequest, {
+			service = candidate.service,
+			name = candidate.item.name,
+			class = candidate.item.class,
+			path = candidate.item.path,
+			reason = skip.reason,
+		})
 	end
 
 	return true, {
 		ok = true,
+		mode = responseMode,
+		need = allNeed,
 		changes = allChanges,
 		missingLocal = allMissing,
 		skippedLarge = allSkippedLarge,
@@ -2114,15 +2703,48 @@ local function postInChunksJson(url, basePayload, onProgress)
 	}
 end
 
-local function buildInstancesChunkPayload(basePayload, instances)
+-- Sends only digests first and returns the payload narrowed to scripts the server
+-- doesn't already have. Needs a session so parent-script folders stay consistent
+-- across the skipped entries; returns the full payload otherwise.
+local function planScriptUpload(payload)
+	if not payload.sessionId or not serverFeatures["upload_plan"] then
+		return payload
+	end
+	local planUrl = deriveEndpointUrl(serverInput.Text, "upload_plan")
+	local digestPayload = buildDigestPayload(payload)
+	digestPayload.sessionId = payload.sessionId
+	local ok, data = postInChunksJson(planUrl, digestPayload)
+	if not ok or type(data) ~= "table" or type(data.need) ~= "table" or #(data.skippedRequest or {}) > 0 then
+		return payload
+	end
+	return filterPayloadByIds(payload, data.need)
+end
+
+local function buildInstancesChunkHeader(basePayload)
 	return {
 		studioPlaceName = basePayload.studioPlaceName,
 		generatedAt = basePayload.generatedAt,
 		outputFolderName = basePayload.outputFolderName,
-		instances = instances,
+		sessionId = basePayload.sessionId,
+		includePatch = basePayload.includePatch,
 	}
 end
 
+local function skippedInstanceRequests(instances, skippedEntries)
+	local skippedRequest = {}
+	for _, skip in ipairs(skippedEntries) do
+		local candidate = instances[skip.index]
+		table.insert(skippedRequest, {
+			service = candidate.service,
+			name = candidate.name,
+			class = candidate.class,
+			path = candidate.path,
+			reason = skip.reason,
+		})
+	end
+	return skippedRequest
+end
+
 local function postInstancesInChunks(url, basePayload, onProgress)
 	local instances = basePayload.instances or {}
 	local total = #instances
@@ -2132,82 +2754,33 @@ local function postInstancesInChunks(url, basePayload, onProgress)
 
 	local maxBytes = 900 * 1024 -- stay under 1MB
 	local maxEntryBytes = 800 * 1024
-	local skippedRequest = {}
+	local nextChunk, skippedEntries =
+		packJsonChunks(buildInstancesChunkHeader(basePayload), "instances", false, instances, maxBytes, maxEntryBytes)
 
-	local i = 1
 	local wrote = 0
-	while i <= total do
-		local chunk = {}
-		local j = i
-		while j <= total do
-			local candidate = instances[j]
-			local singleOk, singleJson = pcall(function()
-				return HttpService:JSONEncode(buildInstancesChunkPayload(basePayload, { candidate }))
-			end)
-			if not singleOk or #singleJson > maxEntryBytes then
-				table.insert(skippedRequest, {
-					service = candidate.service,
-					name = candidate.name,
-					class = candidate.class,
-					path = candidate.path,
-					reason = singleOk and "entry too large" or "json encode failed",
-				})
-				j += 1
-			else
-				table.insert(chunk, candidate)
-				local okEncode, encoded = pcall(function()
-					return HttpService:JSONEncode(buildInstancesChunkPayload(basePayload, chunk))
-				end)
-				if not okEncode then
-					table.remove(chunk, #chunk)
-					table.insert(skippedRequest, {
-						service = candidate.service,
-						name = candidate.name,
-						class = candidate.class,
-						path = candidate.path,
-						reason = "json encode failed",
-					})
-					j += 1
-				elseif #encoded > maxBytes then
-					if j == i then
-						chunk = { candidate }
-						j += 1
-					else
-						table.remove(chunk, #chunk)
-					end
-					break
-				else
-					j += 1
-				end
-			end
+	while true do
+		local chunk = nextChunk()
+		if not chunk then
+			break
 		end
-
-		if #chunk > 0 then
-			local payload = buildInstancesChunkPayload(basePayload, chunk)
-			local ok, data = postToServerJson(url, payload)
-			if not ok then
-				return false, data
-			end
-			if type(data) ~= "table" or data.ok ~= true then
-				return false, "Failed: invalid response"
-			end
-			wrote += (#chunk)
+		local ok, data = postBodyToServerJson(url, chunk.body)
+		if not ok then
+			return false, data
 		end
-
-		local sentCount = j - 1
-		if sentCount < i then
-			sentCount = i
+		if type(data) ~= "table" or data.ok ~= true then
+			return false, "Failed: invalid response"
 		end
+		wrote += chunk.count
+
 		if onProgress then
-			onProgress(math.clamp(sentCount / total, 0, 1))
+			onProgress(math.clamp(chunk.last / total, 0, 1))
 		end
-		i = sentCount + 1
 	end
 
-	return true, { ok = true, wrote = wrote, skippedRequest = skippedRequest }
+	return true, { ok = true, wrote = wrote, skippedRequest = skippedInstanceRequests(instances, skippedEntries) }
 end
 
-local function postInstancesInChunksJson(url, basePayload, onProgress)
+local function postInstancesInChunksJson(url, basePayload, onProgress, onPage)
 	local instances = basePayload.instances or {}
 	local total = #instances
 	if total == 0 then
@@ -2216,88 +2789,39 @@ local function postInstancesInChunksJson(url, basePayload, onProgress)
 
 	local maxBytes = 900 * 1024 -- stay under 1MB
 	local maxEntryBytes = 800 * 1024
-	local skippedRequest = {}
+	local nextChunk, skippedEntries =
+		packJsonChunks(buildInstancesChunkHeader(basePayload), "instances", false, instances, maxBytes, maxEntryBytes)
 
 	local allChanges = {}
 	local allMissing = {}
 	local allSkippedLarge = {}
 
-	local i = 1
-	while i <= total do
-		local chunk = {}
-		local j = i
-		while j <= total do
-			local candidate = instances[j]
-			local singleOk, singleJson = pcall(function()
-				return HttpService:JSONEncode(buildInstancesChunkPayload(basePayload, { candidate }))
-			end)
-			if not singleOk or #singleJson > maxEntryBytes then
-				table.insert(skippedRequest, {
-					service = candidate.service,
-					name = candidate.name,
-					class = candidate.class,
-					path = candidate.path,
-					reason = singleOk and "entry too large" or "json encode failed",
-				})
-				j += 1
-			else
-				table.insert(chunk, candidate)
-				local okEncode, encoded = pcall(function()
-					return HttpService:JSONEncode(buildInstancesChunkPayload(basePayload, chunk))
-				end)
-				if not okEncode then
-					table.remove(chunk, #chunk)
-					table.insert(skippedRequest, {
-						service = candidate.service,
-						name = candidate.name,
-						class = candidate.class,
-						path = candidate.path,
-						reason = "json encode failed",
-					})
-					j += 1
-				elseif #encoded > maxBytes then
-					if j == i then
-						chunk = { candidate }
-						j += 1
-					else
-						table.remove(chunk, #chunk)
-					end
-					break
-				else
-					j += 1
-				end
-			end
+	while true do
+		local chunk = nextChunk()
+		if not chunk then
+			break
 		end
-
-		if #chunk > 0 then
-			local payload = buildInstancesChunkPayload(basePayload, chunk)
-			local ok, data = postToServerJson(url, payload)
-			if not ok then
-				return false, data
-			end
-			if type(data) ~= "table" or data.ok ~= true then
-				return false, "Failed: invalid response"
-			end
-
-			for _, change in ipairs(data.changes or {}) do
-				table.insert(allChanges, change)
-			end
-			for _, miss in ipairs(data.missingLocal or {}) do
-				table.insert(allMissing, miss)
-			end
-			for _, skip in ipairs(data.skippedLarge or {}) do
-				table.insert(allSkippedLarge, skip)
-			end
+		local ok, data = postPagedJson(url, chunk.body, onPage)
+		if not ok then
+			return false, data
+		end
+		if type(data) ~= "table" or data.ok ~= true then
+			return false, "Failed: invalid response"
 		end
 
-		local sentCount = j - 1
-		if sentCount < i then
-			sentCount = i
+		for _, change in ipairs(data.changes or {}) do
+			table.insert(allChanges, change)
+		end
+		for _, miss in ipairs(data.missingLocal or {}) do
+			table.insert(allMissing, miss)
+		end
+		for _, skip in ipairs(data.skippedLarge or {}) do
+			table.insert(allSkippedLarge, skip)
 		end
+
 		if onProgress then
-			onProgress(math.clamp(sentCount / total, 0, 1))
+			onProgress(math.clamp(chunk.last / total, 0, 1))
 		end
-		i = sentCount + 1
 	end
 
 	return true, {
@@ -2305,7 +2829,7 @@ local function postInstancesInChunksJson(url, basePayload, onProgress)
 		changes = allChanges,
 		missingLocal = allMissing,
 		skippedLarge = allSkippedLarge,
-		skippedRequest = skippedRequest,
+		skippedRequest = skippedInstanceRequests(instances, skippedEntries),
 	}
 end
 
@@ -2315,14 +2839,20 @@ local reviewState = {
 	rowByIndex = {},
 	selectedIndex = nil,
 	selectedKey = nil,
-	diffMode = "local",
+	diffMode = "changes",
 	isRefreshing = false,
 	treeExpanded = {},
 	summaryMissing = 0,
 	summarySkipped = 0,
 	summaryReqSkipped = 0,
+	watchGeneration = 0,
+	-- Studio sources by `makeKey` as of the last refresh, to place scripts edited while in sync.
+	studioSourceByKey = {},
 }
 
+-- Long-polls /changes while the Review page is open (assigned below `refreshReview`).
+local startReviewWatch = nil
+
 local function countSelectedReviewEntries()
 	local selected = 0
 	for _, entry in ipairs(reviewState.entries) do
@@ -2389,7 +2919,30 @@ local function applyDiffMode(mode)
 	local entry = reviewState.entries[reviewState.selectedIndex]
 	if entry then
 		diffHeader.Text = entry.displayName or "Diff"
-		if mode == "studio" then
+		-- Large files can't be posted for a line diff; they show the local side instead.
+		if mode == "changes" and entry.relPath and serverFeatures["diff_hunks"] and not entry.large then
+			if entry.hunksText ~= nil then
+				diffText.Text = toPreviewText(entry.hunksText)
+			elseif diffModal.Visible then
+				diffText.Text = "Computing changes..."
+				task.spawn(function()
+					local ok, text = fetchDiffHunksText(entry)
+					if ok then
+						entry.hunksText = text
+					else
+						text = "Failed to compute changes: " .. text
+					end
+					if reviewState.entries[reviewState.selectedIndex] == entry and reviewState.diffMode == "changes" and diffModal.Visible then
+						diffText.Text = toPreviewText(text)
+					end
+				end)
+			else
+				diffText.Text = ""
+			end
+		elseif mode == "changes" and entry.entryType == "instance" and type(entry.patch) == "table" and #entry.patch > 0 then
+			-- Without line hunks, the property-level delta is the closest thing to a diff.
+			diffText.Text = toPreviewText(formatInstancePatch(entry.patch))
+		elseif mode == "studio" then
 			if entry.entryType == "instance" and entry.studioTree ~= nil then
 				diffText.Text = toPreviewText(prettyJson(entry.studioTree))
 			else
@@ -2401,24 +2954,24 @@ local function applyDiffMode(mode)
 			elseif entry.relPath and diffModal.Visible then
 				diffText.Text = "Loading local file..."
 				task.spawn(function()
-					local ok, data
-					if entry.entryType == "instance" then
-						ok, data = getLocalInstance(entry.relPath)
-					else
-						ok, data = getLocalSource(entry.relPath)
+					-- Load the selected entry together with the next few unloaded ones in one batch.
+					local group = { entry }
+					for i = reviewState.selectedIndex + 1, #reviewState.entries do
+						if #group >= 25 then
+							break
+						end
+						local nextEntry = reviewState.entries[i]
+						if nextEntry.localSource == nil and nextEntry.relPath then
+							table.insert(group, nextEntry)
+						end
 					end
+					prefetchLocalEntries(group)
 
-					if ok and type(data) == "table" and data.ok == true then
-						if entry.entryType == "instance" then
-							entry.localTree = data.tree
-							entry.localSource = data.pretty or (data.tree and prettyJson(data.tree)) or ""
-						else
-							entry.localSource = data.source or ""
-						end
-						if reviewState.entries[reviewState.selectedIndex] == entry and reviewState.diffMode == "local" and diffModal.Visible then
+					if entry.localSource ~= nil then
+						if reviewState.entries[reviewState.selectedIndex] == entry and reviewState.diffMode == mode and diffModal.Visible then
 							diffText.Text = toPreviewText(entry.localSource)
 						end
-					elseif reviewState.entries[reviewState.selectedIndex] == entry and reviewState.diffMode == "local" and diffModal.Visible then
+					elseif reviewState.entries[reviewState.selectedIndex] == entry and reviewState.diffMode == mode and diffModal.Visible then
 						diffText.Text = "Failed to load local file."
 					end
 				end)
@@ -2431,9 +2984,9 @@ local function applyDiffMode(mode)
 		diffText.Text = ""
 	end
 
-	local isLocal = (mode ~= "studio")
-	diffLocalTab.BackgroundColor3 = isLocal and ACCENT or DARK_BG
-	diffStudioTab.BackgroundColor3 = isLocal and DARK_BG or ACCENT
+	diffChangesTab.BackgroundColor3 = (mode == "changes") and ACCENT or DARK_BG
+	diffLocalTab.BackgroundColor3 = (mode == "local") and ACCENT or DARK_BG
+	diffStudioTab.BackgroundColor3 = (mode == "studio") and ACCENT or DARK_BG
 end
 
 local function setDiffOpen(open, animate)
@@ -2982,6 +3535,7 @@ local function refreshReview()
 	end
 	reviewState.isRefreshing = true
 
+	local watchCursor = nil
 	local okRun, err = pcall(function()
 		local prevSelectedByKey = {}
 		local prevSelectedKey = nil
@@ -3000,38 +3554,48 @@ local function refreshReview()
 		clearReviewRows()
 		setReviewStatus("Scanning Studio...")
 		setReviewProgressAlpha(0.15)
+		ensureServerCapabilities()
+
+		-- Take the change-feed cursor before scanning so edits made meanwhile are not missed.
+		reviewState.watchGeneration += 1
+		watchCursor = nil
+		if serverFeatures["changes"] then
+			local okCursor, cursorData = postToServerJson(deriveEndpointUrl(serverInput.Text, "changes"), {
+				outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
+			})
+			if okCursor and type(cursorData) == "table" and cursorData.ok == true then
+				watchCursor = cursorData.cursor
+			end
+		end
 
 		local payload = buildPayload()
 		local studioSourceByKey = buildStudioSourceMap(payload)
+		reviewState.studioSourceByKey = studioSourceByKey
 		local instancePayload = buildInstancesPayload()
-		local studioInstanceTreeByKey = {}
+		local studioInstanceByKey = {}
 		for _, inst in ipairs(instancePayload.instances or {}) do
 			local k = makeKey(inst.service, inst.path)
-			studioInstanceTreeByKey[k] = inst.tree
+			studioInstanceByKey[k] = inst
 		end
-
-		setReviewStatus("Checking local output...")
-		setReviewProgressAlpha(0.5)
-
-		local diffUrl = deriveEndpointUrl(serverInput.Text, "diff")
-		local ok, data = postInChunksJson(diffUrl, payload, function(alpha)
-			setReviewProgressAlpha(0.5 + (alpha * 0.25))
-		end)
-		if not ok then
-			error(tostring(data))
-		end
-		if type(data) ~= "table" or data.ok ~= true then
-			error("invalid response")
+		if serverFeatures["diff_pages"] then
+			-- Patches are only needed to sync; they are fetched for the selected entries then.
+			instancePayload.includePatch = false
 		end
 
-		local changes = data.changes or {}
-		local missing = data.missingLocal or {}
-		local skipped = data.skippedLarge or {}
-		local skippedReq = data.skippedRequest or {}
-
 		local reviewKeys = {}
 
-		for i, change in ipairs(changes) do
+		-- Paged servers hand each page's changes over as it arrives; rows are shown right away.
+		local lastRender = 0
+		local function renderPartial()
+			if os.clock() - lastRender >= 0.25 then
+				lastRender = os.clock()
+				renderReviewTree(prevSelectedKey)
+				updateReviewSelectionUi()
+				setReviewStatus(string.format("Loading... %d changes so far", #reviewState.entries))
+			end
+		end
+
+		local function addScriptChange(change)
 			local service = change.service
 			local pathSegments = change.path
 			local studioKey = makeKey(service, pathSegments)
@@ -3047,7 +3611,9 @@ local function refreshReview()
 				class = change.class,
 				name = change.name,
 				path = pathSegments,
+				relPath = change.relPath,
 				file = change.file,
+				large = change.large == true,
 				localSource = change.localSource,
 				studioSource = studioSourceByKey[studioKey] or "",
 				key = key,
@@ -3055,9 +3621,78 @@ local function refreshReview()
 				displayName = (displayPath ~= "" and displayPath) or tostring(change.name),
 			}
 			reviewKeys[key] = true
-			reviewState.entries[i] = entry
+			table.insert(reviewState.entries, entry)
+		end
+
+		local function addInstanceChange(change)
+			local service = change.service
+			local pathSegments = change.path
+			local studioKey = makeKey(service, pathSegments)
+			local displayPath = ""
+			if type(pathSegments) == "table" then
+				displayPath = table.concat(pathSegments, "/")
+			end
+			local key = "instance|" .. makeKey(service, pathSegments)
+			local studioItem = studioInstanceByKey[studioKey]
+			local entry = {
+				entryType = "instance",
+				kind = "M",
+				service = service,
+				class = change.class,
+				name = change.name,
+				path = pathSegments,
+				relPath = change.relPath,
+				file = change.file,
+				large = change.large == true,
+				patch = change.patch,
+				localSource = nil,
+				localTree = nil,
+				studioItem = studioItem,
+				studioTree = studioItem and studioItem.tree or nil,
+				studioSource = "",
+				key = key,
+				selected = (prevSelectedByKey[key] ~= nil) and prevSelectedByKey[key] or false,
+				displayName = (displayPath ~= "" and displayPath) or tostring(change.name),
+			}
+			table.insert(reviewState.entries, entry)
+			reviewKeys[key] = true
+		end
+
+		local function onScriptPage(pageChanges)
+			for _, change in ipairs(pageChanges) do
+				addScriptChange(change)
+			end
+			renderPartial()
+		end
+
+		setReviewStatus("Checking local output...")
+		setReviewProgressAlpha(0.5)
+
+		local diffUrl = deriveEndpointUrl(serverInput.Text, "diff")
+		local ok, data = postInChunksJson(diffUrl, buildDigestPayload(payload), function(alpha)
+			setReviewProgressAlpha(0.5 + (alpha * 0.25))
+		end, serverFeatures["diff_pages"] and onScriptPage or nil)
+		if ok and type(data) == "table" and data.ok == true and data.mode ~= "digest" and #(data.changes or {}) > 0 then
+			-- Server predates digest mode: fall back to sending full sources.
+			ok, data = postInChunksJson(diffUrl, payload, function(alpha)
+				setReviewProgressAlpha(0.5 + (alpha * 0.25))
+			end)
+		end
+		if not ok then
+			error(tostring(data))
+		end
+		if type(data) ~= "table" or data.ok ~= true then
+			error("invalid response")
 		end
 
+		-- Empty when the pages were already handed to `onScriptPage`.
+		for _, change in ipairs(data.changes or {}) do
+			addScriptChange(change)
+		end
+		local missing = data.missingLocal or {}
+		local skipped = data.skippedLarge or {}
+		local skippedReq = data.skippedRequest or {}
+
 		local function scriptNameFromLuaFilename(filename)
 			if type(filename) ~= "string" then
 				return nil
@@ -3176,7 +3811,12 @@ local function refreshReview()
 			local instDiffUrl = deriveEndpointUrl(serverInput.Text, "diff_instances")
 			local okInst, instData = postInstancesInChunksJson(instDiffUrl, instancePayload, function(alpha)
 				setReviewProgressAlpha(0.75 + (alpha * 0.2))
-			end)
+			end, serverFeatures["diff_pages"] and function(pageChanges)
+				for _, change in ipairs(pageChanges) do
+					addInstanceChange(change)
+				end
+				renderPartial()
+			end or nil)
 			if not okInst then
 				error(tostring(instData))
 			end
@@ -3193,34 +3833,7 @@ local function refreshReview()
 			instanceSkippedReqCount = #instSkippedReq
 
 			for _, change in ipairs(instChanges) do
-				local service = change.service
-				local pathSegments = change.path
-				local studioKey = makeKey(service, pathSegments)
-				local displayPath = ""
-				if type(pathSegments) == "table" then
-					displayPath = table.concat(pathSegments, "/")
-				end
-				local key = "instance|" .. makeKey(service, pathSegments)
-				local studioTree = studioInstanceTreeByKey[studioKey]
-				local entry = {
-					entryType = "instance",
-					kind = "M",
-					service = service,
-					class = change.class,
-					name = change.name,
-					path = pathSegments,
-					relPath = change.relPath,
-					file = change.file,
-					localSource = nil,
-					localTree = nil,
-					studioTree = studioTree,
-					studioSource = "",
-					key = key,
-					selected = (prevSelectedByKey[key] ~= nil) and prevSelectedByKey[key] or false,
-					displayName = (displayPath ~= "" and displayPath) or tostring(change.name),
-				}
-				table.insert(reviewState.entries, entry)
-				reviewKeys[key] = true
+				addInstanceChange(change)
 			end
 
 			local okInstIndex, instIndexData = getLocalIndexInstances(instancePayload)
@@ -3274,9 +3887,138 @@ local function refreshReview()
 	if not okRun then
 		setReviewStatus("Failed: " .. tostring(err))
 		setReviewProgressAlpha(0)
+	elseif watchCursor then
+		startReviewWatch(watchCursor)
+	end
+end
+
+local function removeReviewEntry(entry)
+	local selected = reviewState.entries[reviewState.selectedIndex]
+	for i, e in ipairs(reviewState.entries) do
+		if e == entry then
+			table.remove(reviewState.entries, i)
+			break
+		end
+	end
+	if selected == entry then
+		setDiffOpen(false, false)
+		selected = nil
+	end
+	reviewState.selectedIndex = nil
+	reviewState.selectedKey = nil
+	renderReviewTree(selected and selected.key or nil)
+	updateReviewSelectionUi()
+end
+
+-- Applies one /changes batch to the loaded review: scripts edited back to the Studio
+-- source drop out, scripts edited away from it are added, other edits invalidate the
+-- cached local side. Added/removed files need a full Refresh to be placed in the tree.
+local function applyLocalChanges(changes)
+	local entryByRelPath = {}
+	local entryByKey = {}
+	for _, entry in ipairs(reviewState.entries) do
+		if entry.relPath then
+			entryByRelPath[entry.relPath] = entry
+		end
+		entryByKey[entry.key] = entry
+	end
+
+	local unmatched = 0
+	local touched = 0
+	local inserted = false
+	for _, change in ipairs(changes) do
+		local entry = entryByRelPath[change.relPath]
+		local studioKey = (type(change.path) == "table") and makeKey(change.service, change.path) or nil
+		local studioSource = studioKey and reviewState.studioSourceByKey[studioKey]
+		if not entry and change.kind == "script" and change.change ~= "deleted" and studioSource ~= nil and change.digest ~= nil then
+			-- A script that was in sync: list it once it differs from Studio.
+			if change.digest ~= sourceDigest(studioSource) and entryByKey[studioKey] == nil then
+				local newEntry = {
+					entryType = "script",
+					kind = "M",
+					service = change.service,
+					class = change.class,
+					name = change.name,
+					path = change.path,
+					relPath = change.relPath,
+					file = change.relPath,
+					localSource = nil,
+					studioSource = studioSource,
+					key = studioKey,
+					selected = false,
+					displayName = table.concat(change.path, "/"),
+				}
+				table.insert(reviewState.entries, newEntry)
+				entryByRelPath[change.relPath] = newEntry
+				entryByKey[studioKey] = newEntry
+				inserted = true
+				touched += 1
+			end
+		elseif not entry then
+			unmatched += 1
+		elseif change.change == "deleted" then
+			unmatched += 1
+		elseif entry.entryType == "script" and change.digest ~= nil and change.digest == sourceDigest(entry.studioSource) then
+			removeReviewEntry(entry)
+			touched += 1
+		else
+			entry.localSource = nil
+			entry.localTree = nil
+			entry.patch = nil
+			entry.hunksText = nil
+			touched += 1
+			if reviewState.entries[reviewState.selectedIndex] == entry and diffModal.Visible then
+				applyDiffMode(reviewState.diffMode)
+			end
+		end
+	end
+
+	if inserted then
+		local selected = reviewState.entries[reviewState.selectedIndex]
+		renderReviewTree(selected and selected.key or nil)
+		updateReviewSelectionUi()
+	end
+
+	if unmatched > 0 then
+		setReviewStatus(string.format("Local files changed (%d) - press Refresh", unmatched))
+	elseif touched > 0 then
+		setReviewStatus(string.format("Updated from local edits - %d changes", #reviewState.entries))
 	end
 end
 
+startReviewWatch = function(cursor)
+	local generation = reviewState.watchGeneration
+	local function isCurrent()
+		return reviewState.watchGeneration == generation and activePage == reviewPage
+	end
+	task.spawn(function()
+		while isCurrent() do
+			local ok, data = postToServerJson(deriveEndpointUrl(serverInput.Text, "changes"), {
+				outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
+				since = cursor,
+				timeout = 20,
+				digests = true,
+			})
+			if not isCurrent() then
+				break
+			end
+			if not ok or type(data) ~= "table" or data.ok ~= true then
+				task.wait(5)
+			elseif data.reset then
+				if not reviewState.isRefreshing then
+					task.defer(refreshReview)
+				end
+				break
+			else
+				cursor = data.cursor or cursor
+				if type(data.changes) == "table" and #data.changes > 0 and not reviewState.isRefreshing then
+					applyLocalChanges(data.changes)
+				end
+			end
+		end
+	end)
+end
+
 local function getOrCreateContainer(parent, name)
 	local child = parent:FindFirstChild(name)
 	if child then
@@ -3456,6 +4198,100 @@ local function applyInstanceTreeToInstance(instance, tree)
 	return true
 end
 
+-- Occurrences count only the children `serializeInstanceTree` emits, like the server's numbering.
+local function findChildByPatchStep(parent, step, childFilter)
+	if type(step) ~= "table" then
+		return nil
+	end
+	local className, name, occurrence = step[1], step[2], tonumber(step[3]) or 0
+	local seen = 0
+	for _, child in ipairs(parent:GetChildren()) do
+		if isLuaScript(child) or (childFilter and not childFilter(child)) then
+			continue
+		end
+		if child.ClassName == className and child.Name == name then
+			if seen == occurrence then
+				return child
+			end
+			seen += 1
+		end
+	end
+	return nil
+end
+
+-- Applies a `/diff_instances` patch (only the changed props/attrs and added/removed children).
+-- All targets are resolved before anything is mutated so removals can't shift later lookups;
+-- any step that doesn't resolve fails the whole patch so the caller can use the full tree.
+local function applyInstancePatch(root, patch, childFilter)
+	if not root or type(patch) ~= "table" then
+		return false
+	end
+
+	local resolved = {}
+	for _, op in ipairs(patch) do
+		local target = root
+		for _, step in ipairs(op.path or {}) do
+			target = findChildByPatchStep(target, step, childFilter)
+			if not target then
+				return false
+			end
+		end
+		local removed = {}
+		for _, step in ipairs(op.removed or {}) do
+			local child = findChildByPatchStep(target, step, childFilter)
+			if not child then
+				return false
+			end
+			table.insert(removed, child)
+		end
+		table.insert(resolved, { op = op, target = target, removed = removed })
+	end
+
+	for _, r in ipairs(resolved) do
+		local op, target = r.op, r.target
+		if type(op.name) == "string" then
+			pcall(function()
+				target.Name = op.name
+			end)
+		end
+		for k, v in pairs(type(op.attrs) == "table" and op.attrs or {}) do
+			if type(k) == "string" then
+				pcall(function()
+					target:SetAttribute(k, decodeValue(v))
+				end)
+			end
+		end
+		for propName, encoded in pairs(type(op.props) == "table" and op.props or {}) do
+			if type(propName) == "string" then
+				local decoded = decodeValue(encoded)
+				if decoded ~= nil then
+					pcall(function()
+						target[propName] = decoded
+					end)
+				end
+			end
+		end
+		for _, child in ipairs(r.removed) do
+			pcall(function()
+				child:Destroy()
+			end)
+		end
+		for _, childTree in ipairs(op.added or {}) do
+			if type(childTree) == "table" and type(childTree.class) == "string" then
+				local okNew, created = pcall(function()
+					return Instance.new(childTree.class)
+				end)
+				if okNew and created then
+					created.Name = tostring(childTree.name or created.Name)
+					applyInstanceTreeToInstance(created, childTree)
+					created.Parent = target
+				end
+			end
+		end
+	end
+	return true
+end
+
 local function getOrCreateInstanceParent(pathSegments)
 	if type(pathSegments) ~= "table" or #pathSegments < 2 then
 		return nil
@@ -3482,6 +4318,39 @@ local function getOrCreateInstanceParent(pathSegments)
 	return current
 end
 
+-- Review rows from paged servers come without patches; fetch them for the entries being synced.
+local function fetchInstancePatches(entries)
+	local byKey = {}
+	local instances = {}
+	for _, entry in ipairs(entries) do
+		if entry.studioItem ~= nil then
+			byKey[entry.key] = entry
+			table.insert(instances, entry.studioItem)
+		end
+	end
+	if #instances == 0 then
+		return true, nil
+	end
+	local url = deriveEndpointUrl(serverInput.Text, "diff_instances")
+	local ok, data = postInstancesInChunksJson(url, {
+		studioPlaceName = studioPlaceName,
+		generatedAt = os.time(),
+		outputFolderName = (outputInput.Text and #outputInput.Text > 0) and outputInput.Text or "output",
+		includePatch = true,
+		instances = instances,
+	})
+	if not ok then
+		return false, data
+	end
+	for _, change in ipairs(data.changes or {}) do
+		local entry = byKey["instance|" .. makeKey(change.service, change.path)]
+		if entry and type(change.patch) == "table" then
+			entry.patch = change.patch
+		end
+	end
+	return true, nil
+end
+
 local function syncSelectedToStudio()
 	if RunService:IsRunning() then
 		setReviewStatus("Disabled during Play mode.")
@@ -3504,6 +4373,27 @@ local function syncSelectedToStudio()
 	setReviewStatus("Syncing...")
 	setReviewProgressAlpha(0)
 
+	local needsPatch = {}
+	for _, entry in ipairs(selected) do
+		if entry.entryType == "instance" and entry.kind == "M" and entry.patch == nil then
+			table.insert(needsPatch, entry)
+		end
+	end
+	if #needsPatch > 0 then
+		setReviewStatus("Fetching instance changes...")
+		fetchInstancePatches(needsPatch)
+	end
+
+	local needsLocal = {}
+	for _, entry in ipairs(selected) do
+		if not (entry.entryType == "instance" and entry.kind == "M" and type(entry.patch) == "table") then
+			table.insert(needsLocal, entry)
+		end
+	end
+	setReviewStatus("Fetching local files...")
+	prefetchLocalEntries(needsLocal)
+	setReviewStatus("Syncing...")
+
 	ChangeHistoryService:SetWaypoint("Before Local Sync")
 
 	local applied = 0
@@ -3514,6 +4404,17 @@ local function syncSelectedToStudio()
 		setReviewProgressAlpha(alpha)
 
 		if entry.entryType == "instance" then
+			-- Modified instances only need their delta; fall back to the full tree if the
+			-- patch no longer lines up with what's in Studio.
+			if entry.kind == "M" and type(entry.patch) == "table" then
+				local target = getInstanceFromPathSegments(entry.path)
+				local mode = entry.studioItem and entry.studioItem.mode
+				if target and applyInstancePatch(target, entry.patch, instanceChildFilter(mode)) then
+					applied += 1
+					continue
+				end
+			end
+
 			if entry.localTree == nil and entry.relPath then
 				local okLocal, data = getLocalInstance(entry.relPath)
 				if okLocal and type(data) == "table" and data.ok == true then
@@ -3603,12 +4504,20 @@ sendBtn.MouseButton1Click:Connect(function()
 
 	setStatus("Scanning...")
 	setProgressAlpha(0.15)
+	ensureServerCapabilities()
 	local payload = buildPayload()
+	local sessionId = beginExportSession(payload)
+	payload.sessionId = sessionId
+
+	setStatus("Comparing...")
+	setProgressAlpha(0.4)
+	local uploadPayload = planScriptUpload(payload)
 
 	setStatus("Sending...")
 	setProgressAlpha(0.6)
-	local ok, resp = postInChunks(serverInput.Text, payload)
+	local ok, resp = postInChunks(serverInput.Text, uploadPayload)
 	if not ok then
+		commitExportSession(sessionId, payload.outputFolderName)
 		setStatus("Failed: " .. tostring(resp))
 		setProgressAlpha(0)
 		return
@@ -3620,21 +4529,36 @@ sendBtn.MouseButton1Click:Connect(function()
 		setStatus("Exporting UI/objects...")
 		setProgressAlpha(0.75)
 		local instPayload = buildInstancesPayload()
+		instPayload.sessionId = sessionId
 		local instUrl = deriveEndpointUrl(serverInput.Text, "upload_instances")
 		local okInst, instResp = postInstancesInChunks(instUrl, instPayload, function(alpha)
 			setProgressAlpha(0.75 + (alpha * 0.25))
 		end)
 		if not okInst then
+			commitExportSession(sessionId, payload.outputFolderName)
 			setStatus("Failed: " .. tostring(instResp))
 			setProgressAlpha(0)
 			return
 		end
+		local okCommit, commitResp = commitExportSession(sessionId, payload.outputFolderName)
+		if not okCommit then
+			setStatus("Failed: " .. tostring(commitResp))
+			setProgressAlpha(0)
+			return
+		end
 		local wrote = (type(instResp) == "table" and instResp.wrote) or 0
 		setStatus(string.format("Done: exported scripts + %d instances", wrote))
 		setProgressAlpha(1)
 		return
 	end
 
+	local okCommit, commitResp = commitExportSession(sessionId, payload.outputFolderName)
+	if not okCommit then
+		setStatus("Failed: " .. tostring(commitResp))
+		setProgressAlpha(0)
+		return
+	end
+
 	setStatus("Done")
 	setProgressAlpha(1)
 end)
@@ -3679,6 +4603,10 @@ diffCloseBtn.MouseButton1Click:Connect(function()
 	setDiffOpen(false, true)
 end)
 
+diffChangesTab.MouseButton1Click:Connect(function()
+	applyDiffMode("changes")
+end)
+
 diffLocalTab.MouseButton1Click:Connect(function()
 	applyDiffMode("local")
 end)
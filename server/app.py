@@ -1,55 +1,365 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, g, request, jsonify
 from pathlib import Path
 from datetime import datetime, timezone
+import difflib
+import gzip
+import io
 import json
+import multiprocessing
 import os
 import hashlib
-from typing import Optional
+import re
+import stat
+import sys
+import threading
+import time
+import uuid
+import zlib
+from bisect import bisect_right
+from collections import ChainMap, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Mapping, Optional
 
 app = Flask(__name__)
 
 MANIFEST_FILENAME = ".parser_manifest.json"
+MANIFEST_LOCK_FILENAME = ".parser_manifest.lock"
+MANIFEST_JOURNAL_FILENAME = ".parser_manifest.journal"
+DEPS_FILENAME = ".parser_deps.json"
 README_FILENAME = "README_Parser.md"
 PROJECTS_DIRNAME = "projects"
 
+# Export sessions keep the manifest in memory between chunks; idle sessions are flushed after this.
+EXPORT_SESSION_TIMEOUT_SECONDS = float(os.environ.get("RBX_PARSE_SESSION_TIMEOUT", "300"))
+
+# Set when several server processes share the output folders (e.g. `gunicorn -w 4`): manifest
+# updates then also take a file lock, and in-memory export sessions are disabled.
+MULTIPROCESS = os.environ.get("RBX_PARSE_MULTIPROCESS", "").strip().lower() in ("1", "true", "yes")
+
+
+# In-process metrics, exposed in Prometheus text format at GET /metrics.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_HELP: dict[str, tuple[str, str]] = {
+	"rbx_parse_requests_total": ("counter", "Requests handled, by route, method and status."),
+	"rbx_parse_request_duration_seconds": ("histogram", "Request latency, by route."),
+	"rbx_parse_request_bytes_total": ("counter", "Request body bytes as received (before gzip decoding), by route."),
+	"rbx_parse_response_bytes_total": ("counter", "Response body bytes as sent, by route."),
+	"rbx_parse_json_decode_seconds": ("histogram", "Time spent decoding request JSON, by route."),
+	"rbx_parse_files_stat_total": ("counter", "Files stat'd."),
+	"rbx_parse_files_read_total": ("counter", "Files read."),
+	"rbx_parse_files_written_total": ("counter", "Files written."),
+	"rbx_parse_bytes_read_total": ("counter", "Bytes read from local files."),
+	"rbx_parse_bytes_written_total": ("counter", "Bytes written to local files."),
+	"rbx_parse_bytes_hashed_total": ("counter", "Bytes fed to hash functions, by algorithm."),
+	"rbx_parse_manifest_seconds": ("histogram", "Manifest load/save time, by op."),
+	"rbx_parse_index_scan_seconds": ("histogram", "Full walks of an output folder by the local index."),
+	"rbx_parse_skips_total": ("counter", "Files not written or not compared, by reason."),
+	"rbx_parse_deps_parsed_total": ("counter", "Scripts (re)scanned for require() calls by the dependency index."),
+	"rbx_parse_deps_refresh_seconds": ("histogram", "Dependency index refreshes after a manifest change."),
+}
+
+
+def _prometheus_escape(value) -> str:
+	return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+		# key -> [bucket counts..., +Inf count, sum]
+		self.histograms: dict[tuple[str, tuple[tuple[str, str], ...]], list[float]] = {}
+
+	def inc(self, name: str, value: float = 1, **labels: str) -> None:
+		key = (name, tuple(sorted(labels.items())))
+		with self.lock:
+			self.counters[key] = self.counters.get(key, 0) + value
+
+	def observe(self, name: str, seconds: float, **labels: str) -> None:
+		key = (name, tuple(sorted(labels.items())))
+		with self.lock:
+			hist = self.histograms.get(key)
+			if hist is None:
+				hist = self.histograms[key] = [0.0] * (len(LATENCY_BUCKETS) + 2)
+			for i, bound in enumerate(LATENCY_BUCKETS):
+				if seconds <= bound:
+					hist[i] += 1
+					break
+			else:
+				hist[len(LATENCY_BUCKETS)] += 1
+			hist[-1] += seconds
+
+	def render(self) -> str:
+		with self.lock:
+			counters = dict(self.counters)
+			histograms = {k: list(v) for k, v in self.histograms.items()}
+
+		def fmt_labels(labels: tuple[tuple[str, str], ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+			pairs = list(labels) + list(extra)
+			if not pairs:
+				return ""
+			return "{" + ",".join(f'{k}="{_prometheus_escape(v)}"' for k, v in pairs) + "}"
+
+		lines: list[str] = []
+		for name, (kind, help_text) in METRIC_HELP.items():
+			lines.append(f"# HELP {name} {help_text}")
+			lines.append(f"# TYPE {name} {kind}")
+			if kind == "counter":
+				for (metric, labels), value in sorted(counters.items()):
+					if metric == name:
+						lines.append(f"{name}{fmt_labels(labels)} {value:g}")
+				continue
+			for (metric, labels), hist in sorted(histograms.items()):
+				if metric != name:
+					continue
+				cumulative = 0.0
+				for bound, count in zip(LATENCY_BUCKETS, hist):
+					cumulative += count
+					lines.append(f"{name}_bucket{fmt_labels(labels, (('le', f'{bound:g}'),))} {cumulative:g}")
+				cumulative += hist[len(LATENCY_BUCKETS)]
+				lines.append(f"{name}_bucket{fmt_labels(labels, (('le', '+Inf'),))} {cumulative:g}")
+				lines.append(f"{name}_sum{fmt_labels(labels)} {hist[-1]:.6f}")
+				lines.append(f"{name}_count{fmt_labels(labels)} {cumulative:g}")
+		return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def count_file_read(size: int) -> None:
+	METRICS.inc("rbx_parse_files_read_total")
+	METRICS.inc("rbx_parse_bytes_read_total", size)
+
+
+def count_file_written(size: int) -> None:
+	METRICS.inc("rbx_parse_files_written_total")
+	METRICS.inc("rbx_parse_bytes_written_total", size)
 
-def _normalize_number(value):
-	# NOTE: In Python, bool is a subclass of int. Keep bools intact.
-	if isinstance(value, bool) or value is None:
-		return value
-	if isinstance(value, int):
-		return value
-	if isinstance(value, float):
-		# Default to 5 decimals to absorb tiny float drift from Studio serialization
-		# (e.g. 0.11372549019607843 vs 0.113725513...).
-		decimals = int(os.environ.get("RBX_PARSE_FLOAT_DECIMALS", "5"))
+
+def _route_label() -> str:
+	rule = request.url_rule
+	return rule.rule if rule is not None else "unmatched"
+
+
+class MetricsRequest(Request):
+	def get_json(self, force: bool = False, silent: bool = False, cache: bool = True):
+		start = time.perf_counter()
+		try:
+			return super().get_json(force=force, silent=silent, cache=cache)
+		finally:
+			METRICS.observe("rbx_parse_json_decode_seconds", time.perf_counter() - start, route=_route_label())
+
+
+app.request_class = MetricsRequest
+
+
+@app.before_request
+def _metrics_start():
+	g.metrics_start = time.perf_counter()
+
+
+# Registered before `_gzip_response`, so it runs after it and sees the bytes actually sent.
+@app.after_request
+def _metrics_finish(response):
+	route = _route_label()
+	start = g.get("metrics_start")
+	if start is not None:
+		METRICS.observe("rbx_parse_request_duration_seconds", time.perf_counter() - start, route=route)
+	METRICS.inc("rbx_parse_requests_total", route=route, method=request.method, status=str(response.status_code))
+	wire_bytes = request.environ.get("rbx_parse.wire_bytes", request.content_length)
+	if wire_bytes:
+		METRICS.inc("rbx_parse_request_bytes_total", wire_bytes, route=route)
+	if not response.direct_passthrough:
+		METRICS.inc("rbx_parse_response_bytes_total", len(response.get_data()), route=route)
+	return response
+
+
+# Compression between plugin and server. Requests with `Content-Encoding: gzip` are
+# decoded transparently; large responses are gzipped when the client accepts it.
+MAX_DECOMPRESSED_REQUEST_BYTES = int(os.environ.get("RBX_PARSE_MAX_REQUEST_BYTES", str(64 * 1024 * 1024)))
+GZIP_RESPONSE_MIN_BYTES = int(os.environ.get("RBX_PARSE_GZIP_MIN_BYTES", "1024"))
+
+
+class GzipRequestMiddleware:
+	def __init__(self, wsgi_app):
+		self.wsgi_app = wsgi_app
+
+	def __call__(self, environ, start_response):
+		encoding = str(environ.get("HTTP_CONTENT_ENCODING", "")).strip().lower()
+		if encoding == "gzip":
+			try:
+				length = int(environ.get("CONTENT_LENGTH") or 0)
+			except ValueError:
+				length = 0
+			raw = environ["wsgi.input"].read(length) if length > 0 else environ["wsgi.input"].read()
+			decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+			try:
+				body = decoder.decompress(raw, MAX_DECOMPRESSED_REQUEST_BYTES)
+				too_large = bool(decoder.unconsumed_tail)
+			except zlib.error:
+				body = None
+				too_large = False
+			if body is None or too_large:
+				status = "413 Payload Too Large" if too_large else "400 Bad Request"
+				error = "Request too large" if too_large else "Invalid gzip body"
+				payload = json.dumps({"ok": False, "error": error}).encode("utf-8")
+				start_response(status, [("Content-Type", "application/json"), ("Content-Length", str(len(payload)))])
+				return [payload]
+			environ = dict(environ)
+			environ["rbx_parse.wire_bytes"] = len(raw)
+			environ.pop("HTTP_CONTENT_ENCODING", None)
+			environ["CONTENT_LENGTH"] = str(len(body))
+			environ["wsgi.input"] = io.BytesIO(body)
+		return self.wsgi_app(environ, start_response)
+
+
+app.wsgi_app = GzipRequestMiddleware(app.wsgi_app)
+
+
+@app.after_request
+def _gzip_response(response):
+	if response.direct_passthrough or response.status_code < 200 or response.status_code >= 300:
+		return response
+	if "Content-Encoding" in response.headers:
+		return response
+	if "gzip" not in str(request.headers.get("Accept-Encoding", "")).lower():
+		return response
+	body = response.get_data()
+	if len(body) < GZIP_RESPONSE_MIN_BYTES:
+		return response
+	response.set_data(gzip.compress(body, compresslevel=5))
+	response.headers["Content-Encoding"] = "gzip"
+	response.headers["Content-Length"] = str(len(response.get_data()))
+	response.vary.add("Accept-Encoding")
+	return response
+
+
+# Float normalization for instance props/attrs. Rounding absorbs tiny float drift from
+# Studio serialization (e.g. 0.11372549019607843 vs 0.113725513...). The rules are parsed
+# once at startup; per-property normalizers are compiled on first use and cached.
+#
+# RBX_PARSE_FLOAT_DECIMALS sets the default precision (5). RBX_PARSE_FLOAT_RULES adds
+# comma-separated overrides, most specific first:
+#   `Class.Prop=N`  one property of one class (e.g. `Part.Position=3`)
+#   `Prop=N`        a property (or attribute) name on any class (e.g. `Position=4`)
+#   `@Type=N`       encoded values of a type anywhere (e.g. `@Color3=3`, see the plugin's encodeValue)
+FLOAT_DEFAULT_DECIMALS = int(os.environ.get("RBX_PARSE_FLOAT_DECIMALS", "5"))
+
+
+def parse_float_rules(text: str) -> dict[str, int]:
+	rules: dict[str, int] = {}
+	for part in str(text or "").split(","):
+		part = part.strip()
+		if not part:
+			continue
+		key, sep, value = part.partition("=")
+		key = key.strip()
+		if not sep or not key:
+			raise ValueError(f"Invalid float rule: {part!r}")
+		rules[key] = int(value.strip())
+	return rules
+
+
+def _make_float_rounder(decimals: int) -> Callable[[float], object]:
+	def round_float(value: float):
+		if value != value or value in (float("inf"), float("-inf")):
+			return value
 		rounded = round(value, decimals)
 		# Collapse integer-like floats to ints to avoid 1 vs 1.0 noise.
-		if abs(rounded - round(rounded)) < 1e-12:
-			return int(round(rounded))
+		as_int = round(rounded)
+		if abs(rounded - as_int) < 1e-12:
+			return int(as_int)
 		return rounded
-	return value
 
+	return round_float
 
-def _normalize_json_value(value):
-	"""
-	Normalize JSON-decoded values to reduce false-positive diffs.
 
-	- Rounds floats to a stable precision (default 5 decimals)
-	- Collapses integer-like floats to ints
-	- Recursively normalizes nested dicts/lists
+class FloatNormalizer:
 	"""
-	value = _normalize_number(value)
-	if isinstance(value, list):
-		return [_normalize_json_value(v) for v in value]
-	if isinstance(value, dict):
+	Compiled float normalization. `for_property(class, prop)` returns a function that
+	normalizes one JSON value; floats inside flat lists/dicts (Vector3, Color3, the 12
+	CFrame components, ...) are rounded inline instead of through a recursive call.
+	"""
+
+	def __init__(self, default_decimals: int, rules: Mapping[str, int]):
+		self.default_decimals = default_decimals
+		self.rules = dict(rules)
+		self._type_rules = {k[1:]: v for k, v in self.rules.items() if k.startswith("@")}
+		self._value_normalizers: dict[tuple[int, bool], Callable[[object], object]] = {}
+		self._property_normalizers: dict[tuple[str, str], Callable[[object], object]] = {}
+		self._lock = threading.Lock()
+		self.default = self._value_normalizer(default_decimals, True)
+
+	@classmethod
+	def from_env(cls) -> "FloatNormalizer":
+		return cls(FLOAT_DEFAULT_DECIMALS, parse_float_rules(os.environ.get("RBX_PARSE_FLOAT_RULES", "")))
+
+	def _value_normalizer(self, decimals: int, use_type_rules: bool) -> Callable[[object], object]:
+		key = (decimals, use_type_rules)
+		existing = self._value_normalizers.get(key)
+		if existing is not None:
+			return existing
+
+		round_float = _make_float_rounder(decimals)
+		type_normalizers: dict[str, Callable[[object], object]] = {}
+
+		def normalize(value):
+			kind = type(value)
+			if kind is float:
+				return round_float(value)
+			if kind is list:
+				return [round_float(v) if type(v) is float else normalize(v) for v in value]
+			if kind is dict:
+				if type_normalizers:
+					tag = value.get("__t")
+					if tag in type_normalizers:
+						return type_normalizers[tag](value)
+				return {
+					k: (round_float(v) if type(v) is float else normalize(v))
+					for k, v in value.items()
+					if isinstance(k, str)
+				}
+			return value
+
+		self._value_normalizers[key] = normalize
+		if use_type_rules:
+			for tag, tag_decimals in self._type_rules.items():
+				if tag_decimals != decimals:
+					type_normalizers[tag] = self._value_normalizer(tag_decimals, False)
+		return normalize
+
+	def for_property(self, class_name: str, prop: str) -> Callable[[object], object]:
+		key = (class_name, prop)
+		fn = self._property_normalizers.get(key)
+		if fn is not None:
+			return fn
+		with self._lock:
+			decimals = self.rules.get(f"{class_name}.{prop}", self.rules.get(prop))
+			if decimals is None:
+				fn = self.default
+			else:
+				fn = self._value_normalizer(decimals, False)
+			self._property_normalizers[key] = fn
+		return fn
+
+	def normalize_fields(self, class_name: str, fields: dict) -> dict:
 		out = {}
-		for k, v in value.items():
-			# JSON object keys should be strings; ignore anything else.
-			if isinstance(k, str):
-				out[k] = _normalize_json_value(v)
+		for k, v in fields.items():
+			if not isinstance(k, str):
+				continue
+			kind = type(v)
+			if kind is str or kind is bool or kind is int or v is None:
+				out[k] = v
+			else:
+				out[k] = self.for_property(class_name, k)(v)
 		return out
-	return value
+
+
+FLOAT_NORMALIZER = FloatNormalizer.from_env()
 
 
 def safe_name(name: str) -> str:
@@ -143,11 +453,12 @@ def _normalize_tree_node(obj) -> dict:
 		attrs = {}
 	if not isinstance(children, list):
 		children = []
+	class_name = str(obj.get("class", ""))
 	# Normalize leaf values to avoid float/representation drift (e.g., Color3/Vector components).
-	props = {k: _normalize_json_value(v) for k, v in props.items() if isinstance(k, str)}
-	attrs = {k: _normalize_json_value(v) for k, v in attrs.items() if isinstance(k, str)}
+	props = FLOAT_NORMALIZER.normalize_fields(class_name, props)
+	attrs = FLOAT_NORMALIZER.normalize_fields(class_name, attrs)
 	return {
-		"class": str(obj.get("class", "")),
+		"class": class_name,
 		"name": str(obj.get("name", "")),
 		"props": props,
 		"attrs": attrs,
@@ -155,7 +466,50 @@ def _normalize_tree_node(obj) -> dict:
 	}
 
 
-def canonicalize_instance_tree(tree) -> dict:
+# Prefix for Merkle-style instance hashes in the manifest. Entries without it were written
+# by older versions (sha256 of the compact JSON) and are still honoured when comparing.
+INSTANCE_HASH_PREFIX = "m1:"
+
+
+class CanonicalNode(dict):
+	"""
+	A canonicalized instance tree node (a plain dict for JSON purposes).
+
+	`content_hash` covers the node's own fields plus its children's hashes in canonical
+	order, so it identifies the whole subtree. It is computed once, bottom-up.
+	`source_occurrence` is the node's index among same-(class,name) siblings in the
+	input order, which is how the plugin addresses duplicates in Studio.
+	"""
+
+	__slots__ = ("content_hash", "source_occurrence")
+
+
+def _node_content_hash(node: dict, child_hashes: list[str]) -> str:
+	own = {"class": node["class"], "name": node["name"], "props": node["props"], "attrs": node["attrs"]}
+	try:
+		own_json = json.dumps(own, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+	except (TypeError, ValueError):
+		own_json = ""
+	own_bytes = own_json.encode("utf-8", errors="replace")
+	METRICS.inc("rbx_parse_bytes_hashed_total", len(own_bytes), algo="sha256")
+	h = hashlib.sha256(own_bytes)
+	for child_hash in child_hashes:
+		h.update(b"\n")
+		h.update(child_hash.encode("ascii"))
+	return h.hexdigest()
+
+
+def _finish_canonical_node(node: dict, children: list[CanonicalNode]) -> CanonicalNode:
+	# Sort primarily by (name,class); the content hash only breaks ties among duplicates.
+	children.sort(key=lambda c: (c["name"].lower(), c["class"].lower(), c.content_hash))
+	out = CanonicalNode(node)
+	out["children"] = children
+	out.content_hash = _node_content_hash(out, [c.content_hash for c in children])
+	out.source_occurrence = 0
+	return out
+
+
+def canonicalize_instance_tree(tree) -> CanonicalNode:
 	"""
 	Convert an arbitrary instance tree into a canonical, comparable shape.
 
@@ -163,46 +517,33 @@ def canonicalize_instance_tree(tree) -> dict:
 	- Ensures props/attrs are dicts (treats [] and other types as empty dicts)
 	- Canonicalizes children recursively
 	- Sorts children deterministically for stable comparison (handles duplicate names)
+	- Computes each node's `content_hash` exactly once (already-canonical input is returned as-is)
 	"""
 
-	node = _normalize_tree_node(tree)
+	if isinstance(tree, CanonicalNode):
+		return tree
 
-	children: list[dict] = []
+	node = _normalize_tree_node(tree)
+	children: list[CanonicalNode] = []
+	seen: dict[tuple[str, str], int] = {}
 	for child in node["children"]:
-		if isinstance(child, dict):
-			children.append(canonicalize_instance_tree(child))
-
-	def child_base_key(n: dict) -> tuple[str, str]:
-		return (str(n.get("name", "")).lower(), str(n.get("class", "")).lower())
+		if not isinstance(child, dict):
+			continue
+		canon = canonicalize_instance_tree(child)
+		key = (canon["class"], canon["name"])
+		canon.source_occurrence = seen.get(key, 0)
+		seen[key] = canon.source_occurrence + 1
+		children.append(canon)
+	return _finish_canonical_node(node, children)
 
-	def child_sig(n: dict) -> str:
-		try:
-			normalized = json.dumps(n, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-			return hashlib.sha256(normalized.encode("utf-8", errors="replace")).hexdigest()
-		except Exception:
-			return ""
-
-	# Sort primarily by (name,class). Only compute a content signature when needed to
-	# stabilize ordering among duplicates of (name,class).
-	grouped: dict[tuple[str, str], list[dict]] = {}
-	for c in children:
-		grouped.setdefault(child_base_key(c), []).append(c)
-
-	ordered: list[dict] = []
-	for k in sorted(grouped.keys()):
-		group = grouped[k]
-		if len(group) == 1:
-			ordered.append(group[0])
-		else:
-			group.sort(key=child_sig)
-			ordered.extend(group)
 
-	children = ordered
-	node["children"] = children
-	return node
+def instance_tree_hash(tree) -> str:
+	if isinstance(tree, CanonicalNode):
+		return INSTANCE_HASH_PREFIX + tree.content_hash
+	return sha256_text(json.dumps(tree, ensure_ascii=False, sort_keys=True, separators=(",", ":")))
 
 
-def merge_instance_tree(studio_tree: dict, local_tree: dict) -> dict:
+def merge_instance_tree(studio_tree: dict, local_tree: dict) -> CanonicalNode:
 	"""
 	Merge `local_tree` on top of `studio_tree` to support partial local JSON.
 
@@ -210,86 +551,129 @@ def merge_instance_tree(studio_tree: dict, local_tree: dict) -> dict:
 	Studio reports (defaults or properties not tracked by the plugin exporter).
 	"""
 
-	base = _normalize_tree_node(studio_tree)
-	overlay = _normalize_tree_node(local_tree)
+	base = canonicalize_instance_tree(studio_tree)
+	overlay = canonicalize_instance_tree(local_tree)
+	if base.content_hash == overlay.content_hash:
+		return base
 
 	result = {
 		"class": overlay["class"] or base["class"],
 		"name": overlay["name"] or base["name"],
-		"props": dict(base["props"]),
-		"attrs": dict(base["attrs"]),
+		"props": {**base["props"], **overlay["props"]},
+		"attrs": {**base["attrs"], **overlay["attrs"]},
 		"children": [],
 	}
 
-	for k, v in overlay["props"].items():
-		if isinstance(k, str):
-			result["props"][k] = _normalize_json_value(v)
-
-	for k, v in overlay["attrs"].items():
-		if isinstance(k, str):
-			result["attrs"][k] = _normalize_json_value(v)
-
 	def child_key(node: dict) -> tuple[str, str]:
-		return (str(node.get("class", "")), str(node.get("name", "")))
+		return (node["class"], node["name"])
 
 	# NOTE: Children can legally contain duplicates of (class,name). Match by occurrence index
 	# within each (class,name) group to avoid false diffs.
-	base_groups: dict[tuple[str, str], list[dict]] = {}
+	base_groups: dict[tuple[str, str], list[CanonicalNode]] = {}
 	for child in base["children"]:
-		if not isinstance(child, dict):
-			continue
-		cn = _normalize_tree_node(child)
-		base_groups.setdefault(child_key(cn), []).append(cn)
+		base_groups.setdefault(child_key(child), []).append(child)
 
-	overlay_groups: dict[tuple[str, str], list[dict]] = {}
+	overlay_groups: dict[tuple[str, str], list[CanonicalNode]] = {}
 	for child in overlay["children"]:
-		if not isinstance(child, dict):
-			continue
-		cn = _normalize_tree_node(child)
-		overlay_groups.setdefault(child_key(cn), []).append(cn)
+		overlay_groups.setdefault(child_key(child), []).append(child)
 
-	def group_sort_key(k: tuple[str, str]) -> tuple[str, str]:
-		return (k[1].lower(), k[0].lower())
-
-	merged_children: list[dict] = []
-	for ck in sorted(set(base_groups.keys()) | set(overlay_groups.keys()), key=group_sort_key):
+	merged_children: list[CanonicalNode] = []
+	for ck in set(base_groups.keys()) | set(overlay_groups.keys()):
 		base_list = base_groups.get(ck, [])
 		overlay_list = overlay_groups.get(ck, [])
 		for i in range(max(len(base_list), len(overlay_list))):
 			if i < len(base_list) and i < len(overlay_list):
 				merged_children.append(merge_instance_tree(base_list[i], overlay_list[i]))
 			elif i < len(overlay_list):
-				merged_children.append(merge_instance_tree({}, overlay_list[i]))
+				merged_children.append(overlay_list[i])
 			else:
 				merged_children.append(base_list[i])
 
-	def child_base_key(n: dict) -> tuple[str, str]:
-		return (str(n.get("name", "")).lower(), str(n.get("class", "")).lower())
+	return _finish_canonical_node(result, merged_children)
 
-	def child_sig(n: dict) -> str:
-		try:
-			normalized = json.dumps(n, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-			return hashlib.sha256(normalized.encode("utf-8", errors="replace")).hexdigest()
-		except Exception:
-			return ""
-
-	grouped: dict[tuple[str, str], list[dict]] = {}
-	for c in merged_children:
-		if isinstance(c, dict):
-			grouped.setdefault(child_base_key(c), []).append(c)
-
-	ordered: list[dict] = []
-	for k in sorted(grouped.keys()):
-		group = grouped[k]
-		if len(group) == 1:
-			ordered.append(group[0])
-		else:
-			group.sort(key=child_sig)
-			ordered.extend(group)
 
-	merged_children = ordered
-	result["children"] = merged_children
-	return result
+def _match_children(
+	base_children: list[CanonicalNode], overlay_children: list[CanonicalNode]
+) -> list[tuple[Optional[CanonicalNode], Optional[CanonicalNode]]]:
+	# Same pairing as `merge_instance_tree`: by occurrence index within each (class,name) group.
+	base_groups: dict[tuple[str, str], list[CanonicalNode]] = {}
+	for child in base_children:
+		base_groups.setdefault((child["class"], child["name"]), []).append(child)
+	overlay_groups: dict[tuple[str, str], list[CanonicalNode]] = {}
+	for child in overlay_children:
+		overlay_groups.setdefault((child["class"], child["name"]), []).append(child)
+
+	pairs: list[tuple[Optional[CanonicalNode], Optional[CanonicalNode]]] = []
+	for key in sorted(set(base_groups.keys()) | set(overlay_groups.keys())):
+		base_list = base_groups.get(key, [])
+		overlay_list = overlay_groups.get(key, [])
+		for i in range(max(len(base_list), len(overlay_list))):
+			pairs.append(
+				(
+					base_list[i] if i < len(base_list) else None,
+					overlay_list[i] if i < len(overlay_list) else None,
+				)
+			)
+	return pairs
+
+
+def _changed_values(before: dict, after: dict) -> dict:
+	return {k: v for k, v in after.items() if k not in before or before[k] != v}
+
+
+def instance_tree_patch(studio_tree, local_tree) -> list[dict]:
+	"""
+	Property-level patch that turns `studio_tree` into `local_tree`.
+
+	Returns one op per node whose own fields or child set changed:
+	`{"path": [[class, name, occurrence], ...], "props": {...}, "attrs": {...},
+	"name"?: str, "added": [subtree, ...], "removed": [[class, name, occurrence], ...]}`.
+	`path` steps and `removed` entries address Studio children by (class, name) and
+	their occurrence among same-(class,name) siblings in Studio order. Identical
+	subtrees are skipped by comparing content hashes.
+	"""
+
+	ops: list[dict] = []
+
+	def visit(studio: CanonicalNode, local: CanonicalNode, path: list[list]) -> None:
+		if studio.content_hash == local.content_hash:
+			return
+		op: dict = {"path": path}
+		props = _changed_values(studio["props"], local["props"])
+		attrs = _changed_values(studio["attrs"], local["attrs"])
+		if props:
+			op["props"] = props
+		if attrs:
+			op["attrs"] = attrs
+		if local["name"] != studio["name"]:
+			op["name"] = local["name"]
+
+		added: list[CanonicalNode] = []
+		removed: list[list] = []
+		nested: list[tuple[CanonicalNode, CanonicalNode]] = []
+		for studio_child, local_child in _match_children(studio["children"], local["children"]):
+			if studio_child is None:
+				added.append(local_child)
+			elif local_child is None:
+				removed.append([studio_child["class"], studio_child["name"], studio_child.source_occurrence])
+			else:
+				nested.append((studio_child, local_child))
+		if added:
+			op["added"] = added
+		if removed:
+			op["removed"] = removed
+		if len(op) > 1:
+			ops.append(op)
+
+		for studio_child, local_child in nested:
+			visit(
+				studio_child,
+				local_child,
+				path + [[studio_child["class"], studio_child["name"], studio_child.source_occurrence]],
+			)
+
+	visit(canonicalize_instance_tree(studio_tree), canonicalize_instance_tree(local_tree), [])
+	return ops
 
 
 def script_ext(class_name: str) -> str:
@@ -328,19 +712,159 @@ def resolve_output_dir(data: dict) -> Path:
 
 
 def sha256_text(text: str) -> str:
-	return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+	data = text.encode("utf-8", errors="replace")
+	METRICS.inc("rbx_parse_bytes_hashed_total", len(data), algo="sha256")
+	return hashlib.sha256(data).hexdigest()
+
+
+def digest_bytes(data: bytes) -> str:
+	# Cheap "<length>:<crc32>" digest; the plugin computes the same value in Luau.
+	METRICS.inc("rbx_parse_bytes_hashed_total", len(data), algo="crc32")
+	return f"{len(data)}:{zlib.crc32(data) & 0xFFFFFFFF:08x}"
+
+
+def digest_text(text: str) -> str:
+	return digest_bytes(text.replace("\r\n", "\n").encode("utf-8", errors="replace"))
+
+
+# Files are read for hashing in blocks of this size, so large files never sit in memory whole.
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def _hash_normalized_file(path: Path) -> tuple[str, str]:
+	"""Stream `path` once: ("<length>:<crc32>" digest, sha256) of its LF-normalized bytes."""
+	crc = 0
+	length = 0
+	sha = hashlib.sha256()
+	carry = b""
+	with path.open("rb") as f:
+		while True:
+			block = f.read(HASH_BLOCK_BYTES)
+			if not block:
+				break
+			count_file_read(len(block))
+			block = carry + block
+			# A trailing CR may be the first half of a CRLF split across blocks.
+			carry = b"\r" if block.endswith(b"\r") else b""
+			if carry:
+				block = block[:-1]
+			block = block.replace(b"\r\n", b"\n")
+			crc = zlib.crc32(block, crc)
+			sha.update(block)
+			length += len(block)
+	if carry:
+		crc = zlib.crc32(carry, crc)
+		sha.update(carry)
+		length += len(carry)
+	METRICS.inc("rbx_parse_bytes_hashed_total", length, algo="crc32")
+	METRICS.inc("rbx_parse_bytes_hashed_total", length, algo="sha256")
+	return f"{length}:{crc & 0xFFFFFFFF:08x}", sha.hexdigest()
+
+
+# path -> (size, mtime_ns, digest, sha256). Lets repeat reviews skip re-reading unchanged files.
+_local_digest_cache: dict[str, tuple[int, int, str, str]] = {}
+_local_digest_cache_lock = threading.Lock()
+
+
+def local_file_hashes(path: Path, st: Optional[os.stat_result] = None) -> tuple[str, str]:
+	"""Return (digest, sha256) of the LF-normalized file, cached by size and mtime."""
+	if st is None:
+		METRICS.inc("rbx_parse_files_stat_total")
+		st = path.stat()
+	key = str(path)
+	with _local_digest_cache_lock:
+		cached = _local_digest_cache.get(key)
+	if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+		return cached[2], cached[3]
+	digest, sha = _hash_normalized_file(path)
+	with _local_digest_cache_lock:
+		_local_digest_cache[key] = (st.st_size, st.st_mtime_ns, digest, sha)
+	return digest, sha
+
+
+def local_file_digest(path: Path, st: Optional[os.stat_result] = None) -> str:
+	return local_file_hashes(path, st)[0]
+
+
+# Manifest read-modify-write is serialized per output folder (see `manifest_transaction`).
+# Readers never lock: `save_manifest` replaces the file atomically.
+_output_dir_locks: dict[str, threading.Lock] = {}
+_output_dir_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _interprocess_lock(output_dir: Path):
+	if not MULTIPROCESS:
+		yield
+		return
+	with open(output_dir / MANIFEST_LOCK_FILENAME, "a+b") as f:
+		try:
+			import fcntl
+		except ImportError:  # Windows
+			import msvcrt
+
+			f.seek(0)
+			while True:
+				try:
+					msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+					break
+				except OSError:
+					continue
+			try:
+				yield
+			finally:
+				f.seek(0)
+				msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+			return
+		fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+		try:
+			yield
+		finally:
+			fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def output_dir_lock(output_dir: Path):
+	key = str(output_dir)
+	with _output_dir_locks_guard:
+		lock = _output_dir_locks.get(key)
+		if lock is None:
+			lock = _output_dir_locks[key] = threading.Lock()
+	with lock:
+		with _interprocess_lock(output_dir):
+			yield
 
 
 def load_manifest(output_dir: Path) -> dict:
+	start = time.perf_counter()
+	try:
+		manifest = _read_manifest(output_dir)
+		_replay_manifest_journal(output_dir, manifest)
+		_normalize_manifest(manifest)
+		if MANIFEST_MODE == "journal":
+			manifest = JournaledManifest(manifest)
+			manifest.persisted = _manifest_state(manifest)
+		return manifest
+	finally:
+		METRICS.observe("rbx_parse_manifest_seconds", time.perf_counter() - start, op="load")
+
+
+def _read_manifest(output_dir: Path) -> dict:
 	path = output_dir / MANIFEST_FILENAME
 	if not path.exists():
 		return {"version": 1, "scripts": {}, "instances": {}}
 	try:
-		obj = json.loads(path.read_text(encoding="utf-8", errors="replace"))
+		text = path.read_text(encoding="utf-8", errors="replace")
+		count_file_read(len(text.encode("utf-8")))
+		obj = json.loads(text)
 	except (OSError, json.JSONDecodeError):
 		return {"version": 1, "scripts": {}, "instances": {}}
 	if not isinstance(obj, dict):
 		return {"version": 1, "scripts": {}, "instances": {}}
+	return obj
+
+
+def _normalize_manifest(obj: dict) -> None:
 	obj.setdefault("version", 1)
 	obj.setdefault("scripts", {})
 	obj.setdefault("instances", {})
@@ -348,13 +872,299 @@ def load_manifest(output_dir: Path) -> dict:
 		obj["scripts"] = {}
 	if not isinstance(obj.get("instances"), dict):
 		obj["instances"] = {}
-	return obj
+	for section in ("paths", "blobs"):
+		if section in obj and not isinstance(obj.get(section), dict):
+			obj[section] = {}
+
+
+class ManifestPathMap:
+	"""
+	The manifest's `paths` section (relPath -> Studio identity) plus its reverse index,
+	so index/diff/get can map between files and Studio objects without guessing.
+	"""
+
+	def __init__(self, paths: Mapping[str, dict]):
+		self.by_rel: dict[str, dict] = {}
+		self.by_studio: dict[tuple[str, tuple[str, ...], str], str] = {}
+		self.by_instance_id: dict[str, str] = {}
+		for rel, identity in paths.items():
+			if not isinstance(rel, str) or not isinstance(identity, dict):
+				continue
+			path = identity.get("path")
+			if not isinstance(path, list) or not all(isinstance(seg, str) for seg in path):
+				continue
+			self.by_rel[rel] = identity
+			self.by_studio[(str(identity.get("kind", "")), tuple(path), str(identity.get("class", "")))] = rel
+			instance_id = identity.get("instanceId")
+			if isinstance(instance_id, str):
+				self.by_instance_id[instance_id] = rel
+
+	def rel_for(self, kind: str, item: dict) -> Optional[str]:
+		instance_id = item.get("instanceId")
+		if isinstance(instance_id, str) and instance_id in self.by_instance_id:
+			return self.by_instance_id[instance_id]
+		path = item.get("path")
+		if not isinstance(path, list):
+			return None
+		try:
+			return self.by_studio.get((kind, tuple(path), str(item.get("class", ""))))
+		except TypeError:
+			return None
+
+	def studio_path(self, rel: str, kind: str) -> Optional[list[str]]:
+		identity = self.by_rel.get(rel)
+		if identity is None or identity.get("kind") != kind:
+			return None
+		return list(identity["path"])
+
+
+# output_dir -> (manifest mtime_ns, size, map); reloaded only when the manifest file changes.
+_path_maps: dict[str, tuple[int, int, ManifestPathMap]] = {}
+_path_maps_lock = threading.Lock()
+
+
+def manifest_stamp(output_dir: Path) -> tuple[int, int]:
+	"""Cheap change marker for the manifest (snapshot + journal): (xor of mtime_ns, total size)."""
+	stamp = (0, 0)
+	for filename in (MANIFEST_FILENAME, MANIFEST_JOURNAL_FILENAME):
+		try:
+			st = (output_dir / filename).stat()
+			stamp = (stamp[0] ^ st.st_mtime_ns, stamp[1] + st.st_size)
+		except OSError:
+			pass
+	return stamp
+
+
+def prune_manifest_paths(output_dir: Path, manifest: dict) -> None:
+	"""Drop `paths` entries whose file is gone, e.g. the flat twin of a script now written as a folder."""
+	paths = manifest.get("paths")
+	if not isinstance(paths, dict):
+		return
+	for rel in [rel for rel in paths if not (output_dir / rel).is_file()]:
+		del paths[rel]
+
+
+def get_path_map(output_dir: Path) -> ManifestPathMap:
+	stamp = manifest_stamp(output_dir)
+	key = str(output_dir)
+	with _path_maps_lock:
+		cached = _path_maps.get(key)
+	if cached is not None and (cached[0], cached[1]) == stamp:
+		return cached[2]
+	path_map = ManifestPathMap(load_manifest(output_dir).get("paths") or {})
+	with _path_maps_lock:
+		_path_maps[key] = (stamp[0], stamp[1], path_map)
+	return path_map
 
 
 def save_manifest(output_dir: Path, manifest: dict) -> None:
-	path = output_dir / MANIFEST_FILENAME
+	"""Persist `manifest`; callers hold `output_dir_lock` (see `manifest_transaction`)."""
+	start = time.perf_counter()
 	manifest["updatedAt"] = datetime.now(timezone.utc).isoformat()
-	path.write_text(json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=2) + "\n", encoding="utf-8")
+	if MANIFEST_MODE == "journal":
+		_append_manifest_journal(output_dir, manifest)
+	else:
+		journal_path = output_dir / MANIFEST_JOURNAL_FILENAME
+		if journal_path.exists():
+			# Left over from journal mode and already replayed into `manifest`.
+			manifest["journalGeneration"] = int(manifest.get("journalGeneration", 0)) + 1
+			_write_manifest_snapshot(output_dir, manifest)
+			journal_path.unlink(missing_ok=True)
+		else:
+			_write_manifest_snapshot(output_dir, manifest)
+	METRICS.observe("rbx_parse_manifest_seconds", time.perf_counter() - start, op="save")
+
+
+# Manifest storage. "snapshot" (default) rewrites the whole JSON file on every save;
+# "journal" appends only the changed entries to `.parser_manifest.journal` and folds
+# them back into the JSON snapshot in the background once the journal grows past
+# RBX_PARSE_JOURNAL_COMPACT_BYTES. Loading always replays a journal if one is present.
+MANIFEST_MODE = os.environ.get("RBX_PARSE_MANIFEST_MODE", "snapshot").strip().lower()
+JOURNAL_COMPACT_BYTES = int(os.environ.get("RBX_PARSE_JOURNAL_COMPACT_BYTES", str(1024 * 1024)))
+
+_MISSING = object()
+
+
+class JournaledManifest(dict):
+	"""A loaded manifest plus `persisted`, a shallow copy of what is on disk (the diff base for the journal)."""
+
+	__slots__ = ("persisted",)
+
+
+def _manifest_state(manifest: Mapping) -> dict:
+	return {k: (dict(v) if isinstance(v, dict) else list(v) if isinstance(v, list) else v) for k, v in manifest.items()}
+
+
+def _journal_records(old: Mapping, new: Mapping) -> list[dict]:
+	"""Records turning `old` into `new`: per-entry for dict sections, appends for growing lists."""
+	records: list[dict] = []
+	for key in sorted(old.keys() - new.keys()):
+		if key != "journalGeneration":
+			records.append({"op": "del", "key": key})
+	for key, value in new.items():
+		if key == "journalGeneration":
+			continue
+		prev = old.get(key, _MISSING)
+		if isinstance(value, dict) and isinstance(prev, dict):
+			for k in sorted(prev.keys() - value.keys()):
+				records.append({"op": "del", "section": key, "key": k})
+			for k, v in value.items():
+				if prev.get(k, _MISSING) != v:
+					records.append({"op": "set", "section": key, "key": k, "value": v})
+		elif isinstance(value, list) and isinstance(prev, list) and value[: len(prev)] == prev:
+			for v in value[len(prev) :]:
+				records.append({"op": "append", "section": key, "value": v})
+		elif prev is _MISSING or prev != value:
+			records.append({"op": "set", "key": key, "value": value})
+	return records
+
+
+def _apply_journal_record(manifest: dict, record: dict) -> None:
+	op = record.get("op")
+	key = record.get("key")
+	section_name = record.get("section")
+	if section_name is None:
+		if op == "set":
+			manifest[key] = record.get("value")
+		elif op == "del":
+			manifest.pop(key, None)
+		return
+	if op == "append":
+		section = manifest.get(section_name)
+		if not isinstance(section, list):
+			section = manifest[section_name] = []
+		section.append(record.get("value"))
+		return
+	section = manifest.get(section_name)
+	if not isinstance(section, dict):
+		section = manifest[section_name] = {}
+	if op == "set":
+		section[key] = record.get("value")
+	elif op == "del":
+		section.pop(key, None)
+
+
+def _read_journal_generation(journal_path: Path) -> Optional[int]:
+	try:
+		with journal_path.open("r", encoding="utf-8") as f:
+			header = json.loads(f.readline())
+		return int(header["generation"])
+	except (OSError, ValueError, KeyError, TypeError):
+		return None
+
+
+def _replay_manifest_journal(output_dir: Path, manifest: dict) -> None:
+	journal_path = output_dir / MANIFEST_JOURNAL_FILENAME
+	try:
+		with journal_path.open("r", encoding="utf-8", errors="replace") as f:
+			lines = f.read().splitlines()
+	except OSError:
+		return
+	count_file_read(sum(len(line.encode("utf-8")) + 1 for line in lines))
+	try:
+		generation = int(json.loads(lines[0])["generation"]) if lines else None
+	except (ValueError, KeyError, TypeError):
+		generation = None
+	# A journal from another generation was already folded into the snapshot (a
+	# compaction was interrupted before it could reset the journal).
+	if generation != int(manifest.get("journalGeneration", 0)):
+		return
+	for line in lines[1:]:
+		try:
+			record = json.loads(line)
+		except json.JSONDecodeError:
+			# Torn line from a crash mid-append (later appends start on a fresh line).
+			continue
+		if isinstance(record, dict):
+			_apply_journal_record(manifest, record)
+
+
+def _write_manifest_snapshot(output_dir: Path, manifest: dict) -> None:
+	path = output_dir / MANIFEST_FILENAME
+	text = json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=2) + "\n"
+	tmp_path = path.with_name(f"{MANIFEST_FILENAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+	tmp_path.write_text(text, encoding="utf-8")
+	os.replace(tmp_path, path)
+	count_file_written(len(text.encode("utf-8")))
+
+
+def _reset_manifest_journal(output_dir: Path, generation: int) -> None:
+	journal_path = output_dir / MANIFEST_JOURNAL_FILENAME
+	tmp_path = journal_path.with_name(f"{MANIFEST_JOURNAL_FILENAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+	tmp_path.write_text(json.dumps({"generation": generation}) + "\n", encoding="utf-8")
+	os.replace(tmp_path, journal_path)
+
+
+def _append_manifest_journal(output_dir: Path, manifest: dict) -> None:
+	if isinstance(manifest, JournaledManifest):
+		base = manifest.persisted
+	else:
+		base = _manifest_state(load_manifest(output_dir))
+
+	journal_path = output_dir / MANIFEST_JOURNAL_FILENAME
+	loaded_generation = int(manifest.get("journalGeneration", 0))
+	generation = _read_journal_generation(journal_path)
+	if generation is None or generation < loaded_generation:
+		generation = loaded_generation
+		_reset_manifest_journal(output_dir, generation)
+	# A newer generation means a compaction ran since this manifest was loaded; the
+	# content didn't change, so appending our diff to the new journal is still right.
+	manifest["journalGeneration"] = generation
+
+	records = _journal_records(base, manifest)
+	if records:
+		data = "".join(json.dumps(r, ensure_ascii=False, sort_keys=True) + "\n" for r in records).encode("utf-8")
+		with journal_path.open("a+b") as f:
+			f.seek(0, os.SEEK_END)
+			if f.tell() > 0:
+				f.seek(-1, os.SEEK_END)
+				if f.read(1) != b"\n":
+					data = b"\n" + data
+			f.write(data)
+			f.flush()
+			os.fsync(f.fileno())
+		count_file_written(len(data))
+	if isinstance(manifest, JournaledManifest):
+		manifest.persisted = _manifest_state(manifest)
+
+	try:
+		if journal_path.stat().st_size > JOURNAL_COMPACT_BYTES:
+			_schedule_journal_compaction(output_dir)
+	except OSError:
+		pass
+
+
+_compacting_dirs: set[str] = set()
+_compacting_dirs_lock = threading.Lock()
+
+
+def compact_manifest_journal(output_dir: Path) -> None:
+	"""Fold the journal into a new snapshot generation and start an empty journal."""
+	with output_dir_lock(output_dir):
+		manifest = dict(load_manifest(output_dir))
+		generation = int(manifest.get("journalGeneration", 0)) + 1
+		manifest["journalGeneration"] = generation
+		_write_manifest_snapshot(output_dir, manifest)
+		_reset_manifest_journal(output_dir, generation)
+
+
+def _schedule_journal_compaction(output_dir: Path) -> None:
+	key = str(output_dir)
+	with _compacting_dirs_lock:
+		if key in _compacting_dirs:
+			return
+		_compacting_dirs.add(key)
+
+	def run() -> None:
+		try:
+			compact_manifest_journal(output_dir)
+		except OSError:
+			pass
+		finally:
+			with _compacting_dirs_lock:
+				_compacting_dirs.discard(key)
+
+	threading.Thread(target=run, name="manifest-compaction", daemon=True).start()
 
 
 def export_flags_from_payload(data: dict) -> dict:
@@ -414,6 +1224,164 @@ This folder is generated by the **Roblox Script Parser** plugin + local server.
 	(output_dir / README_FILENAME).write_text(text, encoding="utf-8")
 
 
+class ExportSession:
+	"""
+	In-memory state for one Export run (begin -> chunks -> commit).
+
+	The manifest is loaded once at begin and saved once at commit (or when the
+	session times out), instead of once per uploaded chunk.
+	"""
+
+	def __init__(self, session_id: str, output_dir: Path, flags: dict):
+		self.id = session_id
+		self.output_dir = output_dir
+		self.flags = dict(flags)
+		self.manifest = load_manifest(output_dir)
+		self.lock = threading.Lock()
+		self.last_active = time.monotonic()
+		self.wrote = 0
+		self.skipped = 0
+		# Script paths seen so far (via /upload_plan or /upload), so parent-script folders
+		# are detected across chunks instead of only within one chunk.
+		self.script_paths: dict[str, set[tuple[str, ...]]] = {}
+		# Set once the manifest has been written for good; late chunks must not use it.
+		self.closed = False
+		# Summary of the snapshot recorded at close (see `create_export_snapshot`).
+		self.snapshot: Optional[dict] = None
+
+	def remember_script_paths(self, records: list[tuple[str, dict, list[str]]]) -> None:
+		for service, _item, normalized in records:
+			self.script_paths.setdefault(service, set()).add(tuple(normalized))
+
+	def touch(self) -> None:
+		self.last_active = time.monotonic()
+
+	def merge_flags(self, flags: dict) -> None:
+		for k, v in flags.items():
+			if v:
+				self.flags[k] = True
+
+	def close(self) -> None:
+		"""Write the README and manifest, then snapshot the export. Call with `self.lock` held."""
+		self.closed = True
+		with output_dir_lock(self.output_dir):
+			prune_manifest_paths(self.output_dir, self.manifest)
+			write_readme(self.output_dir, self.flags)
+			save_manifest(self.output_dir, self.manifest)
+			self.snapshot = create_export_snapshot(self.output_dir, self.manifest)
+
+
+_export_sessions: dict[str, ExportSession] = {}
+_export_sessions_lock = threading.Lock()
+_session_reaper_started = False
+
+
+def _reap_expired_sessions() -> None:
+	now = time.monotonic()
+	expired: list[ExportSession] = []
+	with _export_sessions_lock:
+		for sid, session in list(_export_sessions.items()):
+			if now - session.last_active > EXPORT_SESSION_TIMEOUT_SECONDS:
+				expired.append(_export_sessions.pop(sid))
+	for session in expired:
+		with session.lock:
+			try:
+				session.close()
+			except Exception:
+				# One broken session must not stop the reaper from flushing the others.
+				app.logger.exception("Failed to flush expired export session %s", session.id)
+
+
+def _session_reaper_loop() -> None:
+	interval = max(1.0, min(30.0, EXPORT_SESSION_TIMEOUT_SECONDS / 4))
+	while True:
+		time.sleep(interval)
+		_reap_expired_sessions()
+
+
+def _ensure_session_reaper() -> None:
+	global _session_reaper_started
+	with _export_sessions_lock:
+		if _session_reaper_started:
+			return
+		_session_reaper_started = True
+	threading.Thread(target=_session_reaper_loop, name="export-session-reaper", daemon=True).start()
+
+
+def begin_export_session(output_dir: Path, flags: dict) -> ExportSession:
+	_ensure_session_reaper()
+	# Only one open session per output dir: flush any previous one so its manifest isn't lost.
+	stale: list[ExportSession] = []
+	with _export_sessions_lock:
+		for sid, session in list(_export_sessions.items()):
+			if session.output_dir == output_dir:
+				stale.append(_export_sessions.pop(sid))
+	for session in stale:
+		with session.lock:
+			session.close()
+
+	# Load and register under the folder lock so no sessionless upload lands in between
+	# (it would be saved to disk and then overwritten by this session's manifest).
+	with output_dir_lock(output_dir):
+		session = ExportSession(uuid.uuid4().hex, output_dir, flags)
+		with _export_sessions_lock:
+			_export_sessions[session.id] = session
+	return session
+
+
+def get_export_session(data: dict, output_dir: Path) -> Optional[ExportSession]:
+	session_id = data.get("sessionId")
+	if not isinstance(session_id, str) or not session_id:
+		return None
+	with _export_sessions_lock:
+		session = _export_sessions.get(session_id)
+	if session is None or session.output_dir != output_dir:
+		return None
+	session.touch()
+	return session
+
+
+def end_export_session(session_id: str) -> Optional[ExportSession]:
+	with _export_sessions_lock:
+		return _export_sessions.pop(session_id, None)
+
+
+def active_export_session(output_dir: Path) -> Optional[ExportSession]:
+	with _export_sessions_lock:
+		for session in _export_sessions.values():
+			if session.output_dir == output_dir:
+				return session
+	return None
+
+
+@contextmanager
+def manifest_transaction(output_dir: Path, session: Optional[ExportSession] = None):
+	"""
+	Yield `(manifest, session)` for one read-modify-write of `output_dir`'s manifest.
+
+	Inside an export session (the given one, or any open for the folder) the session's
+	in-memory manifest is used under its lock and saved at commit. Otherwise the manifest
+	is loaded and saved under the folder lock. Either way concurrent requests for the same
+	folder can't lose each other's entries.
+	"""
+	while True:
+		candidate = session or active_export_session(output_dir)
+		if candidate is not None:
+			with candidate.lock:
+				if not candidate.closed:
+					yield candidate.manifest, candidate
+					return
+			session = None
+			continue
+		with output_dir_lock(output_dir):
+			if active_export_session(output_dir) is not None:
+				continue
+			manifest = load_manifest(output_dir)
+			yield manifest, None
+			save_manifest(output_dir, manifest)
+			return
+
+
 def iter_records_from_payload(data: dict) -> list[tuple[str, dict, list[str]]]:
 	records: list[tuple[str, dict, list[str]]] = []
 	roots = data.get("roots", [])
@@ -432,8 +1400,13 @@ def iter_records_from_payload(data: dict) -> list[tuple[str, dict, list[str]]]:
 	return records
 
 
-def parent_paths_by_service(records: list[tuple[str, dict, list[str]]]) -> dict[str, set[tuple[str, ...]]]:
+def parent_paths_by_service(
+	records: list[tuple[str, dict, list[str]]],
+	known_paths: Optional[dict[str, set[tuple[str, ...]]]] = None,
+) -> dict[str, set[tuple[str, ...]]]:
 	paths_by_service: dict[str, set[tuple[str, ...]]] = {}
+	for service, paths in (known_paths or {}).items():
+		paths_by_service[service] = set(paths)
 	for service, _item, normalized in records:
 		paths_by_service.setdefault(service, set()).add(tuple(normalized))
 
@@ -471,67 +1444,130 @@ def local_file_path(
 	return current / f"{name}{ext}"
 
 
-def existing_local_file_path(output_dir: Path, service: str, item: dict, normalized_path: list[str]) -> Optional[Path]:
-	name = normalized_path[-1] if normalized_path else safe_name(str(item.get("name", "Script")))
-	class_name = str(item.get("class", "Script"))
-	ext = script_ext(class_name)
-
-	service_dir = output_dir / safe_name(service)
+def instance_rel_path(service: str, item: dict, normalized_path: list[str]) -> str:
+	name = normalized_path[-1] if normalized_path else safe_name(str(item.get("name", "Instance")))
+	class_name = safe_name(str(item.get("class", "Folder")))
 	dir_segments = [seg for seg in normalized_path[:-1] if seg]
-	current = service_dir
-	for seg in dir_segments:
-		current = current / seg
+	return "/".join([safe_name(service), *dir_segments, f"{name}.{class_name}"])
 
-	flat = current / f"{name}{ext}"
-	folder = current / name / f"{name}{ext}"
-
-	candidates: list[Path] = []
-	if flat.exists():
-		candidates.append(flat)
-	if folder.exists():
-		candidates.append(folder)
-
-	# Backward-compatibility: older exports used a stricter, lossy sanitizer.
-	legacy_dir_segments = [safe_name_legacy(seg) for seg in normalized_path[:-1] if seg]
-	legacy_name = safe_name_legacy(name)
-	if legacy_dir_segments != dir_segments or legacy_name != name:
-		legacy_current = service_dir
-		for seg in legacy_dir_segments:
-			legacy_current = legacy_current / seg
-		legacy_flat = legacy_current / f"{legacy_name}{ext}"
-		legacy_folder = legacy_current / legacy_name / f"{legacy_name}{ext}"
-		if legacy_flat.exists():
-			candidates.append(legacy_flat)
-		if legacy_folder.exists():
-			candidates.append(legacy_folder)
-
-	if not candidates:
-		return None
-	if len(candidates) == 1:
-		return candidates[0]
 
-	# Prefer the newest file if both exist (handles stale outputs)
-	def mtime(p: Path) -> float:
-		try:
-			return p.stat().st_mtime
-		except OSError:
-			return 0.0
+def instance_local_file_path(output_dir: Path, service: str, item: dict, normalized_path: list[str]) -> Path:
+	return output_dir / instance_rel_path(service, item, normalized_path)
 
-	candidates.sort(key=mtime, reverse=True)
-	return candidates[0]
 
+class LocalPathSnapshot:
+	"""
+	One `os.scandir` pass over the service folders a request touches, used to resolve
+	many records to their on-disk files without per-candidate `exists()`/`stat()` calls.
 
-def instance_local_file_path(output_dir: Path, service: str, item: dict, normalized_path: list[str]) -> Path:
-	name = normalized_path[-1] if normalized_path else safe_name(str(item.get("name", "Instance")))
-	class_name = safe_name(str(item.get("class", "Folder")))
+	Build one per request; it does not notice files that change after a service was scanned.
+	"""
 
-	service_dir = output_dir / safe_name(service)
-	dir_segments = [seg for seg in normalized_path[:-1] if seg]
-	current = service_dir
-	for seg in dir_segments:
-		current = current / seg
-	current.mkdir(parents=True, exist_ok=True)
-	return current / f"{name}.{class_name}"
+	# Windows/macOS volumes are usually case-insensitive; `Path.exists()` matched either case there.
+	CASE_INSENSITIVE = os.name == "nt" or sys.platform == "darwin"
+
+	def __init__(self, output_dir: Path):
+		self.output_dir = output_dir
+		# rel posix path -> DirEntry (DirEntry caches its own stat()).
+		self.files: dict[str, os.DirEntry] = {}
+		self.folded: dict[str, str] = {}
+		self._scanned: set[str] = set()
+		self._legacy_names: dict[str, str] = {}
+
+	def _scan_service(self, service_dir: str) -> None:
+		if service_dir in self._scanned or service_dir.startswith("."):
+			# Dot folders (`.parser_store`, ".", "..") hold server state, not exported files.
+			return
+		self._scanned.add(service_dir)
+		stack = [(self.output_dir / service_dir, service_dir)]
+		while stack:
+			directory, rel_dir = stack.pop()
+			try:
+				with os.scandir(directory) as it:
+					for entry in it:
+						rel = f"{rel_dir}/{entry.name}"
+						try:
+							# Symlinks are not followed (a link back to `..` would never end), as in `LocalFileIndex`.
+							if entry.is_dir(follow_symlinks=False):
+								stack.append((Path(entry.path), rel))
+							elif entry.is_file(follow_symlinks=False):
+								self.files[rel] = entry
+								self.folded.setdefault(rel.lower(), rel)
+						except OSError:
+							continue
+			except OSError:
+				continue
+
+	def _legacy(self, segment: str) -> str:
+		legacy = self._legacy_names.get(segment)
+		if legacy is None:
+			legacy = safe_name_legacy(segment)
+			self._legacy_names[segment] = legacy
+		return legacy
+
+	def _lookup(self, rel: str) -> Optional[str]:
+		if rel in self.files:
+			return rel
+		if self.CASE_INSENSITIVE:
+			return self.folded.get(rel.lower())
+		return None
+
+	def path(self, rel: str) -> Path:
+		return self.output_dir / rel
+
+	def resolve_script(self, service: str, item: dict, normalized_path: list[str]) -> Optional[str]:
+		"""
+		relPath of the script's file: flat or folder form, current or legacy names.
+		Returns None if none exists.
+		"""
+		name = normalized_path[-1] if normalized_path else safe_name(str(item.get("name", "Script")))
+		ext = script_ext(str(item.get("class", "Script")))
+		service_dir = safe_name(service)
+		self._scan_service(service_dir)
+
+		dir_segments = [seg for seg in normalized_path[:-1] if seg]
+		prefix = "/".join([service_dir, *dir_segments])
+		candidates = [f"{prefix}/{name}{ext}", f"{prefix}/{name}/{name}{ext}"]
+
+		# Backward-compatibility: older exports used a stricter, lossy sanitizer.
+		legacy_dir_segments = [self._legacy(seg) for seg in dir_segments]
+		legacy_name = self._legacy(name)
+		if legacy_dir_segments != dir_segments or legacy_name != name:
+			legacy_prefix = "/".join([service_dir, *legacy_dir_segments])
+			candidates.append(f"{legacy_prefix}/{legacy_name}{ext}")
+			candidates.append(f"{legacy_prefix}/{legacy_name}/{legacy_name}{ext}")
+
+		found = [rel for rel in (self._lookup(c) for c in candidates) if rel is not None]
+		if not found:
+			return None
+		if len(found) == 1:
+			return found[0]
+
+		# Prefer the newest file if both exist (handles stale outputs)
+		def mtime(rel: str) -> float:
+			try:
+				METRICS.inc("rbx_parse_files_stat_total")
+				return self.files[rel].stat().st_mtime
+			except OSError:
+				return 0.0
+
+		found.sort(key=mtime, reverse=True)
+		return found[0]
+
+	def resolve_known(self, rel: Optional[str], service: str) -> Optional[str]:
+		"""`rel` (e.g. from the manifest's `paths` map) if it still exists under `service`."""
+		if rel is None:
+			return None
+		service_dir = safe_name(service)
+		if not rel.startswith(service_dir + "/"):
+			return None
+		self._scan_service(service_dir)
+		return self._lookup(rel)
+
+	def resolve_instance(self, service: str, item: dict, normalized_path: list[str]) -> Optional[str]:
+		"""relPath of the instance's `<Name>.<Class>` file, or None if it doesn't exist."""
+		self._scan_service(safe_name(service))
+		return self._lookup(instance_rel_path(service, item, normalized_path))
 
 
 def class_from_filename(filename: str) -> str:
@@ -568,14 +1604,209 @@ def safe_rel_path(path: Path, base: Path) -> str:
 	return str(path_resolved.relative_to(base_resolved)).replace("\\", "/")
 
 
-def write_script(
+# Content-addressed store under `<output>/.parser_store/`: `snapshots/<id>.json` maps every
+# relPath of one export to a blob id (the sha256 of the LF-normalized text). Text still in its
+# exported file isn't copied; `blobs/<aa>/<sha256>` receives it, once per content, when an
+# export or restore is about to overwrite that file. `export_blob_map` is the relPath -> blob
+# map of the latest export. Only the newest RBX_PARSE_STORE_KEEP snapshots are kept; blobs no
+# kept snapshot (or the manifest) refers to are then deleted. RBX_PARSE_STORE=0 turns it off.
+STORE_DIRNAME = ".parser_store"
+STORE_ENABLED = os.environ.get("RBX_PARSE_STORE", "1").strip().lower() not in ("0", "false", "no", "off")
+STORE_KEEP = max(1, int(os.environ.get("RBX_PARSE_STORE_KEEP", "10")))
+# id -> {"id", "createdAt", "files"} of every snapshot, so listing them doesn't parse each one.
+SNAPSHOT_INDEX_FILENAME = "snapshots.json"
+_SNAPSHOT_ID = re.compile(r"[0-9A-Za-z-]+")
+
+
+def blob_path(output_dir: Path, sha: str) -> Path:
+	return output_dir / STORE_DIRNAME / "blobs" / sha[:2] / sha
+
+
+def put_blob(output_dir: Path, sha: str, data: bytes) -> None:
+	"""Store `data` (LF-normalized, sha256 == `sha`) unless that blob already exists."""
+	path = blob_path(output_dir, sha)
+	METRICS.inc("rbx_parse_files_stat_total")
+	if path.exists():
+		return
+	path.parent.mkdir(parents=True, exist_ok=True)
+	tmp_path = path.with_name(f"{sha}.{os.getpid()}.{threading.get_ident()}.tmp")
+	tmp_path.write_bytes(data)
+	os.replace(tmp_path, path)
+	count_file_written(len(data))
+
+
+def keep_replaced_text(output_dir: Path, text: str) -> None:
+	"""Store the LF-normalized `text` of a file about to be overwritten; it was its only copy."""
+	if STORE_ENABLED:
+		put_blob(output_dir, sha256_text(text), text.encode("utf-8", errors="replace"))
+
+
+def read_blob(output_dir: Path, sha: str, rel: Optional[str] = None) -> Optional[str]:
+	"""A blob's text; blobs never copied into the store are read from file `rel` if it still matches."""
+	if not isinstance(sha, str) or len(sha) != 64 or any(c not in "0123456789abcdef" for c in sha):
+		return None
+	try:
+		data = blob_path(output_dir, sha).read_bytes()
+	except OSError:
+		if rel is None:
+			return None
+		try:
+			data = (output_dir / rel).read_bytes().replace(b"\r\n", b"\n")
+		except OSError:
+			return None
+		if hashlib.sha256(data).hexdigest() != sha:
+			return None
+	count_file_read(len(data))
+	return data.decode("utf-8", errors="replace")
+
+
+def export_blob_map(manifest: dict) -> dict[str, str]:
+	"""
+	relPath -> blob id of the folder's last export. A script's `scripts` hash is its blob id;
+	the `blobs` section only holds the ids that differ from the hash (instance files).
+	"""
+	files = dict(_manifest_section(manifest, "scripts"))
+	files.update(_manifest_section(manifest, "blobs"))
+	return files
+
+
+def _snapshots_dir(output_dir: Path) -> Path:
+	return output_dir / STORE_DIRNAME / "snapshots"
+
+
+def _read_snapshot_index(output_dir: Path) -> dict[str, dict]:
+	try:
+		obj = json.loads((output_dir / STORE_DIRNAME / SNAPSHOT_INDEX_FILENAME).read_text(encoding="utf-8"))
+	except (OSError, json.JSONDecodeError):
+		return {}
+	return {k: v for k, v in obj.items() if isinstance(v, dict)} if isinstance(obj, dict) else {}
+
+
+def _write_snapshot_index(output_dir: Path, index: dict[str, dict]) -> None:
+	path = output_dir / STORE_DIRNAME / SNAPSHOT_INDEX_FILENAME
+	tmp_path = path.with_name(f"{SNAPSHOT_INDEX_FILENAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+	text = json.dumps(index, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+	try:
+		tmp_path.write_text(text, encoding="utf-8")
+		os.replace(tmp_path, path)
+	except OSError:
+		# Rebuilt from the snapshot files on the next listing.
+		tmp_path.unlink(missing_ok=True)
+		return
+	count_file_written(len(text.encode("utf-8")))
+
+
+def create_export_snapshot(output_dir: Path, manifest: dict) -> Optional[dict]:
+	"""
+	Record the last export's blob map as a new snapshot (metadata only), then prune the
+	store. Call with the folder lock held.
+	"""
+	files = export_blob_map(manifest)
+	if not STORE_ENABLED or not files:
+		return None
+	created = datetime.now(timezone.utc)
+	snapshot_id = f"{created.strftime('%Y%m%dT%H%M%S%fZ')}-{uuid.uuid4().hex[:6]}"
+	snapshot = {"id": snapshot_id, "createdAt": created.isoformat(), "files": dict(files)}
+	directory = _snapshots_dir(output_dir)
+	directory.mkdir(parents=True, exist_ok=True)
+	path = directory / f"{snapshot_id}.json"
+	tmp_path = path.with_name(f"{snapshot_id}.json.tmp")
+	text = json.dumps(snapshot, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+	tmp_path.write_text(text, encoding="utf-8")
+	os.replace(tmp_path, path)
+	count_file_written(len(text.encode("utf-8")))
+	summary = {"id": snapshot_id, "createdAt": snapshot["createdAt"], "files": len(files)}
+	index = _read_snapshot_index(output_dir)
+	index[snapshot_id] = summary
+	_write_snapshot_index(output_dir, index)
+	prune_export_store(output_dir, manifest)
+	return summary
+
+
+def list_export_snapshots(output_dir: Path) -> list[dict]:
+	"""Summaries (`id`, `createdAt`, `files`) of the folder's snapshots, oldest first."""
+	try:
+		names = os.listdir(_snapshots_dir(output_dir))
+	except OSError:
+		return []
+	ids = sorted(n[: -len(".json")] for n in names if n.endswith(".json"))
+	index = _read_snapshot_index(output_dir)
+	missing = [snapshot_id for snapshot_id in ids if snapshot_id not in index]
+	for snapshot_id in missing:
+		# Snapshots written before the index existed.
+		snapshot = load_export_snapshot(output_dir, snapshot_id)
+		if snapshot is not None:
+			index[snapshot_id] = {"id": snapshot_id, "createdAt": snapshot.get("createdAt"), "files": len(snapshot["files"])}
+	if missing or len(index) != len(ids):
+		index = {snapshot_id: index[snapshot_id] for snapshot_id in ids if snapshot_id in index}
+		_write_snapshot_index(output_dir, index)
+	return [index[snapshot_id] for snapshot_id in ids if snapshot_id in index]
+
+
+def load_export_snapshot(output_dir: Path, snapshot_id) -> Optional[dict]:
+	if not isinstance(snapshot_id, str) or not _SNAPSHOT_ID.fullmatch(snapshot_id):
+		return None
+	try:
+		text = (_snapshots_dir(output_dir) / f"{snapshot_id}.json").read_text(encoding="utf-8")
+		obj = json.loads(text)
+	except (OSError, json.JSONDecodeError):
+		return None
+	count_file_read(len(text.encode("utf-8")))
+	return obj if isinstance(obj, dict) and isinstance(obj.get("files"), dict) else None
+
+
+def prune_export_store(output_dir: Path, manifest: dict) -> None:
+	"""
+	Delete snapshots past the newest STORE_KEEP, then blobs that neither a kept snapshot nor
+	`manifest` refers to. Call with the folder lock held.
+	"""
+	summaries = list_export_snapshots(output_dir)
+	if len(summaries) <= STORE_KEEP:
+		return
+	index = _read_snapshot_index(output_dir)
+	for summary in summaries[:-STORE_KEEP]:
+		(_snapshots_dir(output_dir) / f"{summary['id']}.json").unlink(missing_ok=True)
+		index.pop(summary["id"], None)
+	_write_snapshot_index(output_dir, index)
+	if active_export_session(output_dir) is not None:
+		# Its blobs are only referenced by its in-memory manifest; collect on a later prune.
+		return
+
+	referenced = set(export_blob_map(manifest).values())
+	for summary in summaries[-STORE_KEEP:]:
+		snapshot = load_export_snapshot(output_dir, summary["id"])
+		if snapshot is None:
+			# Can't tell what it needs; keep every blob.
+			return
+		referenced.update(snapshot["files"].values())
+	blobs_dir = output_dir / STORE_DIRNAME / "blobs"
+	try:
+		shards = list(os.scandir(blobs_dir))
+	except OSError:
+		return
+	for shard in shards:
+		if not shard.is_dir(follow_symlinks=False):
+			continue
+		try:
+			with os.scandir(shard.path) as it:
+				stale = [de.path for de in it if len(de.name) == 64 and de.name not in referenced]
+		except OSError:
+			continue
+		for path in stale:
+			try:
+				os.unlink(path)
+			except OSError:
+				pass
+
+
+def _write_script_file(
 	root_dir: Path,
 	service: str,
 	item: dict,
 	is_parent_script: bool,
 	normalized_path: list[str],
-	manifest: dict,
-):
+	recorded_hashes: Mapping[str, str],
+) -> dict:
 	name = normalized_path[-1] if normalized_path else safe_name(str(item.get("name", "Script")))
 	class_name = str(item.get("class", "Script"))
 	source = str(item.get("source", ""))
@@ -596,17 +1827,20 @@ def write_script(
 		file_path = current / f"{name}{ext}"
 
 	new_text = source
-	new_hash = sha256_text(new_text.replace("\r\n", "\n"))
+	normalized_text = new_text.replace("\r\n", "\n")
+	new_hash = sha256_text(normalized_text)
 
 	rel = safe_rel_path(file_path, root_dir)
+	identity = studio_identity(item, "script")
+	existing_text = None
 	existing_hash = None
-	recorded_hash = None
-	if isinstance(manifest.get("scripts"), dict):
-		recorded_hash = manifest["scripts"].get(rel)
+	recorded_hash = recorded_hashes.get(rel)
 
+	METRICS.inc("rbx_parse_files_stat_total")
 	if file_path.exists():
 		try:
 			existing_text = file_path.read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
+			count_file_read(len(existing_text.encode("utf-8")))
 			existing_hash = sha256_text(existing_text)
 		except OSError:
 			existing_hash = None
@@ -615,57 +1849,1232 @@ def write_script(
 		# - the manifest says the file matches the last export, or
 		# - the file already matches the new content.
 		if recorded_hash is not None and existing_hash is not None and recorded_hash != existing_hash:
-			manifest.setdefault("skipped", []).append({"type": "script", "relPath": rel, "reason": "local edits"})
-			return False
+			return {"type": "script", "relPath": rel, "reason": "local edits", "identity": identity}
 		if existing_hash is not None and existing_hash != new_hash and recorded_hash is None:
-			manifest.setdefault("skipped", []).append({"type": "script", "relPath": rel, "reason": "no manifest entry"})
-			return False
+			return {"type": "script", "relPath": rel, "reason": "no manifest entry", "identity": identity}
 
+	if existing_text is not None and existing_hash != new_hash:
+		keep_replaced_text(root_dir, existing_text)
 	file_path.write_text(new_text, encoding="utf-8")
-	manifest.setdefault("scripts", {})[rel] = new_hash
-	return True
+	count_file_written(len(new_text.encode("utf-8")))
+	notify_local_write(root_dir, file_path)
+	return {"type": "script", "relPath": rel, "hash": new_hash, "identity": identity}
 
 
-def write_instance(root_dir: Path, service: str, item: dict, normalized_path: list[str], manifest: dict):
-	raw_tree = item.get("tree") or {}
+def render_instance_tree(raw_tree) -> tuple[str, str]:
+	"""The file text and manifest hash an exported instance tree is written with."""
 	try:
 		tree = canonicalize_instance_tree(raw_tree)
 	except Exception:
 		tree = {"error": "invalid tree", "raw": raw_tree}
-	path = instance_local_file_path(root_dir, service, item, normalized_path)
 	try:
 		text = json.dumps(tree, ensure_ascii=False, sort_keys=True, indent=2) + "\n"
 	except TypeError:
 		text = json.dumps({"error": "non-serializable tree"}, ensure_ascii=False, sort_keys=True, indent=2) + "\n"
+	return text, instance_tree_hash(tree)
+
+
+def local_instance_hash(raw: str) -> tuple[str, str]:
+	"""(sha256 of the raw text, canonical tree hash) of a local instance file; raises like json.loads."""
+	return sha256_text(raw), instance_tree_hash(canonicalize_instance_tree(json.loads(raw)))
+
+
+def prepare_instance_write(args: tuple) -> dict:
+	"""
+	CPU part of `_write_instance_file` for one item, run ahead of the write (possibly in a
+	worker process): the rendered text and hash, plus the canonical hash of the file
+	currently on disk. The write only trusts the latter if the file text is unchanged.
+	"""
+	raw_tree, path = args
+	text, new_hash = render_instance_tree(raw_tree)
+	prepared = {"text": text, "hash": new_hash, "existing": None}
+	try:
+		prepared["existing"] = local_instance_hash(Path(path).read_text(encoding="utf-8", errors="replace"))
+	except (OSError, json.JSONDecodeError, TypeError):
+		pass
+	return prepared
+
 
-	normalized = json.dumps(tree, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-	new_hash = sha256_text(normalized)
+def _write_instance_file(
+	root_dir: Path,
+	service: str,
+	item: dict,
+	normalized_path: list[str],
+	recorded_hashes: Mapping[str, str],
+	prepared: Optional[dict] = None,
+) -> dict:
+	if prepared is None:
+		text, new_hash = render_instance_tree(item.get("tree") or {})
+	else:
+		text, new_hash = prepared["text"], prepared["hash"]
+	path = instance_local_file_path(root_dir, service, item, normalized_path)
 	rel = safe_rel_path(path, root_dir)
+	identity = studio_identity(item, "instance")
+	raw = None
 	existing_hash = None
-	recorded_hash = None
-	if isinstance(manifest.get("instances"), dict):
-		recorded_hash = manifest["instances"].get(rel)
+	recorded_hash = recorded_hashes.get(rel)
+	# Hash of the file in the scheme `recorded_hash` was written with (legacy entries lack the prefix).
+	existing_recorded_hash = None
 
+	METRICS.inc("rbx_parse_files_stat_total")
 	if path.exists():
 		try:
 			raw = path.read_text(encoding="utf-8", errors="replace")
-			obj = json.loads(raw)
-			existing_hash = sha256_text(json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")))
+			count_file_read(len(raw.encode("utf-8")))
+			existing = prepared["existing"] if prepared is not None else None
+			if existing is not None and existing[0] == sha256_text(raw):
+				existing_hash = existing[1]
+			else:
+				existing_hash = local_instance_hash(raw)[1]
+			existing_recorded_hash = existing_hash
+			if recorded_hash is not None and not recorded_hash.startswith(INSTANCE_HASH_PREFIX):
+				existing_recorded_hash = sha256_text(
+					json.dumps(json.loads(raw), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+				)
 		except (OSError, json.JSONDecodeError, TypeError):
 			existing_hash = None
+			existing_recorded_hash = None
 
-		if recorded_hash is not None and existing_hash is not None and recorded_hash != existing_hash:
-			manifest.setdefault("skipped", []).append({"type": "instance", "relPath": rel, "reason": "local edits"})
-			return False
+		if recorded_hash is not None and existing_recorded_hash is not None and recorded_hash != existing_recorded_hash:
+			return {"type": "instance", "relPath": rel, "reason": "local edits", "identity": identity}
 		if existing_hash is not None and existing_hash != new_hash and recorded_hash is None:
-			manifest.setdefault("skipped", []).append({"type": "instance", "relPath": rel, "reason": "no manifest entry"})
-			return False
-
+			return {"type": "instance", "relPath": rel, "reason": "no manifest entry", "identity": identity}
+
+	blob = None
+	if STORE_ENABLED:
+		blob = sha256_text(text)
+		if raw is not None and sha256_text(raw) != blob:
+			keep_replaced_text(root_dir, raw)
+	path.parent.mkdir(parents=True, exist_ok=True)
 	path.write_text(text, encoding="utf-8")
-	manifest.setdefault("instances", {})[rel] = new_hash
+	count_file_written(len(text.encode("utf-8")))
+	notify_local_write(root_dir, path)
+	return {"type": "instance", "relPath": rel, "hash": new_hash, "identity": identity, "blob": blob}
+
+
+def studio_identity(item: dict, kind: str) -> dict:
+	"""The Studio side of a `paths` manifest entry: kind, class, Studio path and optional instance id."""
+	identity = {"kind": kind, "class": str(item.get("class", ""))}
+	path = item.get("path")
+	if isinstance(path, list) and path and all(isinstance(seg, str) for seg in path):
+		identity["path"] = list(path)
+	instance_id = item.get("instanceId")
+	if isinstance(instance_id, str) and instance_id:
+		identity["instanceId"] = instance_id
+	return identity
+
+
+def apply_write_result(manifest: dict, result: dict) -> bool:
+	section = "scripts" if result["type"] == "script" else "instances"
+	identity = result.get("identity")
+	if isinstance(identity, dict) and "path" in identity:
+		# Recorded even for skipped writes: the file still belongs to that Studio object.
+		# Re-inserted so that, of two files claiming one Studio object, the latest wins in `ManifestPathMap`.
+		paths = manifest.setdefault("paths", {})
+		paths.pop(result["relPath"], None)
+		paths[result["relPath"]] = identity
+	if result.get("blob"):
+		# What this export wrote to the file (see `export_blob_map`); skipped files keep the last written blob.
+		manifest.setdefault("blobs", {})[result["relPath"]] = result["blob"]
+	elif result["type"] == "script" and "reason" not in result:
+		# Scripts' blob ids are their hashes; drop entries written before that.
+		_manifest_section(manifest, "blobs").pop(result["relPath"], None)
+	if "reason" in result:
+		METRICS.inc("rbx_parse_skips_total", reason=result["reason"])
+		manifest.setdefault("skipped", []).append(
+			{"type": result["type"], "relPath": result["relPath"], "reason": result["reason"]}
+		)
+		return False
+	manifest.setdefault(section, {})[result["relPath"]] = result["hash"]
 	return True
 
 
+def _manifest_section(manifest: dict, section: str) -> dict:
+	value = manifest.get(section)
+	return value if isinstance(value, dict) else {}
+
+
+def write_script(
+	root_dir: Path,
+	service: str,
+	item: dict,
+	is_parent_script: bool,
+	normalized_path: list[str],
+	manifest: dict,
+):
+	result = _write_script_file(
+		root_dir, service, item, is_parent_script, normalized_path, _manifest_section(manifest, "scripts")
+	)
+	return apply_write_result(manifest, result)
+
+
+def write_instance(root_dir: Path, service: str, item: dict, normalized_path: list[str], manifest: dict):
+	result = _write_instance_file(root_dir, service, item, normalized_path, _manifest_section(manifest, "instances"))
+	return apply_write_result(manifest, result)
+
+
+# Parallel write stage for /upload and /upload_instances. Per-file read/hash/compare/write
+# is mostly syscalls, so a small thread pool hides filesystem latency (network drives).
+WRITE_WORKERS = max(1, int(os.environ.get("RBX_PARSE_WRITE_WORKERS", "8")))
+_write_pool: Optional[ThreadPoolExecutor] = None
+_write_pool_lock = threading.Lock()
+
+
+def _get_write_pool() -> ThreadPoolExecutor:
+	global _write_pool
+	with _write_pool_lock:
+		if _write_pool is None:
+			_write_pool = ThreadPoolExecutor(max_workers=WRITE_WORKERS, thread_name_prefix="write")
+		return _write_pool
+
+
+# (target key, manifest section, job); the job gets the recorded hashes and returns a write result.
+WriteJob = tuple[str, str, Callable[[Mapping[str, str]], dict]]
+
+
+def run_write_pipeline(manifest: dict, jobs: list[WriteJob]) -> tuple[int, int]:
+	"""
+	Run write jobs on the write pool and merge their results into `manifest`.
+
+	Jobs with the same target key (compared case-insensitively) run in order on one
+	worker and see each other's writes, exactly like the old serial loop. Results are
+	merged in input order, so manifest entries and skip records are deterministic.
+	"""
+	groups: dict[str, list[int]] = {}
+	for idx, (key, _section, _job) in enumerate(jobs):
+		groups.setdefault(key.lower(), []).append(idx)
+
+	sections = {name: _manifest_section(manifest, name) for name in ("scripts", "instances")}
+
+	def run_group(indices: list[int]) -> list[tuple[int, dict]]:
+		written: dict[str, str] = {}
+		out: list[tuple[int, dict]] = []
+		for idx in indices:
+			_key, section, job = jobs[idx]
+			result = job(ChainMap(written, sections[section]))
+			if "hash" in result:
+				written[result["relPath"]] = result["hash"]
+			out.append((idx, result))
+		return out
+
+	results: list[Optional[dict]] = [None] * len(jobs)
+	error: Optional[BaseException] = None
+	if WRITE_WORKERS <= 1 or len(groups) <= 1:
+		for indices in groups.values():
+			for idx, result in run_group(indices):
+				results[idx] = result
+	else:
+		pool = _get_write_pool()
+		futures = [pool.submit(run_group, indices) for indices in groups.values()]
+		for future in futures:
+			try:
+				for idx, result in future.result():
+					results[idx] = result
+			except Exception as e:
+				# Keep merging what did get written so the manifest matches the disk.
+				error = error or e
+
+	wrote = 0
+	skipped = 0
+	for result in results:
+		if result is None:
+			continue
+		if apply_write_result(manifest, result):
+			wrote += 1
+		else:
+			skipped += 1
+	if error is not None:
+		raise error
+	return wrote, skipped
+
+
+# Process pool for instance canonicalization (/upload_instances, /diff_instances).
+# Canonicalizing, hashing and comparing trees is pure-Python work that holds the GIL, so
+# big "Include Objects" requests can spread it over worker processes. 0 turns it off.
+CANON_WORKERS = max(0, int(os.environ.get("RBX_PARSE_CANON_WORKERS", "0")))
+# Requests with fewer instances than this stay in process: pickling would cost more.
+CANON_MIN_ITEMS = max(1, int(os.environ.get("RBX_PARSE_CANON_MIN_ITEMS", "64")))
+_canon_pool: Optional[ProcessPoolExecutor] = None
+_canon_pool_lock = threading.Lock()
+
+
+def _get_canon_pool() -> ProcessPoolExecutor:
+	global _canon_pool
+	with _canon_pool_lock:
+		if _canon_pool is None:
+			# spawn, not fork: the server process has watcher and writer threads running.
+			_canon_pool = ProcessPoolExecutor(
+				max_workers=CANON_WORKERS, mp_context=multiprocessing.get_context("spawn")
+			)
+		return _canon_pool
+
+
+def _discard_canon_pool(pool: ProcessPoolExecutor) -> None:
+	global _canon_pool
+	with _canon_pool_lock:
+		if _canon_pool is pool:
+			_canon_pool = None
+	pool.shutdown(wait=False, cancel_futures=True)
+
+
+def canon_pool_enabled(count: int) -> bool:
+	return CANON_WORKERS > 0 and count >= CANON_MIN_ITEMS
+
+
+def _run_canon_batch(fn: Callable, batch: list) -> list:
+	return [fn(args) for args in batch]
+
+
+def map_canon(fn: Callable, items: list) -> list:
+	"""
+	`[fn(args) for args in items]`, on the canonicalization pool when the list is big
+	enough. Items are sent as contiguous batches (about two per worker) so each worker
+	unpickles a few large messages; results come back in input order. `fn` must be a
+	module-level function. Falls back to in-process work if the pool breaks.
+	"""
+	if not canon_pool_enabled(len(items)):
+		return _run_canon_batch(fn, items)
+
+	size = max(1, -(-len(items) // (CANON_WORKERS * 2)))
+	batches = [items[i : i + size] for i in range(0, len(items), size)]
+	pool = _get_canon_pool()
+	try:
+		futures = [pool.submit(_run_canon_batch, fn, batch) for batch in batches]
+		out: list = []
+		for future in futures:
+			out.extend(future.result())
+		return out
+	except BrokenProcessPool:
+		_discard_canon_pool(pool)
+		return _run_canon_batch(fn, items)
+
+
+# Local file index (backs /local_index and /local_index_instances).
+#
+# Built once per output dir. On Linux an inotify watcher keeps it current and queries only
+# apply pending changes. Elsewhere nothing runs while idle: each query rescans (a stat walk
+# that reuses unchanged entries) and a /changes long-poll rescans every poll interval.
+LOCAL_INDEX_POLL_SECONDS = float(os.environ.get("RBX_PARSE_INDEX_POLL_SECONDS", "2"))
+# "auto" (inotify when available, else polling), "inotify", "poll" (rescan on queries and while
+# /changes waits) or "off" (rescan on queries, no /changes feed).
+# Other worker processes' writes only reach this process's index through the watcher, so
+# multi-process mode rescans per request unless a watcher is asked for explicitly.
+LOCAL_INDEX_WATCH = os.environ.get("RBX_PARSE_INDEX_WATCH", "off" if MULTIPROCESS else "auto").strip().lower()
+INDEX_IGNORED_FILENAMES = ("skipped.txt", MANIFEST_LOCK_FILENAME)
+# Every change the index applies is logged for the /changes feed; cursors older than the
+# log (or from another server run) are answered with `reset`.
+CHANGE_LOG_SIZE = 10000
+
+
+class LocalIndexEntry:
+	__slots__ = ("rel", "service", "kind", "class_name", "name", "size", "mtime_ns", "header")
+
+	def __init__(self, rel: str, service: str, kind: str, class_name: str, name: str, size: int, mtime_ns: int):
+		self.rel = rel
+		self.service = service
+		self.kind = kind
+		self.class_name = class_name
+		self.name = name
+		self.size = size
+		self.mtime_ns = mtime_ns
+		# For instance files: {"class", "name"} from the JSON body, or None if it isn't an instance tree.
+		self.header: Optional[dict] = None
+
+
+def _scan_instance_header(path: Path) -> Optional[dict]:
+	"""
+	Top-level class/name of a large instance file without parsing it: exported files are
+	pretty-printed with two-space indent, so top-level keys are the lines at that depth.
+	"""
+	found: dict = {}
+	try:
+		with path.open("r", encoding="utf-8", errors="replace") as f:
+			if f.readline().strip() != "{":
+				return None
+			for line in f:
+				if not line.startswith('  "') or line.startswith('   '):
+					continue
+				key, sep, value = line.strip().rstrip(",").partition(": ")
+				if sep and key in ('"class"', '"name"'):
+					found[json.loads(key)] = json.loads(value)
+					if len(found) == 2:
+						break
+	except (OSError, json.JSONDecodeError):
+		return None
+	return found if len(found) == 2 else None
+
+
+def _read_instance_header(path: Path, size: int) -> Optional[dict]:
+	if size > 900 * 1024:
+		return _scan_instance_header(path)
+	try:
+		text = path.read_text(encoding="utf-8", errors="replace")
+		count_file_read(len(text.encode("utf-8")))
+		obj = json.loads(text)
+	except (OSError, json.JSONDecodeError):
+		return None
+	if not isinstance(obj, dict) or "class" not in obj or "name" not in obj:
+		return None
+	return {"class": obj.get("class"), "name": obj.get("name")}
+
+
+class LocalFileIndex:
+	def __init__(self, output_dir: Path):
+		self.output_dir = output_dir
+		self.lock = threading.Lock()
+		self.entries: dict[str, LocalIndexEntry] = {}
+		self.dirty: set[str] = set()
+		self.needs_rescan = True
+		self.watcher = None
+		# Change feed: (seq, rel, "added" | "modified" | "deleted"), signalled on `changed`.
+		self.changed = threading.Condition(self.lock)
+		self.epoch = uuid.uuid4().hex[:8]
+		self.seq = 0
+		self.change_log: deque[tuple[int, str, str]] = deque(maxlen=CHANGE_LOG_SIZE)
+		# The first full scan is the baseline; it isn't logged as "added".
+		self.built = False
+
+	def _scan_file(self, abs_path: str, rel: str, st: os.stat_result) -> Optional[LocalIndexEntry]:
+		parts = rel.split("/")
+		if len(parts) < 2 or parts[0].startswith("."):
+			return None
+		filename = parts[-1]
+		if filename.lower() in INDEX_IGNORED_FILENAMES:
+			return None
+
+		previous = self.entries.get(rel)
+		if previous is not None and previous.size == st.st_size and previous.mtime_ns == st.st_mtime_ns:
+			return previous
+
+		if filename.lower().endswith(".lua"):
+			return LocalIndexEntry(
+				rel,
+				parts[0],
+				"script",
+				class_from_filename(filename),
+				script_name_from_filename(filename),
+				st.st_size,
+				st.st_mtime_ns,
+			)
+
+		p = Path(abs_path)
+		class_name = p.suffix[1:] if p.suffix.startswith(".") else ""
+		if not class_name or not p.stem:
+			return None
+		entry = LocalIndexEntry(rel, parts[0], "instance", class_name, p.stem, st.st_size, st.st_mtime_ns)
+		entry.header = _read_instance_header(p, st.st_size)
+		return entry
+
+	def _walk(self, abs_dir: str, rel_prefix: str, out: dict[str, LocalIndexEntry]) -> None:
+		try:
+			it = os.scandir(abs_dir)
+		except OSError:
+			return
+		with it:
+			for de in it:
+				rel = f"{rel_prefix}{de.name}"
+				try:
+					if de.is_dir(follow_symlinks=False):
+						if not rel_prefix and de.name.startswith("."):
+							continue
+						self._walk(de.path, rel + "/", out)
+					elif de.is_file(follow_symlinks=False):
+						METRICS.inc("rbx_parse_files_stat_total")
+						entry = self._scan_file(de.path, rel, de.stat())
+						if entry is not None:
+							out[rel] = entry
+				except OSError:
+					continue
+
+	def _walk_all(self) -> dict[str, LocalIndexEntry]:
+		start = time.perf_counter()
+		found: dict[str, LocalIndexEntry] = {}
+		self._walk(str(self.output_dir), "", found)
+		METRICS.observe("rbx_parse_index_scan_seconds", time.perf_counter() - start)
+		return found
+
+	def _log_change(self, rel: str, old: Optional[LocalIndexEntry], new: Optional[LocalIndexEntry]) -> None:
+		if old is new:
+			return
+		if old is None:
+			change = "added"
+		elif new is None:
+			change = "deleted"
+		elif old.size == new.size and old.mtime_ns == new.mtime_ns:
+			return
+		else:
+			change = "modified"
+		self.seq += 1
+		self.change_log.append((self.seq, rel, change))
+
+	def _replace_entries(self, found: dict[str, LocalIndexEntry]) -> None:
+		if self.built:
+			for rel, entry in found.items():
+				self._log_change(rel, self.entries.get(rel), entry)
+			for rel, entry in self.entries.items():
+				if rel not in found:
+					self._log_change(rel, entry, None)
+		self.entries = found
+		self.built = True
+
+	def _refresh_path(self, rel: str) -> None:
+		abs_path = os.path.join(str(self.output_dir), *rel.split("/"))
+		prefix = rel + "/"
+		METRICS.inc("rbx_parse_files_stat_total")
+		try:
+			st = os.lstat(abs_path)
+		except OSError:
+			st = None
+		if st is not None and not (stat.S_ISDIR(st.st_mode) or stat.S_ISREG(st.st_mode)):
+			# Symlinks (and other special files) aren't indexed, same as in `_walk`.
+			st = None
+
+		if st is not None and not stat.S_ISDIR(st.st_mode):
+			entry = self._scan_file(abs_path, rel, st)
+			self._log_change(rel, self.entries.get(rel), entry)
+			if entry is None:
+				self.entries.pop(rel, None)
+			else:
+				self.entries[rel] = entry
+			return
+
+		# Directory created/removed/moved (or file removed): resync everything under it.
+		removed: dict[str, LocalIndexEntry] = {}
+		if rel in self.entries:
+			removed[rel] = self.entries.pop(rel)
+		for k in [k for k in self.entries if k.startswith(prefix)]:
+			removed[k] = self.entries.pop(k)
+		found: dict[str, LocalIndexEntry] = {}
+		if st is not None:
+			self._walk(abs_path, prefix, found)
+			self.entries.update(found)
+		for k, entry in found.items():
+			self._log_change(k, removed.get(k), entry)
+		for k, entry in removed.items():
+			if k not in found:
+				self._log_change(k, entry, None)
+
+	def mark_dirty(self, rel: Optional[str]) -> None:
+		with self.lock:
+			if rel is None:
+				self.needs_rescan = True
+			else:
+				self.dirty.add(rel)
+			self.changed.notify_all()
+
+	def _apply_pending(self) -> None:
+		"""Apply a pending rescan or dirty paths. Call with `self.lock` held."""
+		if self.needs_rescan:
+			self._replace_entries(self._walk_all())
+			self.needs_rescan = False
+			self.dirty.clear()
+		elif self.dirty:
+			for rel in sorted(self.dirty):
+				self._refresh_path(rel)
+			self.dirty.clear()
+
+	def snapshot(self) -> list[LocalIndexEntry]:
+		with self.lock:
+			if self.watcher is None:
+				self.needs_rescan = True
+			self._apply_pending()
+			return sorted(self.entries.values(), key=lambda e: e.rel)
+
+	def cursor(self) -> str:
+		with self.lock:
+			if self.watcher is None:
+				self.needs_rescan = True
+			self._apply_pending()
+			return f"{self.epoch}:{self.seq}"
+
+	def wait_for_changes(
+		self, since: int, timeout: float
+	) -> Optional[tuple[list[tuple[str, str, Optional[LocalIndexEntry]]], int]]:
+		"""
+		Block until something changed after `since` (or `timeout` passes) and return
+		([(rel, change, entry or None)], seq), one item per path. None if `since` isn't
+		covered by the log anymore.
+		"""
+		deadline = time.monotonic() + timeout
+		# Without a watcher nothing wakes us up: rescan every poll interval instead.
+		polling = self.watcher is None
+		with self.lock:
+			while True:
+				if polling:
+					self.needs_rescan = True
+				self._apply_pending()
+				if since > self.seq or (self.change_log and since < self.change_log[0][0] - 1):
+					return None
+				remaining = deadline - time.monotonic()
+				if self.seq > since or remaining <= 0:
+					break
+				self.changed.wait(min(remaining, LOCAL_INDEX_POLL_SECONDS) if polling else remaining)
+
+			# Collapse to one change per path: first and last change decide.
+			first: dict[str, str] = {}
+			last: dict[str, str] = {}
+			for seq, rel, change in self.change_log:
+				if seq > since:
+					first.setdefault(rel, change)
+					last[rel] = change
+			out: list[tuple[str, str, Optional[LocalIndexEntry]]] = []
+			for rel, change in last.items():
+				if first[rel] == "added":
+					if change == "deleted":
+						continue
+					change = "added"
+				elif change == "added":
+					change = "modified"
+				out.append((rel, change, self.entries.get(rel)))
+			return out, self.seq
+
+
+class _InotifyWatcher:
+	IN_MODIFY = 0x00000002
+	IN_ATTRIB = 0x00000004
+	IN_CLOSE_WRITE = 0x00000008
+	IN_MOVED_FROM = 0x00000040
+	IN_MOVED_TO = 0x00000080
+	IN_CREATE = 0x00000100
+	IN_DELETE = 0x00000200
+	IN_DELETE_SELF = 0x00000400
+	IN_MOVE_SELF = 0x00000800
+	IN_Q_OVERFLOW = 0x00004000
+	IN_IGNORED = 0x00008000
+	IN_ISDIR = 0x40000000
+	IN_CLOEXEC = 0o2000000
+	WATCH_MASK = (
+		IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+	)
+
+	def __init__(self, index: LocalFileIndex):
+		import ctypes
+		import ctypes.util
+
+		self.index = index
+		self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+		self.fd = self.libc.inotify_init1(self.IN_CLOEXEC)
+		if self.fd < 0:
+			raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+		self.wd_to_rel: dict[int, str] = {}
+		self._add_tree(str(index.output_dir), "")
+		threading.Thread(target=self._run, name=f"index-inotify:{index.output_dir.name}", daemon=True).start()
+
+	def _add_watch(self, abs_dir: str, rel: str) -> None:
+		import ctypes
+
+		wd = self.libc.inotify_add_watch(self.fd, os.fsencode(abs_dir), self.WATCH_MASK)
+		if wd < 0:
+			raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {abs_dir}")
+		self.wd_to_rel[wd] = rel
+
+	def _add_tree(self, abs_dir: str, rel: str) -> None:
+		self._add_watch(abs_dir, rel)
+		try:
+			with os.scandir(abs_dir) as it:
+				for de in it:
+					if de.is_dir(follow_symlinks=False) and not (not rel and de.name.startswith(".")):
+						self._add_tree(de.path, f"{rel}/{de.name}" if rel else de.name)
+		except OSError:
+			pass
+
+	def _run(self) -> None:
+		import struct
+
+		header = struct.Struct("iIII")
+		while True:
+			try:
+				buf = os.read(self.fd, 64 * 1024)
+			except OSError:
+				self.index.mark_dirty(None)
+				return
+			offset = 0
+			while offset + header.size <= len(buf):
+				wd, mask, _cookie, name_len = header.unpack_from(buf, offset)
+				raw_name = buf[offset + header.size : offset + header.size + name_len].split(b"\0", 1)[0]
+				offset += header.size + name_len
+
+				if mask & self.IN_Q_OVERFLOW:
+					self.index.mark_dirty(None)
+					continue
+				if mask & self.IN_IGNORED:
+					self.wd_to_rel.pop(wd, None)
+					continue
+				parent = self.wd_to_rel.get(wd)
+				if parent is None:
+					continue
+				name = os.fsdecode(raw_name)
+				rel = f"{parent}/{name}" if parent and name else (name or parent)
+				if not rel:
+					# The output dir itself went away or moved.
+					self.index.mark_dirty(None)
+					continue
+				if (mask & self.IN_ISDIR) and (mask & (self.IN_CREATE | self.IN_MOVED_TO)):
+					try:
+						self._add_tree(os.path.join(str(self.index.output_dir), *rel.split("/")), rel)
+					except OSError:
+						self.index.mark_dirty(None)
+				self.index.mark_dirty(rel)
+
+
+_local_indexes: dict[Path, LocalFileIndex] = {}
+_local_indexes_lock = threading.Lock()
+
+
+def _start_index_watcher(index: LocalFileIndex) -> None:
+	if LOCAL_INDEX_WATCH == "off":
+		return
+	if LOCAL_INDEX_WATCH in ("auto", "inotify") and hasattr(os, "uname") and os.uname().sysname == "Linux":
+		try:
+			index.watcher = _InotifyWatcher(index)
+			return
+		except OSError:
+			# e.g. fs.inotify.max_user_watches exhausted; polling still keeps the index usable.
+			pass
+	# No watcher: queries and /changes long-polls rescan, so an idle server does no work.
+
+
+def get_local_index(output_dir: Path) -> LocalFileIndex:
+	with _local_indexes_lock:
+		index = _local_indexes.get(output_dir)
+		if index is None:
+			index = LocalFileIndex(output_dir)
+			_local_indexes[output_dir] = index
+			# Start watching before the initial scan so nothing written in between is missed.
+			_start_index_watcher(index)
+	return index
+
+
+def notify_local_write(output_dir: Path, path: Path) -> None:
+	# Server-side writes are applied to the index immediately instead of waiting for the watcher.
+	with _local_indexes_lock:
+		index = _local_indexes.get(output_dir)
+	if index is None:
+		return
+	try:
+		index.mark_dirty(safe_rel_path(path, output_dir))
+	except ValueError:
+		pass
+
+
+def upload_scripts(
+	output_dir: Path,
+	data: dict,
+	manifest: dict,
+	known_paths: Optional[dict[str, set[tuple[str, ...]]]] = None,
+) -> tuple[int, int]:
+	records = iter_records_from_payload(data)
+	parent_by_service = parent_paths_by_service(records, known_paths)
+	jobs: list[WriteJob] = []
+	for service, item, normalized in records:
+		is_parent = tuple(normalized) in parent_by_service.get(service, set())
+		key = str(local_file_path(output_dir, service, item, normalized, is_parent))
+		jobs.append((key, "scripts", partial(_write_script_file, output_dir, service, item, is_parent, normalized)))
+	return run_write_pipeline(manifest, jobs)
+
+
+def upload_instance_items(output_dir: Path, instances: list, manifest: dict) -> tuple[int, int]:
+	records: list[tuple[str, dict, list[str]]] = []
+	for item in instances:
+		if not isinstance(item, dict):
+			continue
+		service = str(item.get("service", "UnknownService"))
+		records.append((service, item, normalize_instance_path(service, item)))
+
+	prepared: list[Optional[dict]] = [None] * len(records)
+	if canon_pool_enabled(len(records)):
+		prepared = map_canon(
+			prepare_instance_write,
+			[
+				(item.get("tree") or {}, str(instance_local_file_path(output_dir, service, item, normalized)))
+				for service, item, normalized in records
+			],
+		)
+
+	jobs: list[WriteJob] = []
+	for (service, item, normalized), ready in zip(records, prepared):
+		key = "/".join([safe_name(service), *normalized]) + "." + safe_name(str(item.get("class", "Folder")))
+		job = partial(_write_instance_file, output_dir, service, item, normalized, prepared=ready)
+		jobs.append((key, "instances", job))
+	return run_write_pipeline(manifest, jobs)
+
+
+# require() dependency graph (/dependencies, /dependents). Requires are found with a small
+# tokenizer and resolved statically: `script`, `game`/`workspace` and locals assigned from
+# those, followed by `.Parent`, `.X`, `["X"]`, `:WaitForChild("X")`, `:FindFirstChild("X")`
+# and `game:GetService("X")`. Anything else (computed names, function results) is kept as an
+# unresolved require with its source text.
+_LUA_TOKEN = re.compile(
+	r"""
+	(?P<comment>--\[(?P<ceq>=*)\[.*?\](?P=ceq)\]|--[^\n]*)
+	|(?P<longstr>\[(?P<seq>=*)\[.*?\](?P=seq)\])
+	|(?P<str>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+	|(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+	|(?P<num>[0-9][0-9A-Za-z_.]*)
+	|(?P<op>==|~=|<=|>=|\.\.\.?|::|[^\s\w])
+	""",
+	re.VERBOSE | re.DOTALL,
+)
+_LUA_STRING_ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"', "'": "'"}
+_CHILD_METHODS = ("WaitForChild", "FindFirstChild")
+_SERVICE_METHODS = ("GetService", "FindService")
+# Roots a chain can start from besides `script` and locals; [] is `game`.
+_GLOBAL_ROOTS = {"game": [], "workspace": ["Workspace"], "Workspace": ["Workspace"]}
+RequireToken = tuple[str, str, int, int]
+
+
+def _lua_tokens(text: str) -> list[RequireToken]:
+	"""(kind, value, start, end) of every token except comments; string values are unquoted."""
+	tokens: list[RequireToken] = []
+	for m in _LUA_TOKEN.finditer(text):
+		kind = m.lastgroup
+		if kind == "comment":
+			continue
+		if kind == "str":
+			value = re.sub(r"\\(.)", lambda e: _LUA_STRING_ESCAPES.get(e.group(1), e.group(1)), m.group()[1:-1])
+		elif kind == "longstr":
+			value = m.group()[len(m.group("seq")) + 2 : -len(m.group("seq")) - 2]
+			kind = "str"
+		else:
+			value = m.group()
+		tokens.append((kind, value, m.start(), m.end()))
+	return tokens
+
+
+def scan_requires(text: str, script_path: list[str]) -> list[dict]:
+	"""
+	`require(...)` calls in `text`, as {"path": Studio path or None, "line", "expr"}, for the
+	script at `script_path` (whose first segment is its service).
+	"""
+	if "require" not in text:
+		return []
+	tokens = _lua_tokens(text)
+	count = len(tokens)
+	newlines = [m.start() for m in re.finditer("\n", text)]
+	aliases: dict[str, list[str]] = {}
+
+	def is_op(i: int, value: str) -> bool:
+		return i < count and tokens[i][0] == "op" and tokens[i][1] == value
+
+	def single_string_arg(i: int) -> Optional[str]:
+		# `( "X" )` or `( "X", timeout )` starting at the "(" at i.
+		if i + 2 < count and tokens[i + 1][0] == "str" and (is_op(i + 2, ")") or is_op(i + 2, ",")):
+			return tokens[i + 1][1]
+		return None
+
+	def skip_call(i: int) -> int:
+		# Index after the ")" matching the "(" at i.
+		depth = 0
+		while i < count:
+			if tokens[i][0] == "op" and tokens[i][1] in ("(", "{", "["):
+				depth += 1
+			elif tokens[i][0] == "op" and tokens[i][1] in (")", "}", "]"):
+				depth -= 1
+				if depth == 0:
+					return i + 1
+			i += 1
+		return count
+
+	def chain(i: int) -> tuple[Optional[list[str]], int]:
+		"""Studio path of the instance expression starting at token i (None if unknown) and the index after it."""
+		if i >= count or tokens[i][0] != "name":
+			return None, i
+		name = tokens[i][1]
+		if name == "script":
+			path: Optional[list[str]] = list(script_path)
+		elif name in aliases:
+			path = list(aliases[name])
+		elif name in _GLOBAL_ROOTS:
+			path = list(_GLOBAL_ROOTS[name])
+		else:
+			path = None
+		i += 1
+		while i < count:
+			if is_op(i, ".") and i + 1 < count and tokens[i + 1][0] == "name":
+				child = tokens[i + 1][1]
+				if path is not None:
+					path = (path[:-1] or None) if child == "Parent" else path + [child]
+				i += 2
+			elif is_op(i, "[") and i + 2 < count and tokens[i + 1][0] == "str" and is_op(i + 2, "]"):
+				path = path + [tokens[i + 1][1]] if path is not None else None
+				i += 3
+			elif is_op(i, ":") and i + 2 < count and tokens[i + 1][0] == "name" and is_op(i + 2, "("):
+				method = tokens[i + 1][1]
+				arg = single_string_arg(i + 2)
+				if path is None or arg is None:
+					path = None
+				elif method in _CHILD_METHODS:
+					path = path + [arg]
+				elif method in _SERVICE_METHODS and path == []:
+					path = [arg]
+				else:
+					path = None
+				i = skip_call(i + 2)
+			else:
+				break
+		# A bare `game` is not an instance a script can require.
+		return (path or None), i
+
+	requires: list[dict] = []
+	i = 0
+	while i < count:
+		kind, value, start, _end = tokens[i]
+		if kind != "name" or (i > 0 and tokens[i - 1][0] == "op" and tokens[i - 1][1] in (".", ":")):
+			i += 1
+			continue
+		if value == "local" and i + 2 < count and tokens[i + 1][0] == "name" and is_op(i + 2, "="):
+			alias = tokens[i + 1][1]
+			path, after = chain(i + 3)
+			# Only a whole right-hand side counts (`local X = script.Parent or y` is not an alias).
+			if path is not None and not (after < count and tokens[after][0] == "op" and tokens[after][1] not in (";", ")")):
+				aliases[alias] = path
+			else:
+				aliases.pop(alias, None)
+			# The right-hand side is scanned as usual (it may be a require).
+			i += 3
+			continue
+		if value == "require" and is_op(i + 1, "("):
+			path, after = chain(i + 2)
+			close = skip_call(i + 1) - 1
+			closed = close > i + 1 and is_op(close, ")")
+			requires.append(
+				{
+					# Only when the whole argument is the chain (not `require(script.A or script.B)`).
+					"path": path if after == close else None,
+					"line": bisect_right(newlines, start) + 1,
+					"expr": text[tokens[i + 2][2] : tokens[close][2]].strip()[:200] if closed else "",
+				}
+			)
+			i = max(i + 2, after)
+			continue
+		if value in aliases and is_op(i + 1, "="):
+			# Reassigned: whatever it holds now is not statically known.
+			del aliases[value]
+		i += 1
+	return requires
+
+
+def script_studio_path(rel: str) -> list[str]:
+	"""Best guess at a script's Studio path from its relPath alone (no `paths` entry)."""
+	parts = rel.split("/")
+	filename = parts[-1]
+	for ext in (".server.lua", ".local.lua", ".module.lua", ".lua"):
+		if filename.lower().endswith(ext):
+			filename = filename[: -len(ext)]
+			break
+	dirs = parts[:-1]
+	if len(dirs) > 1 and dirs[-1] == filename:
+		# A script with children is written as `Name/Name.<ext>`.
+		return dirs
+	return dirs + [filename]
+
+
+class DependencyIndex:
+	"""
+	require() edges of an output folder's scripts, kept in `.parser_deps.json`. `refresh()`
+	re-reads only scripts whose manifest hash or Studio path changed since the last refresh,
+	so queries after an export cost one pass over the changed files.
+	"""
+
+	VERSION = 1
+
+	def __init__(self, output_dir: Path):
+		self.output_dir = output_dir
+		self.lock = threading.Lock()
+		self.stamp: Optional[tuple[int, int]] = None
+		# rel -> {"hash", "path", "requires": [{"path", "line", "expr"}]}
+		self.files: dict[str, dict] = {}
+		self.rel_by_path: dict[tuple[str, ...], str] = {}
+		self.required_by: dict[tuple[str, ...], list[tuple[str, int]]] = {}
+		self._load()
+
+	def _load(self) -> None:
+		try:
+			text = (self.output_dir / DEPS_FILENAME).read_text(encoding="utf-8")
+			count_file_read(len(text.encode("utf-8")))
+			obj = json.loads(text)
+		except (OSError, json.JSONDecodeError):
+			return
+		if not isinstance(obj, dict) or obj.get("version") != self.VERSION or not isinstance(obj.get("files"), dict):
+			return
+		# Entries that don't look right are simply rescanned.
+		self.files = {
+			rel: entry
+			for rel, entry in obj["files"].items()
+			if isinstance(entry, dict) and isinstance(entry.get("path"), list) and isinstance(entry.get("requires"), list)
+		}
+
+	def _save(self) -> None:
+		path = self.output_dir / DEPS_FILENAME
+		text = json.dumps({"version": self.VERSION, "files": self.files}, ensure_ascii=False, separators=(",", ":"))
+		tmp_path = path.with_name(f"{DEPS_FILENAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+		try:
+			tmp_path.write_text(text, encoding="utf-8")
+			os.replace(tmp_path, path)
+		except OSError:
+			# Only a cache; the next start re-reads the scripts.
+			tmp_path.unlink(missing_ok=True)
+			return
+		count_file_written(len(text.encode("utf-8")))
+
+	def refresh(self) -> None:
+		with self.lock:
+			stamp = manifest_stamp(self.output_dir)
+			if stamp == self.stamp:
+				return
+			start = time.perf_counter()
+			manifest = load_manifest(self.output_dir)
+			scripts = _manifest_section(manifest, "scripts")
+			path_map = ManifestPathMap(manifest.get("paths") or {})
+
+			changed = False
+			for rel in self.files.keys() - scripts.keys():
+				del self.files[rel]
+				changed = True
+			for rel, recorded in scripts.items():
+				studio_path = path_map.studio_path(rel, "script") or script_studio_path(rel)
+				entry = self.files.get(rel)
+				if entry is not None and entry.get("hash") == recorded and entry.get("path") == studio_path:
+					continue
+				try:
+					text = (self.output_dir / rel).read_text(encoding="utf-8", errors="replace")
+					count_file_read(len(text.encode("utf-8")))
+				except OSError:
+					text = ""
+				self.files[rel] = {"hash": recorded, "path": studio_path, "requires": scan_requires(text, studio_path)}
+				METRICS.inc("rbx_parse_deps_parsed_total")
+				changed = True
+
+			if changed or self.stamp is None:
+				self._rebuild()
+			if changed:
+				self._save()
+			self.stamp = stamp
+			METRICS.observe("rbx_parse_deps_refresh_seconds", time.perf_counter() - start)
+
+	def _rebuild(self) -> None:
+		rel_by_path: dict[tuple[str, ...], str] = {}
+		required_by: dict[tuple[str, ...], list[tuple[str, int]]] = {}
+		for rel, entry in sorted(self.files.items()):
+			key = tuple(entry["path"])
+			# Prefer a ModuleScript when a Script and a module share a path.
+			if key not in rel_by_path or rel.lower().endswith(".module.lua"):
+				rel_by_path[key] = rel
+			for req in entry["requires"]:
+				if req["path"] is not None:
+					required_by.setdefault(tuple(req["path"]), []).append((rel, req["line"]))
+		self.rel_by_path = rel_by_path
+		self.required_by = required_by
+
+	def dependencies(self, rel: str, transitive: bool) -> tuple[list[dict], list[dict]]:
+		"""(resolved requires of `rel`, unresolved ones); transitive walks add `from` and `depth`."""
+		resolved: list[dict] = []
+		unresolved: list[dict] = []
+		seen = {rel}
+		queue = deque([(rel, 1)])
+		with self.lock:
+			while queue:
+				current, depth = queue.popleft()
+				for req in self.files.get(current, {}).get("requires", []):
+					if req["path"] is None:
+						unresolved.append({"from": current, "line": req["line"], "expr": req["expr"]})
+						continue
+					target = self.rel_by_path.get(tuple(req["path"]))
+					entry = {"relPath": target, "path": req["path"], "line": req["line"], "expr": req["expr"]}
+					if transitive:
+						if target in seen:
+							continue
+						if target is not None:
+							seen.add(target)
+							queue.append((target, depth + 1))
+						entry["from"] = current
+						entry["depth"] = depth
+					resolved.append(entry)
+				if not transitive:
+					break
+		return resolved, unresolved
+
+	def dependents(self, rel: str, transitive: bool) -> list[dict]:
+		"""Scripts requiring `rel` (with the line); transitive walks add `via` and `depth`."""
+		found: list[dict] = []
+		seen = {rel}
+		queue = deque([(rel, 1)])
+		with self.lock:
+			while queue:
+				current, depth = queue.popleft()
+				entry = self.files.get(current)
+				key = tuple(entry["path"]) if entry is not None else None
+				if key is None or self.rel_by_path.get(key) != current:
+					# Not indexed, or another file owns this Studio path (requires resolve to that one).
+					continue
+				for source, line in self.required_by.get(key, []):
+					if not transitive:
+						found.append({"relPath": source, "line": line})
+					elif source not in seen:
+						seen.add(source)
+						queue.append((source, depth + 1))
+						found.append({"relPath": source, "line": line, "via": current, "depth": depth})
+				if not transitive:
+					break
+		return found
+
+
+_dependency_indexes: dict[Path, DependencyIndex] = {}
+_dependency_indexes_lock = threading.Lock()
+
+
+def get_dependency_index(output_dir: Path) -> DependencyIndex:
+	with _dependency_indexes_lock:
+		index = _dependency_indexes.get(output_dir)
+		if index is None:
+			index = _dependency_indexes[output_dir] = DependencyIndex(output_dir)
+	index.refresh()
+	return index
+
+
+# Optional protocol features the plugin can rely on; see `ensureServerCapabilities` in the plugin.
+SERVER_FEATURES = ["gzip", "sessions", "digest", "local_get_many", "upload_plan", "path_map", "snapshots", "diff_pages", "diff_hunks", "changes"]
+if MULTIPROCESS:
+	SERVER_FEATURES.remove("sessions")
+if not STORE_ENABLED:
+	SERVER_FEATURES.remove("snapshots")
+if MULTIPROCESS or LOCAL_INDEX_WATCH == "off":
+	# Each worker has its own index and cursors; without a watcher the feed would rescan per poll.
+	SERVER_FEATURES.remove("changes")
+
+
+@app.get("/metrics")
+def metrics():
+	return app.response_class(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.post("/capabilities")
+def capabilities():
+	return jsonify({"ok": True, "features": SERVER_FEATURES})
+
+
+@app.post("/export_begin")
+def export_begin():
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	if MULTIPROCESS:
+		# Sessions live in one process's memory; the plugin falls back to per-chunk writes.
+		return jsonify({"ok": False, "error": "Export sessions are disabled in multi-process mode"}), 409
+
+	output_dir = resolve_output_dir(data)
+	session = begin_export_session(output_dir, export_flags_from_payload(data))
+	return jsonify(
+		{
+			"ok": True,
+			"output": str(output_dir),
+			"sessionId": session.id,
+			"timeout": EXPORT_SESSION_TIMEOUT_SECONDS,
+		}
+	)
+
+
+@app.post("/export_commit")
+def export_commit():
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	session_id = data.get("sessionId")
+	if not isinstance(session_id, str) or not session_id:
+		return jsonify({"ok": False, "error": "sessionId required"}), 400
+
+	session = end_export_session(session_id)
+	if session is None:
+		# Already flushed by the timeout reaper (or never existed); nothing left to write.
+		return jsonify({"ok": True, "sessionId": session_id, "expired": True})
+
+	with session.lock:
+		if not session.closed:
+			session.close()
+	return jsonify(
+		{
+			"ok": True,
+			"output": str(session.output_dir),
+			"sessionId": session.id,
+			"wrote": session.wrote,
+			"skipped": session.skipped,
+			"snapshot": session.snapshot,
+		}
+	)
+
+
+def plan_script_uploads(
+	output_dir: Path,
+	records: list[tuple[str, dict, list[str]]],
+	manifest: dict,
+	known_paths: Optional[dict[str, set[tuple[str, ...]]]] = None,
+) -> list:
+	"""
+	Decide which scripts the plugin has to upload, given only their digests.
+
+	A script is skipped when its target file still holds what the last export wrote:
+	the digest matches and the manifest records the file's current sha. The digest
+	is only length + crc32, so a file edited since the export is always uploaded
+	rather than trusted on a digest match.
+	"""
+	parent_by_service = parent_paths_by_service(records, known_paths)
+	scripts = manifest.setdefault("scripts", {})
+	need: list = []
+	for service, item, normalized in records:
+		is_parent = tuple(normalized) in parent_by_service.get(service, set())
+		path = local_file_path(output_dir, service, item, normalized, is_parent)
+		try:
+			st = path.stat()
+			digest, sha = local_file_hashes(path, st)
+		except OSError:
+			need.append(item.get("id"))
+			continue
+		if digest != str(item.get("digest", "")):
+			need.append(item.get("id"))
+			continue
+		try:
+			rel = safe_rel_path(path, output_dir)
+		except ValueError:
+			need.append(item.get("id"))
+			continue
+		if scripts.get(rel) != sha:
+			need.append(item.get("id"))
+			continue
+		_manifest_section(manifest, "blobs").pop(rel, None)
+		identity = studio_identity(item, "script")
+		if "path" in identity:
+			paths = manifest.setdefault("paths", {})
+			paths.pop(rel, None)
+			paths[rel] = identity
+	return need
+
+
+@app.post("/upload_plan")
+def upload_plan():
+	"""
+	First phase of a negotiated export: the payload looks like `/upload` but items
+	carry `id` + `digest` instead of `source`. Answers with the ids to upload.
+	"""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	records = iter_records_from_payload(data)
+	with manifest_transaction(output_dir, get_export_session(data, output_dir)) as (manifest, session):
+		if session is not None:
+			# Skipped scripts never reach /upload; keep the README flag right anyway.
+			session.merge_flags({"scripts": True})
+			session.remember_script_paths(records)
+			need = plan_script_uploads(output_dir, records, manifest, session.script_paths)
+		else:
+			need = plan_script_uploads(output_dir, records, manifest)
+
+	return jsonify({"ok": True, "output": str(output_dir), "need": need, "total": len(records)})
+
+
 @app.post("/upload")
 def upload():
 	data = request.get_json(force=True, silent=True)
@@ -675,22 +3084,21 @@ def upload():
 	output_dir = resolve_output_dir(data)
 	flags = export_flags_from_payload(data)
 	flags["scripts"] = True
-	manifest = load_manifest(output_dir)
-
-	records = iter_records_from_payload(data)
-	parent_by_service = parent_paths_by_service(records)
-	wrote = 0
-	skipped = 0
-	for service, item, normalized in records:
-		is_parent = tuple(normalized) in parent_by_service.get(service, set())
-		if write_script(output_dir, service, item, is_parent, normalized, manifest):
-			wrote += 1
+	with manifest_transaction(output_dir, get_export_session(data, output_dir)) as (manifest, session):
+		if session is not None:
+			session.merge_flags(flags)
+			session.remember_script_paths(iter_records_from_payload(data))
+			wrote, skipped = upload_scripts(output_dir, data, manifest, session.script_paths)
+			session.wrote += wrote
+			session.skipped += skipped
 		else:
-			skipped += 1
+			wrote, skipped = upload_scripts(output_dir, data, manifest)
+			write_readme(output_dir, flags)
 
-	write_readme(output_dir, flags)
-	save_manifest(output_dir, manifest)
-	return jsonify({"ok": True, "output": str(output_dir), "wrote": wrote, "skipped": skipped})
+	resp = {"ok": True, "output": str(output_dir), "wrote": wrote, "skipped": skipped}
+	if isinstance(data.get("sessionId"), str) and session is None:
+		resp["sessionExpired"] = True
+	return jsonify(resp)
 
 
 @app.post("/upload_instances")
@@ -701,29 +3109,27 @@ def upload_instances():
 
 	output_dir = resolve_output_dir(data)
 	flags = export_flags_from_payload(data)
-	manifest = load_manifest(output_dir)
-	if isinstance(manifest.get("scripts"), dict) and len(manifest.get("scripts") or {}) > 0:
-		flags["scripts"] = True
 
 	instances = data.get("instances", [])
 	if not isinstance(instances, list):
 		return jsonify({"ok": False, "error": "instances must be a list"}), 400
 
-	wrote = 0
-	skipped = 0
-	for item in instances:
-		if not isinstance(item, dict):
-			continue
-		service = str(item.get("service", "UnknownService"))
-		normalized = normalize_instance_path(service, item)
-		if write_instance(output_dir, service, item, normalized, manifest):
-			wrote += 1
+	with manifest_transaction(output_dir, get_export_session(data, output_dir)) as (manifest, session):
+		if session is not None:
+			session.merge_flags(flags)
+			wrote, skipped = upload_instance_items(output_dir, instances, manifest)
+			session.wrote += wrote
+			session.skipped += skipped
 		else:
-			skipped += 1
+			if isinstance(manifest.get("scripts"), dict) and len(manifest.get("scripts") or {}) > 0:
+				flags["scripts"] = True
+			wrote, skipped = upload_instance_items(output_dir, instances, manifest)
+			write_readme(output_dir, flags)
 
-	write_readme(output_dir, flags)
-	save_manifest(output_dir, manifest)
-	return jsonify({"ok": True, "output": str(output_dir), "wrote": wrote, "skipped": skipped})
+	resp = {"ok": True, "output": str(output_dir), "wrote": wrote, "skipped": skipped}
+	if isinstance(data.get("sessionId"), str) and session is None:
+		resp["sessionExpired"] = True
+	return jsonify(resp)
 
 
 @app.post("/skipped")
@@ -737,7 +3143,7 @@ def skipped():
 	skipped_list = data.get("skipped") or []
 	log_path = output_dir / "skipped.txt"
 
-	with log_path.open("a", encoding="utf-8") as f:
+	with output_dir_lock(output_dir), log_path.open("a", encoding="utf-8") as f:
 		for entry in skipped_list:
 			service = entry.get("service", "?")
 			name = entry.get("name", "?")
@@ -749,197 +3155,626 @@ def skipped():
 	return jsonify({"ok": True, "wrote": len(skipped_list)})
 
 
+@app.post("/snapshot_create")
+def snapshot_create():
+	"""Snapshot the folder's last export outside of a session (sessions snapshot at commit)."""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+	if not STORE_ENABLED:
+		return jsonify({"ok": False, "error": "Snapshot store is disabled"}), 409
+
+	output_dir = resolve_output_dir(data)
+	with output_dir_lock(output_dir):
+		snapshot = create_export_snapshot(output_dir, load_manifest(output_dir))
+	if snapshot is None:
+		return jsonify({"ok": False, "error": "Nothing exported yet"}), 404
+	return jsonify({"ok": True, "output": str(output_dir), "snapshot": snapshot})
+
+
+@app.post("/snapshots")
+def snapshots():
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	return jsonify({"ok": True, "output": str(output_dir), "snapshots": list_export_snapshots(output_dir)})
+
+
+@app.post("/snapshot_diff")
+def snapshot_diff():
+	"""
+	Compare two snapshots by blob id only, no file reads. `to` defaults to "current",
+	the folder's last export as recorded in the manifest.
+	"""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	sides: list[dict] = []
+	for key in ("from", "to"):
+		snapshot_id = data.get(key) or "current"
+		if snapshot_id == "current":
+			sides.append(export_blob_map(load_manifest(output_dir)))
+			continue
+		snapshot = load_export_snapshot(output_dir, snapshot_id)
+		if snapshot is None:
+			return jsonify({"ok": False, "error": f"Unknown snapshot: {snapshot_id}"}), 404
+		sides.append(snapshot["files"])
+
+	old, new = sides
+	return jsonify(
+		{
+			"ok": True,
+			"added": sorted(rel for rel in new if rel not in old),
+			"removed": sorted(rel for rel in old if rel not in new),
+			"changed": sorted(rel for rel, sha in new.items() if rel in old and old[rel] != sha),
+		}
+	)
+
+
+@app.post("/snapshot_restore")
+def snapshot_restore():
+	"""
+	Write files back from a snapshot (all of them, or `relPaths`). Files edited since the
+	last export are skipped unless `force`; the manifest is updated like an export would.
+	"""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	snapshot = load_export_snapshot(output_dir, data.get("id"))
+	if snapshot is None:
+		return jsonify({"ok": False, "error": "Unknown snapshot"}), 404
+
+	files: dict = snapshot["files"]
+	rel_paths = data.get("relPaths")
+	if isinstance(rel_paths, list):
+		files = {rel: files[rel] for rel in rel_paths if isinstance(rel, str) and rel in files}
+	force = bool(data.get("force"))
+
+	restored: list[str] = []
+	skipped: list[dict] = []
+	with manifest_transaction(output_dir) as (manifest, _session):
+		exported = export_blob_map(manifest)
+		blobs = manifest.setdefault("blobs", {})
+		for rel, sha in sorted(files.items()):
+			path = output_dir / rel
+			try:
+				safe_rel_path(path.resolve(), output_dir)
+			except ValueError:
+				skipped.append({"relPath": rel, "reason": "invalid path"})
+				continue
+			text = read_blob(output_dir, sha, rel)
+			if text is None:
+				skipped.append({"relPath": rel, "reason": "missing blob"})
+				continue
+
+			METRICS.inc("rbx_parse_files_stat_total")
+			if path.exists():
+				try:
+					current = local_file_hashes(path)[1]
+				except OSError:
+					current = None
+				if current == sha:
+					if rel not in _manifest_section(manifest, "scripts"):
+						blobs[rel] = sha
+					continue
+				if not force and current != exported.get(rel):
+					skipped.append({"relPath": rel, "reason": "local edits"})
+					continue
+				try:
+					replaced = path.read_bytes().replace(b"\r\n", b"\n").decode("utf-8", errors="replace")
+				except OSError:
+					replaced = None
+				if replaced is not None:
+					keep_replaced_text(output_dir, replaced)
+
+			path.parent.mkdir(parents=True, exist_ok=True)
+			path.write_text(text, encoding="utf-8")
+			count_file_written(len(text.encode("utf-8")))
+			notify_local_write(output_dir, path)
+			if rel not in _manifest_section(manifest, "scripts"):
+				blobs[rel] = sha
+			if rel in _manifest_section(manifest, "instances"):
+				try:
+					manifest["instances"][rel] = instance_tree_hash(canonicalize_instance_tree(json.loads(text)))
+				except (json.JSONDecodeError, TypeError, ValueError):
+					manifest["instances"].pop(rel, None)
+			elif rel in _manifest_section(manifest, "scripts"):
+				manifest["scripts"][rel] = sha
+			restored.append(rel)
+
+	return jsonify({"ok": True, "output": str(output_dir), "restored": restored, "skipped": skipped})
+
+
+class ResponsePage:
+	"""
+	Size budget for one page of a paginated response: entries are admitted until the
+	encoded response would exceed `max_bytes` (at least one, so a cursor always advances).
+	"""
+
+	def __init__(self, max_bytes: int):
+		self.max_bytes = max_bytes
+		self.used = 256  # envelope
+		self.count = 0
+
+	@staticmethod
+	def entry_size(entry: dict) -> int:
+		# Same escaping as `jsonify` (ASCII-only), so non-ASCII text counts at its sent size.
+		return len(json.dumps(entry)) + 1
+
+	def fits_alone(self, entry: dict) -> bool:
+		return 256 + self.entry_size(entry) <= self.max_bytes
+
+	def admit(self, entry: dict) -> bool:
+		size = self.entry_size(entry)
+		if self.count and self.used + size > self.max_bytes:
+			return False
+		self.used += size
+		self.count += 1
+		return True
+
+
+def page_params(data: dict) -> tuple[Optional[int], Optional[ResponsePage]]:
+	"""
+	`cursor` / `maxBytes` of a paginated request, or (None, None) for a request without
+	`cursor` (answered in one response, as before). Raises ValueError on a bad cursor.
+	"""
+	if "cursor" not in data:
+		return None, None
+	cursor = data.get("cursor") or 0
+	if not isinstance(cursor, int) or isinstance(cursor, bool) or cursor < 0:
+		raise ValueError("Invalid cursor")
+	max_bytes = data.get("maxBytes")
+	if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes <= 0:
+		max_bytes = 900 * 1024
+	return cursor, ResponsePage(min(max_bytes, 900 * 1024))
+
+
+# Paginated /diff and /diff_instances requests keep their payload and directory snapshot
+# here between pages, so follow-up pages post only `pageToken` + `cursor`.
+DIFF_PAGE_TTL_SECONDS = 120.0
+DIFF_PAGE_STATES_MAX = 32
+
+
+class DiffPageState:
+	"""What a paginated diff needs to continue: the item count, a per-item diff, response fields."""
+
+	def __init__(self, total: int, diff_item: Callable[[int], Optional[tuple[str, dict]]], fields: dict):
+		self.total = total
+		self.diff_item = diff_item
+		self.fields = fields
+		self.cursor = 0
+		self.last_active = time.monotonic()
+
+
+_diff_page_states: dict[str, DiffPageState] = {}
+_diff_page_states_lock = threading.Lock()
+
+
+def keep_diff_page_state(state: DiffPageState, token: Optional[str]) -> Optional[str]:
+	"""Store `state` for the next page and return its token (None in multi-process mode)."""
+	if MULTIPROCESS:
+		# The next page may reach another worker; it re-posts the payload instead.
+		return None
+	token = token or uuid.uuid4().hex
+	now = time.monotonic()
+	state.last_active = now
+	with _diff_page_states_lock:
+		for key, other in list(_diff_page_states.items()):
+			if now - other.last_active > DIFF_PAGE_TTL_SECONDS:
+				del _diff_page_states[key]
+		while len(_diff_page_states) >= DIFF_PAGE_STATES_MAX:
+			oldest = min(_diff_page_states, key=lambda key: _diff_page_states[key].last_active)
+			del _diff_page_states[oldest]
+		_diff_page_states[token] = state
+	return token
+
+
+def take_diff_page_state(token: str, cursor: Optional[int]) -> Optional[DiffPageState]:
+	"""The state stored under `token` if it continues at `cursor`; None if unknown or expired."""
+	with _diff_page_states_lock:
+		state = _diff_page_states.pop(token, None)
+	if state is None or state.cursor != cursor or time.monotonic() - state.last_active > DIFF_PAGE_TTL_SECONDS:
+		return None
+	return state
+
+
+def diff_page_response(state: DiffPageState, token: Optional[str], cursor: Optional[int], page: Optional[ResponsePage]) -> dict:
+	found, next_cursor = collect_diff_page(state.total, state.diff_item, cursor, page)
+	body = {"ok": True, **state.fields, **found, "nextCursor": next_cursor}
+	if next_cursor is not None:
+		state.cursor = next_cursor
+		token = keep_diff_page_state(state, token)
+		if token is not None:
+			body["pageToken"] = token
+	return body
+
+
+def resume_diff_page(data: dict, cursor: Optional[int], page: Optional[ResponsePage]):
+	"""Response for a follow-up page (`pageToken`), or None for a request carrying its payload."""
+	token = data.get("pageToken")
+	if not isinstance(token, str):
+		return None
+	state = take_diff_page_state(token, cursor)
+	if state is None:
+		return jsonify({"ok": False, "error": "Unknown or expired pageToken"}), 410
+	return jsonify(diff_page_response(state, token, cursor, page))
+
+
+def _diff_entry(service: str, item: dict, path: Optional[Path], rel: Optional[str], **extra) -> dict:
+	entry = {
+		"service": service,
+		"name": item.get("name"),
+		"class": item.get("class"),
+		"path": item.get("path"),
+		"file": str(path) if path is not None else None,
+	}
+	if rel is not None or "relPath" in extra:
+		entry["relPath"] = rel
+	entry.update(extra)
+	return entry
+
+
+def diff_script_item(
+	snapshot: LocalPathSnapshot,
+	path_map: ManifestPathMap,
+	service: str,
+	item: dict,
+	normalized: list[str],
+	digest_mode: bool,
+	include_source: bool,
+) -> Optional[tuple[str, dict]]:
+	"""Compare one Studio script with its local file: (response list, entry), or None if equal."""
+	max_read_bytes = 900 * 1024
+	rel = snapshot.resolve_known(path_map.rel_for("script", item), service)
+	if rel is None:
+		rel = snapshot.resolve_script(service, item, normalized)
+	if rel is None:
+		return "missingLocal", _diff_entry(service, item, None, None)
+
+	path = snapshot.path(rel)
+	try:
+		METRICS.inc("rbx_parse_files_stat_total")
+		st = snapshot.files[rel].stat()
+		if st.st_size > max_read_bytes:
+			# Compared by streamed hash; the text is fetched through /local_get_range.
+			if digest_mode:
+				local_hash, studio_hash = local_file_digest(path, st), str(item.get("digest", ""))
+			else:
+				local_hash = local_file_hashes(path, st)[1]
+				studio_hash = sha256_text(str(item.get("source", "")).replace("\r\n", "\n"))
+			if local_hash == studio_hash:
+				return None
+			return "changes", _diff_entry(service, item, path, rel, large=True, size=st.st_size)
+
+		if digest_mode:
+			if local_file_digest(path, st) != str(item.get("digest", "")):
+				return "changes", _diff_entry(service, item, path, rel)
+			return None
+
+		local_text = path.read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
+		count_file_read(st.st_size)
+	except OSError as e:
+		METRICS.inc("rbx_parse_skips_total", reason="read error")
+		return "skippedLarge", _diff_entry(service, item, path, None, reason=str(e))
+
+	local_text = strip_tags_header(local_text)
+	studio_text = str(item.get("source", "")).replace("\r\n", "\n")
+	if local_text == studio_text:
+		return None
+	if not include_source:
+		return "changes", _diff_entry(service, item, path, rel)
+	return "changes", _diff_entry(service, item, path, rel, localSource=local_text)
+
+
+# (service, path, rel, local text, (size, sha256) of a file over the read limit or None)
+LoadedInstance = tuple[str, Path, str, Optional[str], Optional[tuple[int, str]]]
+
+
+def load_instance_for_diff(
+	snapshot: LocalPathSnapshot, path_map: ManifestPathMap, item: dict
+) -> tuple[Optional[tuple[str, dict]], Optional[LoadedInstance]]:
+	"""
+	File side of an instance diff: either a final (response list, entry) for missing or
+	unreadable files, or the file to compare. Files over the read limit are not read here,
+	only hashed (streamed, cached by size and mtime).
+	"""
+	max_read_bytes = 900 * 1024
+	service = str(item.get("service", "UnknownService"))
+	normalized = normalize_instance_path(service, item)
+	rel = snapshot.resolve_known(path_map.rel_for("instance", item), service)
+	if rel is None:
+		rel = snapshot.resolve_instance(service, item, normalized)
+	if rel is None:
+		return ("missingLocal", _diff_entry(service, item, None, None, relPath=None)), None
+
+	path = snapshot.path(rel)
+	try:
+		METRICS.inc("rbx_parse_files_stat_total")
+		st = snapshot.files[rel].stat()
+		if st.st_size > max_read_bytes:
+			return None, (service, path, rel, None, (st.st_size, local_file_hashes(path, st)[1]))
+		local_text = path.read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
+		count_file_read(st.st_size)
+	except OSError as e:
+		METRICS.inc("rbx_parse_skips_total", reason="read error")
+		return ("skippedLarge", _diff_entry(service, item, path, rel, reason=str(e))), None
+	return None, (service, path, rel, local_text, None)
+
+
+def compare_instance_tree(args: tuple) -> Optional[dict]:
+	"""
+	CPU side of an instance diff (picklable, see `map_canon`): None when the local text,
+	merged over the Studio tree, matches it; otherwise the extra fields of the change entry.
+
+	A large file (`large_file` = (path, sha256)) first has its hash compared with the
+	exported text of the Studio tree and is only parsed when they differ; it never gets
+	an inline patch.
+	"""
+	studio_tree, local_text, include_patch, large_file = args
+	extra: dict = {}
+	if large_file is not None:
+		path, local_sha = large_file
+		if sha256_text(render_instance_tree(studio_tree)[0]) == local_sha:
+			return None
+		try:
+			local_text = Path(path).read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
+		except OSError:
+			return {"large": True}
+		include_patch = False
+		extra["large"] = True
+
+	try:
+		local_obj = json.loads(local_text)
+	except json.JSONDecodeError:
+		return extra
+
+	canon_studio = canonicalize_instance_tree(studio_tree)
+	canon_local = canonicalize_instance_tree(local_obj)
+	effective_local = merge_instance_tree(canon_studio, canon_local)
+	if effective_local.content_hash == canon_studio.content_hash:
+		return None
+	if not include_patch:
+		return extra
+	return {"patch": instance_tree_patch(canon_studio, effective_local)}
+
+
+def _compare_args(item: dict, loaded: LoadedInstance, include_patch: bool) -> tuple:
+	_service, path, _rel, local_text, large = loaded
+	large_file = (str(path), large[1]) if large is not None else None
+	return (item.get("tree") or {}, local_text, include_patch, large_file)
+
+
+def _compared_entry(item: dict, loaded: LoadedInstance, extra: Optional[dict]) -> Optional[tuple[str, dict]]:
+	if extra is None:
+		return None
+	service, path, rel, _text, large = loaded
+	if large is not None:
+		extra = {**extra, "size": large[0]}
+	return "changes", _diff_entry(service, item, path, rel, **extra)
+
+
+def diff_instance_items(
+	snapshot: LocalPathSnapshot,
+	path_map: ManifestPathMap,
+	items: list,
+	include_patch: bool,
+) -> list[Optional[tuple[str, dict]]]:
+	"""
+	Compare Studio instance trees with their local files: per item a (response list, entry),
+	or None if equal or not an instance. Files are read here; the comparisons go through
+	`map_canon`, so large batches use the canonicalization pool.
+	"""
+	out: list[Optional[tuple[str, dict]]] = [None] * len(items)
+	pending: list[tuple[int, LoadedInstance]] = []
+	for i, item in enumerate(items):
+		if not isinstance(item, dict):
+			continue
+		final, loaded = load_instance_for_diff(snapshot, path_map, item)
+		if loaded is None:
+			out[i] = final
+		else:
+			pending.append((i, loaded))
+
+	compared = map_canon(
+		compare_instance_tree, [_compare_args(items[i], loaded, include_patch) for i, loaded in pending]
+	)
+	for (i, loaded), extra in zip(pending, compared):
+		out[i] = _compared_entry(items[i], loaded, extra)
+	return out
+
+
+def diff_instance_item(
+	snapshot: LocalPathSnapshot,
+	path_map: ManifestPathMap,
+	item: dict,
+	include_patch: bool,
+) -> Optional[tuple[str, dict]]:
+	"""Compare one Studio instance tree with its local file: (response list, entry), or None if equal."""
+	final, loaded = load_instance_for_diff(snapshot, path_map, item)
+	if loaded is None:
+		return final
+	return _compared_entry(item, loaded, compare_instance_tree(_compare_args(item, loaded, include_patch)))
+
+
+def collect_diff_page(
+	total: int,
+	diff_item: Callable[[int], Optional[tuple[str, dict]]],
+	cursor: Optional[int],
+	page: Optional[ResponsePage],
+) -> tuple[dict[str, list[dict]], Optional[int]]:
+	"""
+	Run `diff_item(i)` from `cursor` on and group the entries by response list. Stops
+	before the entry that would overflow `page`; returns the lists and the next cursor.
+	"""
+	out: dict[str, list[dict]] = {"changes": [], "missingLocal": [], "skippedLarge": []}
+	for i in range(cursor or 0, total):
+		found = diff_item(i)
+		if found is None:
+			continue
+		bucket, entry = found
+		if page is not None and not page.fits_alone(entry):
+			# Too big for any page: drop the inline text/patch; the plugin reads the file
+			# through /local_get_range like any other large file.
+			entry = {k: v for k, v in entry.items() if k not in ("localSource", "patch")}
+			entry["large"] = True
+		if page is not None and not page.admit(entry):
+			return out, i
+		out[bucket].append(entry)
+	return out, None
+
+
 @app.post("/diff")
 def diff():
+	"""
+	Compare Studio scripts with the local files. With `cursor` the answer is paginated:
+	entries are returned until the response would exceed `maxBytes` (≤ 900KB) together
+	with `nextCursor`, the item index to continue from (null when done), and `pageToken`.
+	The next page posts just `pageToken` + `cursor`; an unknown or expired token answers
+	410 and the same payload can be re-posted with `cursor` instead.
+	"""
 	data = request.get_json(force=True, silent=True)
 	if not isinstance(data, dict):
 		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+	try:
+		cursor, page = page_params(data)
+	except ValueError as e:
+		return jsonify({"ok": False, "error": str(e)}), 400
+
+	resumed = resume_diff_page(data, cursor, page)
+	if resumed is not None:
+		return resumed
 
 	output_dir = resolve_output_dir(data)
 	records = iter_records_from_payload(data)
+	# "digest" mode: items carry `digest` ("<len>:<crc32>") instead of `source`, and
+	# changes are reported without `localSource` (the plugin fetches it on demand).
+	digest_mode = data.get("mode") == "digest"
+	include_source = data.get("includeSource") is not False
 
-	changes: list[dict] = []
-	missing_local: list[dict] = []
-	skipped_large: list[dict] = []
-
-	max_read_bytes = 900 * 1024
-	for service, item, normalized in records:
-		path = existing_local_file_path(output_dir, service, item, normalized)
-
-		if not path:
-			missing_local.append(
-				{
-					"service": service,
-					"name": item.get("name"),
-					"class": item.get("class"),
-					"path": item.get("path"),
-					"file": None,
-				}
-			)
-			continue
-
-		try:
-			if path.stat().st_size > max_read_bytes:
-				skipped_large.append(
-					{
-						"service": service,
-						"name": item.get("name"),
-						"class": item.get("class"),
-						"path": item.get("path"),
-						"file": str(path),
-						"reason": "file too large",
-					}
-				)
-				continue
-
-			local_text = path.read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
-		except OSError as e:
-			skipped_large.append(
-				{
-					"service": service,
-					"name": item.get("name"),
-					"class": item.get("class"),
-					"path": item.get("path"),
-					"file": str(path),
-					"reason": str(e),
-				}
-			)
-			continue
-
-		local_text = strip_tags_header(local_text)
-		studio_text = str(item.get("source", "")).replace("\r\n", "\n")
+	snapshot = LocalPathSnapshot(output_dir)
+	path_map = get_path_map(output_dir)
 
-		if local_text != studio_text:
-			changes.append(
-				{
-					"service": service,
-					"name": item.get("name"),
-					"class": item.get("class"),
-					"path": item.get("path"),
-					"file": str(path),
-					"localSource": local_text,
-				}
-			)
+	def diff_item(i: int) -> Optional[tuple[str, dict]]:
+		service, item, normalized = records[i]
+		return diff_script_item(snapshot, path_map, service, item, normalized, digest_mode, include_source)
 
-	return jsonify(
-		{
-			"ok": True,
-			"output": str(output_dir),
-			"changes": changes,
-			"missingLocal": missing_local,
-			"skippedLarge": skipped_large,
-		}
-	)
+	fields = {"output": str(output_dir), "mode": "digest" if digest_mode else "source"}
+	return jsonify(diff_page_response(DiffPageState(len(records), diff_item, fields), None, cursor, page))
 
 
 @app.post("/diff_instances")
 def diff_instances():
+	"""Instance version of /diff, paginated the same way (`cursor` indexes `instances`)."""
 	data = request.get_json(force=True, silent=True)
 	if not isinstance(data, dict):
 		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+	try:
+		cursor, page = page_params(data)
+	except ValueError as e:
+		return jsonify({"ok": False, "error": str(e)}), 400
+
+	resumed = resume_diff_page(data, cursor, page)
+	if resumed is not None:
+		return resumed
 
 	output_dir = resolve_output_dir(data)
 	instances = data.get("instances", [])
 	if not isinstance(instances, list):
 		return jsonify({"ok": False, "error": "instances must be a list"}), 400
+	include_patch = data.get("includePatch") is not False
 
-	changes: list[dict] = []
-	missing_local: list[dict] = []
-	skipped_large: list[dict] = []
+	snapshot = LocalPathSnapshot(output_dir)
+	path_map = get_path_map(output_dir)
 
-	max_read_bytes = 900 * 1024
-	for item in instances:
-		if not isinstance(item, dict):
-			continue
-		service = str(item.get("service", "UnknownService"))
-		normalized = normalize_instance_path(service, item)
-		path = instance_local_file_path(output_dir, service, item, normalized)
-		if not path.exists():
-			missing_local.append(
-				{
-					"service": service,
-					"name": item.get("name"),
-					"class": item.get("class"),
-					"path": item.get("path"),
-					"file": None,
-					"relPath": None,
-				}
-			)
-			continue
+	if canon_pool_enabled(len(instances) - (cursor or 0)):
+		# Compare a window at a time on the pool; a page that fills up early wastes at most one window.
+		window = CANON_WORKERS * CANON_MIN_ITEMS
+		ahead: dict[int, Optional[tuple[str, dict]]] = {}
 
-		try:
-			if path.stat().st_size > max_read_bytes:
-				skipped_large.append(
-					{
-						"service": service,
-						"name": item.get("name"),
-						"class": item.get("class"),
-						"path": item.get("path"),
-						"file": str(path),
-						"relPath": safe_rel_path(path, output_dir),
-						"reason": "file too large",
-					}
-				)
-				continue
-			local_text = path.read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
-		except OSError as e:
-			skipped_large.append(
-				{
-					"service": service,
-					"name": item.get("name"),
-					"class": item.get("class"),
-					"path": item.get("path"),
-					"file": str(path),
-					"relPath": safe_rel_path(path, output_dir),
-					"reason": str(e),
-				}
-			)
-			continue
+		def diff_item(i: int) -> Optional[tuple[str, dict]]:
+			if i not in ahead:
+				stop = min(len(instances), i + window)
+				found = diff_instance_items(snapshot, path_map, instances[i:stop], include_patch)
+				ahead.update(zip(range(i, stop), found))
+			return ahead.pop(i)
 
-		try:
-			local_obj = json.loads(local_text)
-		except json.JSONDecodeError:
-			changes.append(
-				{
-					"service": service,
-					"name": item.get("name"),
-					"class": item.get("class"),
-					"path": item.get("path"),
-					"file": str(path),
-					"relPath": safe_rel_path(path, output_dir),
-				}
-			)
-			continue
+	else:
 
-		studio_tree = item.get("tree") or {}
-		canon_studio = canonicalize_instance_tree(studio_tree)
-		canon_local = canonicalize_instance_tree(local_obj)
-		effective_local = merge_instance_tree(canon_studio, canon_local)
+		def diff_item(i: int) -> Optional[tuple[str, dict]]:
+			item = instances[i]
+			if not isinstance(item, dict):
+				return None
+			return diff_instance_item(snapshot, path_map, item, include_patch)
 
-		local_norm = json.dumps(effective_local, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-		studio_norm = json.dumps(canon_studio, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+	state = DiffPageState(len(instances), diff_item, {"output": str(output_dir)})
+	return jsonify(diff_page_response(state, None, cursor, page))
 
-		if local_norm != studio_norm:
-			changes.append(
-				{
-					"service": service,
-					"name": item.get("name"),
-					"class": item.get("class"),
-					"path": item.get("path"),
-					"file": str(path),
-					"relPath": safe_rel_path(path, output_dir),
-				}
-			)
 
-	return jsonify(
-		{
-			"ok": True,
-			"output": str(output_dir),
-			"changes": changes,
-			"missingLocal": missing_local,
-			"skippedLarge": skipped_large,
-		}
-	)
+@app.post("/changes")
+def changes():
+	"""
+	Long-poll feed of local file changes, from the local index's watcher.
+
+	Without `since`, answers at once with the current `cursor`. With `since`, waits up to
+	`timeout` seconds (default 20, at most 25) for files added, modified or deleted after
+	that cursor and returns them (one entry per relPath) with the next `cursor`. Entries
+	carry the Studio `path` when it is known (for scripts also guessed from the file name),
+	and scripts carry `digest` when `digests` is set. `reset: true` means the cursor is no longer
+	covered (log overflow or server restart); the client should do a full refresh.
+	"""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	index = get_local_index(output_dir)
+	since = data.get("since")
+	if since is None:
+		return jsonify({"ok": True, "cursor": index.cursor(), "changes": []})
+
+	timeout = data.get("timeout")
+	if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or timeout < 0:
+		timeout = 20
+	timeout = min(float(timeout), 25.0)
+
+	epoch, _sep, seq_text = str(since).partition(":")
+	found = None
+	if epoch == index.epoch and seq_text.isdigit():
+		found = index.wait_for_changes(int(seq_text), timeout)
+	if found is None:
+		return jsonify({"ok": True, "reset": True, "cursor": index.cursor(), "changes": []})
+
+	events, seq = found
+	with_digests = bool(data.get("digests"))
+	path_map = get_path_map(output_dir)
+	out: list[dict] = []
+	for rel, change, entry in sorted(events):
+		item = {"relPath": rel, "change": change, "service": rel.split("/", 1)[0]}
+		kind = entry.kind if entry is not None else ("script" if rel.lower().endswith(".lua") else "instance")
+		path = path_map.studio_path(rel, kind)
+		if path is None and kind == "script":
+			path = script_studio_path(rel)
+		if path is not None:
+			item["path"] = path
+		if entry is not None:
+			item["kind"] = entry.kind
+			item["class"] = entry.class_name
+			item["name"] = entry.name
+			if with_digests and entry.kind == "script":
+				try:
+					item["digest"] = local_file_digest(output_dir / rel)
+				except OSError:
+					pass
+		else:
+			item["kind"] = kind
+		out.append(item)
+	return jsonify({"ok": True, "cursor": f"{index.epoch}:{seq}", "changes": out})
 
 
 @app.post("/local_index")
@@ -991,29 +3826,25 @@ def local_index():
 			return list(mapped)
 		return segments
 
+	path_map = get_path_map(output_dir)
+	unmapped = 0
 	items: list[dict] = []
-	for file_path in output_dir.rglob("*.lua"):
-		if not file_path.is_file():
-			continue
-
-		try:
-			rel = safe_rel_path(file_path, output_dir)
-		except ValueError:
-			continue
-
-		parts = [p for p in rel.split("/") if p]
-		if len(parts) < 2:
+	for entry in get_local_index(output_dir).snapshot():
+		if entry.kind != "script":
 			continue
-
-		service = parts[0]
+		service = entry.service
 		if service_filter is not None and service not in service_filter:
 			continue
-		filename = parts[-1]
-		class_name = class_from_filename(filename)
-		script_name = script_name_from_filename(filename)
-
-		dirs = parts[1:-1]
-		if dirs and dirs[-1].lower() == script_name.lower():
+		class_name = entry.class_name
+		script_name = entry.name
+
+		dirs = entry.rel.split("/")[1:-1]
+		mapped = path_map.studio_path(entry.rel, "script")
+		if mapped is not None:
+			path_segments = mapped
+		elif dirs and dirs[-1].lower() == script_name.lower():
+			# `X/X.server.lua` is either script X with children or a script X inside folder X.
+			unmapped += 1
 			full_segments = map_to_studio_path([service] + dirs + [script_name])
 			collapsed_segments = map_to_studio_path([service] + dirs[:-1] + [script_name])
 			if studio_path_set:
@@ -1028,23 +3859,27 @@ def local_index():
 		else:
 			path_segments = map_to_studio_path([service] + dirs + [script_name])
 
-		try:
-			size = file_path.stat().st_size
-		except OSError:
-			size = None
-
 		items.append(
 			{
-				"relPath": rel,
+				"relPath": entry.rel,
 				"service": service,
 				"path": path_segments,
 				"name": script_name,
 				"class": class_name,
-				"size": size,
+				"size": entry.size,
 			}
 		)
 
-	return jsonify({"ok": True, "output": str(output_dir), "items": items})
+	return jsonify(
+		{
+			"ok": True,
+			"output": str(output_dir),
+			"items": items,
+			# Unmapped files (exported before the `paths` map existed, or created locally) are
+			# guessed; only ambiguous guesses get better with the Studio paths.
+			"needsStudioPaths": unmapped > 0 and not studio_path_set,
+		}
+	)
 
 
 @app.post("/local_index_instances")
@@ -1094,138 +3929,540 @@ def local_index_instances():
 			return list(mapped)
 		return segments
 
+	path_map = get_path_map(output_dir)
 	items: list[dict] = []
-	for file_path in output_dir.rglob("*"):
-		if not file_path.is_file():
-			continue
-		if file_path.suffix.lower() == ".lua":
-			continue
-		if file_path.name.lower() in ("skipped.txt",):
-			continue
-
-		try:
-			rel = safe_rel_path(file_path, output_dir)
-		except ValueError:
-			continue
-
-		parts = [p for p in rel.split("/") if p]
-		if len(parts) < 2:
+	for entry in get_local_index(output_dir).snapshot():
+		if entry.kind != "instance" or entry.header is None:
 			continue
-
-		service = parts[0]
+		service = entry.service
 		if service_filter is not None and service not in service_filter:
 			continue
 
-		class_name = file_path.suffix[1:] if file_path.suffix.startswith(".") else ""
-		name = file_path.stem
-		if not class_name or not name:
-			continue
-
-		try:
-			if file_path.stat().st_size > 900 * 1024:
-				continue
-			raw = file_path.read_text(encoding="utf-8", errors="replace")
-			obj = json.loads(raw)
-		except (OSError, json.JSONDecodeError):
-			continue
-		if not isinstance(obj, dict):
-			continue
-		if "class" not in obj or "name" not in obj:
-			continue
-
-		dirs = parts[1:-1]
-		path_segments = map_to_studio_path([service] + dirs + [name])
-
-		try:
-			size = file_path.stat().st_size
-		except OSError:
-			size = None
+		dirs = entry.rel.split("/")[1:-1]
+		path_segments = path_map.studio_path(entry.rel, "instance")
+		if path_segments is None:
+			path_segments = map_to_studio_path([service] + dirs + [entry.name])
 
 		items.append(
 			{
-				"relPath": rel,
+				"relPath": entry.rel,
 				"service": service,
 				"path": path_segments,
-				"name": (path_segments[-1] if path_segments else name),
-				"class": class_name,
-				"size": size,
+				"name": (path_segments[-1] if path_segments else entry.name),
+				"class": entry.class_name,
+				"size": entry.size,
 			}
 		)
 
-	return jsonify({"ok": True, "output": str(output_dir), "items": items})
-
+	return jsonify(
+		{
+			"ok": True,
+			"output": str(output_dir),
+			"items": items,
+			# `Name.Class` files map to one Studio path; the Studio paths only matter to servers
+			# without the `paths` map, which the plugin sends them to unasked.
+			"needsStudioPaths": False,
+		}
+	)
 
-@app.post("/local_get")
-def local_get():
-	data = request.get_json(force=True, silent=True)
-	if not isinstance(data, dict):
-		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
 
-	output_dir = resolve_output_dir(data)
-	rel = data.get("relPath")
+def _resolve_local_file(output_dir: Path, rel) -> tuple[Optional[Path], Optional[dict], int]:
 	if not isinstance(rel, str) or not rel.strip():
-		return jsonify({"ok": False, "error": "relPath required"}), 400
+		return None, {"ok": False, "error": "relPath required"}, 400
 
 	candidate = (output_dir / rel).resolve()
 	try:
 		_ = safe_rel_path(candidate, output_dir)
 	except ValueError:
-		return jsonify({"ok": False, "error": "Invalid path"}), 400
+		return None, {"ok": False, "error": "Invalid path"}, 400
 
 	if not candidate.exists() or not candidate.is_file():
-		return jsonify({"ok": False, "error": "File not found"}), 404
+		return None, {"ok": False, "error": "File not found"}, 404
+	return candidate, None, 200
+
 
+def _read_local_text(candidate: Path) -> tuple[Optional[str], Optional[dict], int]:
 	max_read_bytes = 900 * 1024
 	try:
-		if candidate.stat().st_size > max_read_bytes:
-			return jsonify({"ok": False, "error": "File too large"}), 413
+		METRICS.inc("rbx_parse_files_stat_total")
+		st = candidate.stat()
+		size = st.st_size
+		if size > max_read_bytes:
+			METRICS.inc("rbx_parse_skips_total", reason="file too large")
+			# `ranged`: the file can still be fetched in pieces through /local_get_range.
+			body = {"ok": False, "error": "File too large", "ranged": True, "size": size}
+			body["sha256"] = local_file_hashes(candidate, st)[1]
+			return None, body, 413
 		text = candidate.read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
+		count_file_read(size)
 	except OSError as e:
-		return jsonify({"ok": False, "error": str(e)}), 500
+		return None, {"ok": False, "error": str(e)}, 500
+	return text, None, 200
 
-	text = strip_tags_header(text)
-	return jsonify({"ok": True, "relPath": rel, "source": text})
 
+def _range_end(raw: bytes, end: int) -> int:
+	"""Move a cut at `raw[:end]` back so it splits neither a UTF-8 character nor a CRLF."""
+	start = end
+	while end > 0 and end < len(raw) and (raw[end] & 0xC0) == 0x80 and start - end < 3:
+		end -= 1
+	if 0 < end < len(raw) and raw[end - 1 : end + 1] == b"\r\n":
+		end -= 1
+	return end if end > 0 else start
 
-@app.post("/local_get_instances")
-def local_get_instances():
-	data = request.get_json(force=True, silent=True)
-	if not isinstance(data, dict):
-		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
 
-	output_dir = resolve_output_dir(data)
-	rel = data.get("relPath")
-	if not isinstance(rel, str) or not rel.strip():
-		return jsonify({"ok": False, "error": "relPath required"}), 400
+def read_local_range(output_dir: Path, rel, offset: int, max_bytes: int, expected_sha: Optional[str]) -> tuple[dict, int]:
+	"""
+	One piece of a local file, for files over the 900KB /local_get limit.
 
-	candidate = (output_dir / rel).resolve()
+	`data` is the LF-normalized text of the raw bytes from `offset`, cut at a character
+	boundary so that it encodes to at most `max_bytes` of JSON; `next` is the offset of the
+	following piece (null at the end). `sha256` (of the whole LF-normalized file) is stable
+	while the file is: send it back with later pieces and a file that changed in between
+	answers 409, so the client can start over.
+	"""
+	candidate, err, status = _resolve_local_file(output_dir, rel)
+	if candidate is None:
+		return err, status
+	budget = max(1024, max_bytes - 1024)  # envelope
 	try:
-		_ = safe_rel_path(candidate, output_dir)
-	except ValueError:
-		return jsonify({"ok": False, "error": "Invalid path"}), 400
+		METRICS.inc("rbx_parse_files_stat_total")
+		st = candidate.stat()
+		sha = local_file_hashes(candidate, st)[1]
+		if expected_sha is not None and expected_sha != sha:
+			return {"ok": False, "error": "File changed", "relPath": rel, "sha256": sha}, 409
+		with candidate.open("rb") as f:
+			f.seek(offset)
+			# A few bytes past the budget show whether the cut lands inside a character.
+			raw = f.read(budget + 4)
+		count_file_read(len(raw))
+		after = candidate.stat()
+	except OSError as e:
+		return {"ok": False, "error": str(e)}, 500
+	if (after.st_size, after.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+		return {"ok": False, "error": "File changed", "relPath": rel, "sha256": None}, 409
+
+	end = _range_end(raw, min(budget, len(raw)))
+	while True:
+		text = raw[:end].decode("utf-8", errors="replace").replace("\r\n", "\n")
+		encoded = len(json.dumps(text))
+		if encoded <= budget or end <= 4:
+			break
+		# Escapes (non-ASCII, quotes, newlines) make JSON longer than the raw bytes.
+		end = _range_end(raw, max(4, int(end * budget / encoded * 0.95)))
+
+	next_offset = offset + end
+	return {
+		"ok": True,
+		"relPath": rel,
+		"size": st.st_size,
+		"offset": offset,
+		"next": next_offset if next_offset < st.st_size else None,
+		"sha256": sha,
+		"data": text,
+	}, 200
+
+
+def read_local_source(output_dir: Path, rel) -> tuple[dict, int]:
+	candidate, err, status = _resolve_local_file(output_dir, rel)
+	if candidate is None:
+		return err, status
+	text, err, status = _read_local_text(candidate)
+	if text is None:
+		return err, status
 
-	if not candidate.exists() or not candidate.is_file():
-		return jsonify({"ok": False, "error": "File not found"}), 404
+	text = strip_tags_header(text)
+	return {"ok": True, "relPath": rel, "source": text}, 200
 
-	max_read_bytes = 900 * 1024
-	try:
-		if candidate.stat().st_size > max_read_bytes:
-			return jsonify({"ok": False, "error": "File too large"}), 413
-		text = candidate.read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
-	except OSError as e:
-		return jsonify({"ok": False, "error": str(e)}), 500
+
+def read_local_instance(output_dir: Path, rel) -> tuple[dict, int]:
+	candidate, err, status = _resolve_local_file(output_dir, rel)
+	if candidate is None:
+		return err, status
+	text, err, status = _read_local_text(candidate)
+	if text is None:
+		return err, status
 
 	try:
 		tree = json.loads(text)
 	except json.JSONDecodeError as e:
-		return jsonify({"ok": False, "error": f"Invalid JSON: {e}"}), 400
+		return {"ok": False, "error": f"Invalid JSON: {e}"}, 400
 
 	try:
 		canon = canonicalize_instance_tree(tree)
 	except Exception:
 		canon = tree
 	pretty = json.dumps(canon, ensure_ascii=False, sort_keys=True, indent=2) + "\n"
-	return jsonify({"ok": True, "relPath": rel, "tree": canon, "pretty": pretty})
+	return {"ok": True, "relPath": rel, "tree": canon, "pretty": pretty}, 200
+
+
+def requested_rel_path(output_dir: Path, data: dict, kind: str):
+	"""`relPath` from the request, or the mapped file of its Studio `path` + `class`."""
+	rel = data.get("relPath")
+	if rel is None and isinstance(data.get("path"), list):
+		rel = get_path_map(output_dir).rel_for(kind, data)
+	return rel
+
+
+# Line diffs for the Review "Changes" view (/diff_hunks): Myers' O(ND) algorithm, falling back
+# to difflib when the files differ in more than LINE_DIFF_MAX_EDITS lines (its trace is O(D^2)).
+LINE_DIFF_MAX_EDITS = max(1, int(os.environ.get("RBX_PARSE_LINE_DIFF_MAX_EDITS", "2000")))
+Opcode = tuple[str, int, int, int, int]
+
+
+def _myers_edit_path(a: list[str], b: list[str], max_edits: int) -> Optional[list[tuple[int, int]]]:
+	"""(x, y) points of a shortest edit path from (0, 0) to (len(a), len(b)), or None past `max_edits`."""
+	n, m = len(a), len(b)
+	offset = max_edits + 1
+	v = [0] * (2 * max_edits + 3)
+	trace: list[list[int]] = []
+	for d in range(max_edits + 1):
+		# v[k] for k in [-d-1, d+1] before this round, stored from index 0.
+		trace.append(v[offset - d - 1 : offset + d + 2])
+		for k in range(-d, d + 1, 2):
+			if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+				x = v[offset + k + 1]
+			else:
+				x = v[offset + k - 1] + 1
+			y = x - k
+			while x < n and y < m and a[x] == b[y]:
+				x += 1
+				y += 1
+			v[offset + k] = x
+			if x >= n and y >= m:
+				return _myers_backtrack(trace, n, m)
+	return None
+
+
+def _myers_backtrack(trace: list[list[int]], n: int, m: int) -> list[tuple[int, int]]:
+	points = [(n, m)]
+	x, y = n, m
+	for d in range(len(trace) - 1, -1, -1):
+		v = trace[d]
+		k = x - y
+		if k == -d or (k != d and v[k - 1 + d + 1] < v[k + 1 + d + 1]):
+			prev_k = k + 1
+		else:
+			prev_k = k - 1
+		prev_x = v[prev_k + d + 1] if d > 0 else 0
+		prev_y = prev_x - prev_k if d > 0 else 0
+		while x > prev_x and y > prev_y:
+			x -= 1
+			y -= 1
+			points.append((x, y))
+		if d > 0:
+			x, y = prev_x, prev_y
+			points.append((x, y))
+	points.reverse()
+	return points
+
+
+def line_diff_opcodes(a: list[str], b: list[str]) -> list[Opcode]:
+	"""difflib-style opcodes ("equal", "delete", "insert", "replace") turning `a` into `b`."""
+	start = 0
+	while start < len(a) and start < len(b) and a[start] == b[start]:
+		start += 1
+	end_a, end_b = len(a), len(b)
+	while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+		end_a -= 1
+		end_b -= 1
+
+	path = _myers_edit_path(a[start:end_a], b[start:end_b], LINE_DIFF_MAX_EDITS)
+	if path is None:
+		middle = difflib.SequenceMatcher(None, a[start:end_a], b[start:end_b], autojunk=False).get_opcodes()
+	else:
+		middle = []
+		for (x0, y0), (x1, y1) in zip(path, path[1:]):
+			tag = "equal" if x1 - x0 == y1 - y0 == 1 else ("delete" if y1 == y0 else "insert")
+			if middle and (middle[-1][0] == tag or (tag != "equal" and middle[-1][0] != "equal")):
+				prev_tag, i1, _i2, j1, _j2 = middle[-1]
+				if prev_tag != tag:
+					tag = "replace"
+				middle[-1] = (tag, i1, x1, j1, y1)
+			else:
+				middle.append((tag, x0, x1, y0, y1))
+
+	opcodes: list[Opcode] = []
+	if start:
+		opcodes.append(("equal", 0, start, 0, start))
+	opcodes.extend((tag, i1 + start, i2 + start, j1 + start, j2 + start) for tag, i1, i2, j1, j2 in middle)
+	if end_a < len(a):
+		opcodes.append(("equal", end_a, len(a), end_b, len(b)))
+	return opcodes
+
+
+def unified_hunks(a: list[str], b: list[str], context: int = 3) -> list[dict]:
+	"""
+	Unified-diff hunks turning `a` into `b`: `oldStart`/`oldLines`/`newStart`/`newLines`
+	(1-based, as in `@@ -s,l +s,l @@`) and `lines` prefixed with " ", "-" or "+".
+	"""
+	groups: list[list[Opcode]] = []
+	group: list[Opcode] = []
+	for tag, i1, i2, j1, j2 in line_diff_opcodes(a, b):
+		if tag != "equal":
+			group.append((tag, i1, i2, j1, j2))
+			continue
+		if group:
+			# Trailing context for the open hunk; a long run of equal lines closes it.
+			if i2 - i1 > 2 * context:
+				group.append((tag, i1, i1 + context, j1, j1 + context))
+				groups.append(group)
+				group = []
+			else:
+				group.append((tag, i1, i2, j1, j2))
+				continue
+		# Leading context for the next hunk.
+		lead = min(context, i2 - i1)
+		group = [(tag, i2 - lead, i2, j2 - lead, j2)] if lead else []
+	if any(op[0] != "equal" for op in group):
+		tag, i1, i2, j1, j2 = group[-1]
+		if tag == "equal" and i2 - i1 > context:
+			group[-1] = (tag, i1, i1 + context, j1, j1 + context)
+		groups.append(group)
+
+	hunks: list[dict] = []
+	for group in groups:
+		lines: list[str] = []
+		for tag, i1, i2, j1, j2 in group:
+			if tag == "equal":
+				lines.extend(" " + line for line in a[i1:i2])
+				continue
+			lines.extend("-" + line for line in a[i1:i2])
+			lines.extend("+" + line for line in b[j1:j2])
+		old_start, old_end = group[0][1], group[-1][2]
+		new_start, new_end = group[0][3], group[-1][4]
+		hunks.append(
+			{
+				"oldStart": old_start + 1 if old_end > old_start else old_start,
+				"oldLines": old_end - old_start,
+				"newStart": new_start + 1 if new_end > new_start else new_start,
+				"newLines": new_end - new_start,
+				"lines": lines,
+			}
+		)
+	return hunks
+
+
+def _pretty_instance_json(tree) -> str:
+	return json.dumps(tree, ensure_ascii=False, sort_keys=True, indent=2) + "\n"
+
+
+@app.post("/diff_hunks")
+def diff_hunks():
+	"""
+	Line diff of one file against its Studio counterpart, as unified hunks (Studio is the
+	old side). Scripts send `studioSource`; instances send `kind: "instance"` and
+	`studioTree`, and both trees are compared as canonical pretty JSON with the local
+	tree merged over Studio's, as in /diff_instances. Hunks past `maxBytes` are dropped
+	and `truncated` is set.
+	"""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	kind = "instance" if data.get("kind") == "instance" else "script"
+	rel = requested_rel_path(output_dir, data, kind)
+	if kind == "instance":
+		body, status = read_local_instance(output_dir, rel)
+		if status != 200:
+			return jsonify(body), status
+		canon_studio = canonicalize_instance_tree(data.get("studioTree") or {})
+		old_text = _pretty_instance_json(canon_studio)
+		new_text = _pretty_instance_json(merge_instance_tree(canon_studio, body["tree"]))
+	else:
+		body, status = read_local_source(output_dir, rel)
+		if status != 200:
+			return jsonify(body), status
+		old_text = str(data.get("studioSource") or "").replace("\r\n", "\n")
+		new_text = body["source"]
+
+	context = data.get("context")
+	if not isinstance(context, int) or isinstance(context, bool) or context < 0:
+		context = 3
+	context = min(context, 50)
+	max_bytes = data.get("maxBytes")
+	if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes <= 0:
+		max_bytes = 900 * 1024
+	page = ResponsePage(min(max_bytes, 900 * 1024))
+
+	old_lines = old_text.split("\n")
+	new_lines = new_text.split("\n")
+	hunks: list[dict] = []
+	truncated = False
+	for hunk in unified_hunks(old_lines, new_lines, context):
+		if not page.admit(hunk):
+			truncated = True
+			break
+		hunks.append(hunk)
+
+	return jsonify(
+		{
+			"ok": True,
+			"relPath": body["relPath"],
+			"oldLineCount": len(old_lines),
+			"newLineCount": len(new_lines),
+			"hunks": hunks,
+			"truncated": truncated,
+		}
+	)
+
+
+@app.post("/local_get")
+def local_get():
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	body, status = read_local_source(output_dir, requested_rel_path(output_dir, data, "script"))
+	return jsonify(body), status
+
+
+@app.post("/local_get_instances")
+def local_get_instances():
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	body, status = read_local_instance(output_dir, requested_rel_path(output_dir, data, "instance"))
+	return jsonify(body), status
+
+
+@app.post("/local_get_range")
+def local_get_range():
+	"""
+	Fetch a file too large for /local_get(_instances) in pieces: `offset` (from the previous
+	piece's `next`), `maxBytes` (≤ 900KB) and the first piece's `sha256`. Scripts or instances
+	(`kind: "instance"` when addressing by `path` + `class`); see `read_local_range`.
+	"""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	offset = data.get("offset") or 0
+	if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+		return jsonify({"ok": False, "error": "Invalid offset"}), 400
+	max_bytes = data.get("maxBytes")
+	if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes <= 0:
+		max_bytes = 900 * 1024
+	max_bytes = min(max_bytes, 900 * 1024)
+	expected_sha = data.get("sha256")
+	if not isinstance(expected_sha, str):
+		expected_sha = None
+
+	output_dir = resolve_output_dir(data)
+	kind = "instance" if data.get("kind") == "instance" else "script"
+	rel = requested_rel_path(output_dir, data, kind)
+	body, status = read_local_range(output_dir, rel, offset, max_bytes, expected_sha)
+	return jsonify(body), status
+
+
+@app.post("/local_get_many")
+def local_get_many():
+	"""
+	Batch version of /local_get + /local_get_instances.
+
+	Returns files from `relPaths[cursor:]` until the encoded response would exceed
+	`maxBytes`, plus `nextCursor` (null when done). `.lua` files come back with
+	`source`, anything else as an instance with `tree`/`pretty`. Per-file failures
+	are reported inline with `ok: false` instead of failing the whole batch.
+	"""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	output_dir = resolve_output_dir(data)
+	rel_paths = data.get("relPaths")
+	if not isinstance(rel_paths, list):
+		return jsonify({"ok": False, "error": "relPaths must be a list"}), 400
+
+	cursor = data.get("cursor") or 0
+	if not isinstance(cursor, int) or isinstance(cursor, bool) or cursor < 0:
+		return jsonify({"ok": False, "error": "Invalid cursor"}), 400
+
+	max_bytes = data.get("maxBytes")
+	if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes <= 0:
+		max_bytes = 900 * 1024
+	max_bytes = min(max_bytes, 900 * 1024)
+
+	files: list[dict] = []
+	used = 256  # envelope
+	i = cursor
+	while i < len(rel_paths):
+		rel = rel_paths[i]
+		if isinstance(rel, str) and rel.lower().endswith(".lua"):
+			body, _status = read_local_source(output_dir, rel)
+		else:
+			body, _status = read_local_instance(output_dir, rel)
+		body["relPath"] = rel
+		size = len(json.dumps(body)) + 1
+		if 256 + size > max_bytes:
+			# Escaped text (non-ASCII, quotes) can outgrow any page; hand it to /local_get_range.
+			body = {"ok": False, "error": "File too large for one response", "ranged": True, "relPath": rel}
+			size = len(json.dumps(body)) + 1
+		# Always return at least one file so a single large file can't stall the cursor.
+		if files and used + size > max_bytes:
+			break
+		files.append(body)
+		used += size
+		i += 1
+
+	return jsonify(
+		{
+			"ok": True,
+			"output": str(output_dir),
+			"files": files,
+			"nextCursor": i if i < len(rel_paths) else None,
+		}
+	)
+
+
+def _dependency_query(data: dict) -> tuple[Optional[DependencyIndex], Optional[str], Optional[tuple[dict, int]]]:
+	"""(index, script relPath, None) for /dependencies and /dependents, or (None, None, (error body, status))."""
+	output_dir = resolve_output_dir(data)
+	rel = requested_rel_path(output_dir, data, "script")
+	if not isinstance(rel, str) or not rel.strip():
+		return None, None, ({"ok": False, "error": "relPath required"}, 400)
+	index = get_dependency_index(output_dir)
+	if rel not in index.files:
+		return None, None, ({"ok": False, "error": "Script not in the manifest"}, 404)
+	return index, rel, None
+
+
+@app.post("/dependencies")
+def dependencies():
+	"""
+	ModuleScripts a script requires (`relPath`, or `path` + `class`), with the require's line
+	and source text; `transitive: true` follows them down. Requires that can't be resolved
+	statically are listed under `unresolved`. `relPath` is null for a Studio path with no
+	exported script.
+	"""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	index, rel, error = _dependency_query(data)
+	if error is not None:
+		return jsonify(error[0]), error[1]
+	resolved, unresolved = index.dependencies(rel, data.get("transitive") is True)
+	return jsonify(
+		{"ok": True, "relPath": rel, "path": index.files[rel]["path"], "dependencies": resolved, "unresolved": unresolved}
+	)
+
+
+@app.post("/dependents")
+def dependents():
+	"""Scripts that require a ModuleScript (`relPath`, or `path` + `class`); `transitive: true` follows them up."""
+	data = request.get_json(force=True, silent=True)
+	if not isinstance(data, dict):
+		return jsonify({"ok": False, "error": "Invalid JSON"}), 400
+
+	index, rel, error = _dependency_query(data)
+	if error is not None:
+		return jsonify(error[0]), error[1]
+	found = index.dependents(rel, data.get("transitive") is True)
+	return jsonify({"ok": True, "relPath": rel, "path": index.files[rel]["path"], "dependents": found})
 
 
 if __name__ == "__main__":
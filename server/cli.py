@@ -0,0 +1,306 @@
+"""
+Headless checks over exported projects, using the server's code without running Flask.
+
+    python server/cli.py verify projects/*              # manifest vs files, canonical JSON, legacy duplicates
+    python server/cli.py reindex projects/Game          # re-record manifest hashes from the files on disk
+    python server/cli.py canonicalize --check projects/*
+    python server/cli.py diff projects/Game scripts.json instances.json
+
+A project is an output folder (with `.parser_manifest.json`); a folder without one stands
+for every project directly inside it. Work is spread over `--jobs` processes across all
+projects and files. Exit status: 0 clean, 1 drift found (or would be changed with
+`--check` / `--dry-run`), 2 bad arguments.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import app  # noqa: E402
+
+SCRIPT_EXTENSIONS = (".server.lua", ".local.lua", ".module.lua", ".lua")
+
+
+def find_projects(paths: list[str]) -> list[Path]:
+	projects: list[Path] = []
+	for raw in paths:
+		path = Path(raw).resolve()
+		if (path / app.MANIFEST_FILENAME).is_file():
+			projects.append(path)
+		elif path.is_dir():
+			projects.extend(
+				child for child in sorted(path.iterdir()) if (child / app.MANIFEST_FILENAME).is_file()
+			)
+	return projects
+
+
+def run_tasks(fn: Callable, tasks: list, jobs: int) -> list:
+	"""`[fn(task) for task in tasks]` on `jobs` processes, in order."""
+	if jobs <= 1 or len(tasks) < 2:
+		return [fn(task) for task in tasks]
+	chunksize = max(1, len(tasks) // (jobs * 4))
+	with ProcessPoolExecutor(max_workers=jobs) as pool:
+		return list(pool.map(fn, tasks, chunksize=chunksize))
+
+
+def issue(project: str, rel: str, problem: str, detail: str = "") -> dict:
+	out = {"project": project, "relPath": rel, "problem": problem}
+	if detail:
+		out["detail"] = detail
+	return out
+
+
+def read_local(path: Path) -> str:
+	# Same normalization the writers compare with.
+	return path.read_text(encoding="utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def text_hash(text: str, section: str, recorded: Optional[str]) -> str:
+	"""Hash of a local file's text in the scheme `recorded` was written with (see `_write_instance_file`)."""
+	if section == "scripts":
+		return app.sha256_text(text)
+	obj = json.loads(text)
+	if recorded is not None and not recorded.startswith(app.INSTANCE_HASH_PREFIX):
+		return app.sha256_text(json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")))
+	return app.instance_tree_hash(app.canonicalize_instance_tree(obj))
+
+
+def legacy_rel(rel: str) -> str:
+	"""Where an older exporter (`safe_name_legacy`) would have written the file at `rel`."""
+	parts = rel.split("/")
+	filename = parts[-1]
+	for ext in SCRIPT_EXTENSIONS:
+		if filename.lower().endswith(ext):
+			stem, suffix = filename[: -len(ext)], filename[-len(ext) :]
+			break
+	else:
+		stem, dot, class_name = filename.rpartition(".")
+		stem, suffix = (stem, dot + class_name) if dot else (filename, "")
+	dirs = [app.safe_name_legacy(seg) for seg in parts[1:-1]]
+	return "/".join([parts[0], *dirs, app.safe_name_legacy(stem) + suffix])
+
+
+def tracked_files(manifest: dict) -> list[tuple[str, str, str]]:
+	"""(section, rel, recorded hash) of every file the manifest records."""
+	out: list[tuple[str, str, str]] = []
+	for section in ("scripts", "instances"):
+		for rel, recorded in sorted(app._manifest_section(manifest, section).items()):
+			out.append((section, rel, recorded))
+	return out
+
+
+# verify
+
+
+def verify_file(task: tuple[str, str, str, str]) -> list[dict]:
+	project, section, rel, recorded = task
+	path = Path(project) / rel
+	if not path.is_file():
+		return [issue(project, rel, "missing")]
+	try:
+		text = read_local(path)
+		actual = text_hash(text, section, recorded)
+	except OSError as e:
+		return [issue(project, rel, "unreadable", str(e))]
+	except json.JSONDecodeError as e:
+		return [issue(project, rel, "invalid json", str(e))]
+
+	found: list[dict] = []
+	if actual != recorded:
+		found.append(issue(project, rel, "modified", "file does not match the manifest hash"))
+	if section == "instances" and app.render_instance_tree(json.loads(text))[0] != text:
+		found.append(issue(project, rel, "not canonical", "run `canonicalize` to rewrite it"))
+	return found
+
+
+def legacy_duplicates(project: Path, manifest: dict) -> list[dict]:
+	tracked = {rel for _section, rel, _hash in tracked_files(manifest)}
+	on_disk = {entry.rel for entry in app.LocalFileIndex(project).snapshot()}
+	found: list[dict] = []
+	for rel in sorted(tracked):
+		legacy = legacy_rel(rel)
+		if legacy != rel and legacy in on_disk and legacy not in tracked:
+			found.append(issue(str(project), legacy, "legacy duplicate", f"older name of {rel}"))
+	return found
+
+
+def cmd_verify(args, projects: list[Path]) -> list[dict]:
+	tasks: list[tuple[str, str, str, str]] = []
+	found: list[dict] = []
+	for project in projects:
+		manifest = app.load_manifest(project)
+		tasks.extend((str(project), section, rel, recorded) for section, rel, recorded in tracked_files(manifest))
+		found.extend(legacy_duplicates(project, manifest))
+	for file_issues in run_tasks(verify_file, tasks, args.jobs):
+		found.extend(file_issues)
+	return found
+
+
+# reindex
+
+
+def reindex_file(task: tuple[str, str, str, str]) -> tuple[str, str, Optional[str]]:
+	project, section, rel, recorded = task
+	path = Path(project) / rel
+	if not path.is_file():
+		return section, rel, None
+	try:
+		return section, rel, text_hash(read_local(path), section, None)
+	except (OSError, json.JSONDecodeError):
+		return section, rel, recorded
+
+
+def cmd_reindex(args, projects: list[Path]) -> list[dict]:
+	found: list[dict] = []
+	for project in projects:
+		tasks = [(str(project), *entry) for entry in tracked_files(app.load_manifest(project))]
+		results = run_tasks(reindex_file, tasks, args.jobs)
+		recorded = {(section, rel): value for _project, section, rel, value in tasks}
+		updates = [(section, rel, h) for section, rel, h in results if h != recorded[(section, rel)]]
+		for section, rel, h in updates:
+			found.append(issue(str(project), rel, "removed" if h is None else "rehashed"))
+		if not updates or args.dry_run:
+			continue
+		with app.manifest_transaction(project) as (manifest, _session):
+			for section, rel, h in updates:
+				entries = manifest.setdefault(section, {})
+				if h is None:
+					entries.pop(rel, None)
+					manifest.get("paths", {}).pop(rel, None)
+				else:
+					entries[rel] = h
+	return found
+
+
+# canonicalize
+
+
+def canonicalize_file(task: tuple[str, str, str, bool]) -> tuple[Optional[dict], Optional[str]]:
+	"""(finding, new manifest hash if the entry should follow the rewrite) for one instance file."""
+	project, rel, recorded, check = task
+	path = Path(project) / rel
+	if not path.is_file():
+		return None, None  # reported by `verify`
+	try:
+		text = read_local(path)
+		canonical, new_hash = app.render_instance_tree(json.loads(text))
+		# Only entries that matched the file before are kept matching (legacy hashes get upgraded).
+		matched = text_hash(text, "instances", recorded) == recorded
+	except OSError as e:
+		return issue(project, rel, "unreadable", str(e)), None
+	except json.JSONDecodeError as e:
+		return issue(project, rel, "invalid json", str(e)), None
+	if canonical == text:
+		return None, None
+	if not check:
+		path.write_text(canonical, encoding="utf-8")
+	return issue(project, rel, "not canonical" if check else "canonicalized"), new_hash if matched else None
+
+
+def cmd_canonicalize(args, projects: list[Path]) -> list[dict]:
+	found: list[dict] = []
+	for project in projects:
+		instances = app._manifest_section(app.load_manifest(project), "instances")
+		tasks = [(str(project), rel, recorded, args.check) for rel, recorded in sorted(instances.items())]
+		rehashed: list[tuple[str, str]] = []
+		for finding, new_hash in run_tasks(canonicalize_file, tasks, args.jobs):
+			if finding is not None:
+				found.append(finding)
+			if new_hash is not None and new_hash != instances.get(finding["relPath"]):
+				rehashed.append((finding["relPath"], new_hash))
+		if rehashed and not args.check:
+			with app.manifest_transaction(project) as (manifest, _session):
+				for rel, new_hash in rehashed:
+					manifest.setdefault("instances", {})[rel] = new_hash
+	return found
+
+
+# diff
+
+
+def cmd_diff(args, projects: list[Path]) -> list[dict]:
+	project = projects[0]
+	# Instance comparisons use the server's canonicalization pool.
+	app.CANON_WORKERS = args.jobs if args.jobs > 1 else 0
+	snapshot = app.LocalPathSnapshot(project)
+	path_map = app.get_path_map(project)
+	found: list[dict] = []
+	for payload_path in args.payloads:
+		payload = json.loads(Path(payload_path).read_text(encoding="utf-8"))
+		digest_mode = payload.get("mode") == "digest"
+		results: list[Optional[tuple[str, dict]]] = [
+			app.diff_script_item(snapshot, path_map, service, item, normalized, digest_mode, False)
+			for service, item, normalized in app.iter_records_from_payload(payload)
+		]
+		instances = payload.get("instances")
+		if isinstance(instances, list):
+			results.extend(app.diff_instance_items(snapshot, path_map, instances, False))
+		for result in results:
+			if result is None:
+				continue
+			bucket, entry = result
+			where = entry.get("relPath") or "/".join(entry.get("path") or [str(entry.get("name"))])
+			problem = {"changes": "changed", "missingLocal": "missing", "skippedLarge": "skipped"}[bucket]
+			found.append(issue(str(project), where, problem, entry.get("reason", "")))
+	return found
+
+
+COMMANDS = {
+	"verify": cmd_verify,
+	"reindex": cmd_reindex,
+	"canonicalize": cmd_canonicalize,
+	"diff": cmd_diff,
+}
+
+
+def main(argv=None) -> int:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (1 = in process)")
+	parser.add_argument("--json", action="store_true", help="print the findings as JSON")
+	sub = parser.add_subparsers(dest="command", required=True)
+
+	verify = sub.add_parser("verify", help="check manifest hashes, canonical instance JSON and legacy duplicates")
+	verify.add_argument("projects", nargs="+")
+	reindex = sub.add_parser("reindex", help="record the current files' hashes in the manifest")
+	reindex.add_argument("--dry-run", action="store_true")
+	reindex.add_argument("projects", nargs="+")
+	canonicalize = sub.add_parser("canonicalize", help="rewrite instance files in canonical form")
+	canonicalize.add_argument("--check", action="store_true", help="only report files that would change")
+	canonicalize.add_argument("projects", nargs="+")
+	diff = sub.add_parser("diff", help="compare saved /diff or /diff_instances payloads with a project")
+	diff.add_argument("project")
+	diff.add_argument("payloads", nargs="+")
+	args = parser.parse_args(argv)
+	args.jobs = max(1, args.jobs)
+	if args.command == "diff":
+		args.projects = [args.project]
+
+	projects = find_projects(args.projects)
+	if not projects:
+		print("No projects found (folders with " + app.MANIFEST_FILENAME + ")", file=sys.stderr)
+		return 2
+
+	found = COMMANDS[args.command](args, projects)
+	if args.json:
+		print(json.dumps({"command": args.command, "projects": [str(p) for p in projects], "findings": found}, indent=2))
+	else:
+		for entry in found:
+			detail = f" ({entry['detail']})" if entry.get("detail") else ""
+			print(f"{entry['project']}: {entry['relPath']}: {entry['problem']}{detail}")
+		print(f"{args.command}: {len(projects)} project(s), {len(found)} finding(s)")
+
+	# reindex/canonicalize findings are fixes; they only count as drift when nothing was written.
+	if args.command == "reindex" and not args.dry_run:
+		return 0
+	if args.command == "canonicalize" and not args.check:
+		return 0
+	return 1 if found else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+
+import app as server_app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+	return server_app.app.test_client()
@@ -0,0 +1,37 @@
+
+def _upload_and_change(client, out, count, size):
+	items = [
+		{"path": ["ServerScriptService", f"S{i}"], "name": f"S{i}", "class": "Script", "source": "a" * size}
+		for i in range(count)
+	]
+	client.post("/upload", json={"outputFolderName": out, "roots": [{"service": "ServerScriptService", "items": items}]})
+	studio = [dict(it, source="b") for it in items]
+	return {"outputFolderName": out, "roots": [{"service": "ServerScriptService", "items": studio}]}
+
+
+def test_follow_up_pages_send_only_the_cursor(client, tmp_path):
+	body = _upload_and_change(client, str(tmp_path), 50, 1000)
+	r = client.post("/diff", json=dict(body, cursor=0, maxBytes=8000)).get_json()
+	changes = list(r["changes"])
+	while r["nextCursor"] is not None:
+		r = client.post("/diff", json={"cursor": r["nextCursor"], "pageToken": r["pageToken"], "maxBytes": 8000}).get_json()
+		changes += r["changes"]
+	assert len({c["relPath"] for c in changes}) == 50
+	assert "pageToken" not in r
+
+
+def test_stale_page_token_is_gone(client, tmp_path):
+	body = _upload_and_change(client, str(tmp_path), 50, 1000)
+	r = client.post("/diff", json=dict(body, cursor=0, maxBytes=8000)).get_json()
+	assert client.post("/diff", json={"cursor": r["nextCursor"] + 1, "pageToken": r["pageToken"]}).status_code == 410
+	# The mismatched cursor dropped the state; re-posting the full body still works.
+	assert client.post("/diff", json={"cursor": r["nextCursor"], "pageToken": r["pageToken"]}).status_code == 410
+	assert client.post("/diff", json=dict(body, cursor=r["nextCursor"], maxBytes=8000)).get_json()["changes"]
+
+
+def test_oversized_entry_goes_out_without_content(client, tmp_path):
+	body = _upload_and_change(client, str(tmp_path), 1, 20000)
+	r = client.post("/diff", json=dict(body, cursor=0, maxBytes=4000)).get_json()
+	[entry] = r["changes"]
+	assert entry["large"] and "localSource" not in entry
+	assert r["nextCursor"] is None
@@ -0,0 +1,48 @@
+import json
+
+import app as A
+
+
+def _item(name, class_name, source):
+	return {"path": ["ServerScriptService", name], "name": name, "class": class_name, "source": source}
+
+
+def _roots(items):
+	return [{"service": "ServerScriptService", "items": items}]
+
+
+def test_session_export_uploads_only_changed_scripts(client, tmp_path):
+	out = str(tmp_path)
+	items = [_item("M", "ModuleScript", "return 1"), _item("S", "Script", "print(1)")]
+	r = client.post("/upload", json={"outputFolderName": out, "roots": _roots(items)})
+	assert r.get_json()["wrote"] == 2
+
+	items = [_item("M", "ModuleScript", "return 1"), _item("S", "Script", "print(2)")]
+	session_id = client.post("/export_begin", json={"outputFolderName": out}).get_json()["sessionId"]
+	plan_items = [
+		{"id": str(i), "path": it["path"], "name": it["name"], "class": it["class"], "digest": A.digest_text(it["source"])}
+		for i, it in enumerate(items)
+	]
+	plan = client.post(
+		"/upload_plan",
+		json={"outputFolderName": out, "sessionId": session_id, "mode": "digest", "roots": _roots(plan_items)},
+	).get_json()
+	assert plan["ok"] and plan["need"] == ["1"]
+
+	r = client.post("/upload", json={"outputFolderName": out, "sessionId": session_id, "roots": _roots([items[1]])})
+	assert r.get_json()["wrote"] == 1
+	commit = client.post("/export_commit", json={"outputFolderName": out, "sessionId": session_id}).get_json()
+	assert commit["ok"] and commit["wrote"] == 1 and commit["snapshot"]["files"] == 2
+
+	assert (tmp_path / "ServerScriptService" / "S.server.lua").read_text() == "print(2)"
+	assert (tmp_path / "ServerScriptService" / "M.module.lua").read_text() == "return 1"
+	manifest = json.loads((tmp_path / A.MANIFEST_FILENAME).read_text())
+	assert manifest["scripts"] == {
+		"ServerScriptService/M.module.lua": A.sha256_text("return 1"),
+		"ServerScriptService/S.server.lua": A.sha256_text("print(2)"),
+	}
+
+
+def test_commit_of_unknown_session_reports_expired(client):
+	r = client.post("/export_commit", json={"sessionId": "missing"}).get_json()
+	assert r["ok"] and r["expired"]
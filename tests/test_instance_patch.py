@@ -0,0 +1,79 @@
+import copy
+
+import app as A
+
+
+def _child(node, step):
+	class_name, name, occurrence = step
+	matches = [c for c in node.get("children", []) if c["class"] == class_name and c["name"] == name]
+	return matches[occurrence]
+
+
+def _resolve(root, path):
+	node = root
+	for step in path:
+		node = _child(node, step)
+	return node
+
+
+def _apply(studio_tree, patch):
+	# Resolve every step against the unpatched tree first: occurrences count Studio's siblings.
+	root = copy.deepcopy(studio_tree)
+	resolved = [(_resolve(root, op["path"]), op) for op in patch]
+	for node, op in resolved:
+		removed = [id(_child(node, step)) for step in op.get("removed", [])]
+		node.setdefault("props", {}).update(op.get("props", {}))
+		node.setdefault("attrs", {}).update(op.get("attrs", {}))
+		if "name" in op:
+			node["name"] = op["name"]
+		children = [c for c in node.get("children", []) if id(c) not in removed]
+		node["children"] = children + [dict(c) for c in op.get("added", [])]
+	return root
+
+
+def _same(a, b):
+	return A.canonicalize_instance_tree(a).content_hash == A.canonicalize_instance_tree(b).content_hash
+
+
+STUDIO = {
+	"class": "ScreenGui",
+	"name": "G",
+	"props": {"Enabled": True},
+	"children": [
+		{"class": "Frame", "name": "F", "props": {"Visible": True}},
+		{"class": "Frame", "name": "F", "props": {"Visible": True}},
+		{"class": "TextLabel", "name": "L"},
+	],
+}
+
+
+def test_identical_trees_have_no_ops():
+	assert A.instance_tree_patch(STUDIO, copy.deepcopy(STUDIO)) == []
+
+
+def test_ops_address_duplicate_siblings_by_occurrence():
+	local = copy.deepcopy(STUDIO)
+	local["children"][1]["props"]["Visible"] = False
+	local["children"][2] = {"class": "TextButton", "name": "B"}
+	patch = A.instance_tree_patch(STUDIO, local)
+	assert patch == [
+		{"path": [], "added": [{"class": "TextButton", "name": "B", "props": {}, "attrs": {}, "children": []}], "removed": [["TextLabel", "L", 0]]},
+		{"path": [["Frame", "F", 1]], "props": {"Visible": False}},
+	]
+	assert _same(_apply(STUDIO, patch), local)
+
+
+def test_rename_attrs_and_nested_children():
+	local = copy.deepcopy(STUDIO)
+	local["name"] = "G2"
+	local["attrs"] = {"Theme": "dark"}
+	local["children"][0]["children"] = [{"class": "UICorner", "name": "C"}]
+	patch = A.instance_tree_patch(STUDIO, local)
+	assert patch[0] == {"path": [], "attrs": {"Theme": "dark"}, "name": "G2"}
+	assert _same(_apply(STUDIO, patch), local)
+
+
+def test_reordered_duplicates_still_apply():
+	studio = {"class": "Folder", "name": "R", "children": [{"class": "Part", "name": "P", "props": {"Size": 2}}, {"class": "Part", "name": "P", "props": {"Size": 1}}]}
+	local = {"class": "Folder", "name": "R", "children": [{"class": "Part", "name": "P", "props": {"Size": 2}}, {"class": "Part", "name": "P", "props": {"Size": 3}}]}
+	assert _same(_apply(studio, A.instance_tree_patch(studio, local)), local)
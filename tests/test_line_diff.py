@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+import app as A
+
+
+def _apply(a, hunks):
+	out, pos = [], 0
+	for hunk in hunks:
+		start = hunk["oldStart"] - 1 if hunk["oldLines"] else hunk["oldStart"]
+		out += a[pos:start]
+		pos = start
+		for line in hunk["lines"]:
+			if line[0] in " -":
+				assert a[pos] == line[1:]
+				pos += 1
+			if line[0] in " +":
+				out.append(line[1:])
+	return out + a[pos:]
+
+
+def test_opcodes_cover_both_sides():
+	assert A.line_diff_opcodes(list("abc"), list("axc")) == [
+		("equal", 0, 1, 0, 1),
+		("replace", 1, 2, 1, 2),
+		("equal", 2, 3, 2, 3),
+	]
+	assert A.line_diff_opcodes(list("ab"), list("ab")) == [("equal", 0, 2, 0, 2)]
+	assert A.line_diff_opcodes([], list("ab")) == [("insert", 0, 0, 0, 2)]
+
+
+def test_single_change_hunk_has_context():
+	a = [f"l{i}" for i in range(20)]
+	b = [line for line in a if line != "l10"]
+	assert A.unified_hunks(a, b) == [
+		{"oldStart": 8, "oldLines": 7, "newStart": 8, "newLines": 6, "lines": [" l7", " l8", " l9", "-l10", " l11", " l12", " l13"]}
+	]
+
+
+def test_empty_sides_use_zero_start():
+	assert A.unified_hunks([], ["a"]) == [{"oldStart": 0, "oldLines": 0, "newStart": 1, "newLines": 1, "lines": ["+a"]}]
+	assert A.unified_hunks(["a"], []) == [{"oldStart": 1, "oldLines": 1, "newStart": 0, "newLines": 0, "lines": ["-a"]}]
+	assert A.unified_hunks(["a"], ["a"]) == []
+
+
+def test_distant_changes_make_separate_hunks():
+	a = [f"l{i}" for i in range(40)]
+	b = list(a)
+	b[2] = "x"
+	b[30] = "y"
+	hunks = A.unified_hunks(a, b, context=2)
+	assert [(h["oldStart"], h["oldLines"]) for h in hunks] == [(1, 5), (29, 5)]
+
+
+@pytest.mark.parametrize("max_edits", [2, 2000])
+def test_random_edits_round_trip(monkeypatch, max_edits):
+	# max_edits=2 forces the difflib fallback for most cases.
+	monkeypatch.setattr(A, "LINE_DIFF_MAX_EDITS", max_edits)
+	rng = random.Random(5)
+	for _ in range(200):
+		a = [rng.choice("abcdef") for _ in range(rng.randint(0, 40))]
+		b = list(a)
+		for _ in range(rng.randint(0, 8)):
+			i = rng.randint(0, len(b))
+			op = rng.random()
+			if op < 0.4 and i < len(b):
+				del b[i]
+			elif op < 0.8:
+				b.insert(i, rng.choice("abcxyz"))
+			elif i < len(b):
+				b[i] = "Q"
+		for context in (0, 1, 3):
+			assert _apply(a, A.unified_hunks(a, b, context)) == b
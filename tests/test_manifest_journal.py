@@ -0,0 +1,54 @@
+import json
+
+import app as A
+
+
+def _write_journal(output_dir, generation, records, tail=""):
+	lines = [json.dumps({"generation": generation})] + [json.dumps(r) for r in records]
+	(output_dir / A.MANIFEST_JOURNAL_FILENAME).write_text("\n".join(lines) + "\n" + tail, encoding="utf-8")
+
+
+def test_records_replay_into_the_new_state():
+	old = {"version": 1, "scripts": {"a": "1", "b": "2"}, "skipped": ["x"], "gone": True}
+	new = {"version": 1, "scripts": {"a": "1", "c": "3"}, "skipped": ["x", "y"], "instances": {"i": "h"}}
+	records = A._journal_records(old, new)
+	assert {"op": "del", "section": "scripts", "key": "b"} in records
+	assert {"op": "append", "section": "skipped", "value": "y"} in records
+	replayed = json.loads(json.dumps(old))
+	for record in records:
+		A._apply_journal_record(replayed, record)
+	assert replayed == new
+
+
+def test_replay_skips_torn_lines(tmp_path):
+	records = [
+		{"op": "set", "section": "scripts", "key": "a", "value": "1"},
+		{"op": "del", "section": "scripts", "key": "b"},
+	]
+	_write_journal(tmp_path, 0, records, tail='{"op":"set","section":"scripts","key":"torn","val')
+	manifest = {"scripts": {"b": "2"}}
+	A._replay_manifest_journal(tmp_path, manifest)
+	assert manifest == {"scripts": {"a": "1"}}
+
+
+def test_replay_ignores_a_journal_from_another_generation(tmp_path):
+	_write_journal(tmp_path, 1, [{"op": "set", "section": "scripts", "key": "a", "value": "1"}])
+	manifest = {"scripts": {}, "journalGeneration": 2}
+	A._replay_manifest_journal(tmp_path, manifest)
+	assert manifest["scripts"] == {}
+
+
+def test_journal_mode_save_and_load(tmp_path, monkeypatch):
+	monkeypatch.setattr(A, "MANIFEST_MODE", "journal")
+	manifest = A.load_manifest(tmp_path)
+	manifest["scripts"]["S.server.lua"] = "1"
+	A.save_manifest(tmp_path, manifest)
+	manifest = A.load_manifest(tmp_path)
+	manifest["scripts"]["T.server.lua"] = "2"
+	del manifest["scripts"]["S.server.lua"]
+	A.save_manifest(tmp_path, manifest)
+
+	assert not (tmp_path / A.MANIFEST_FILENAME).exists()
+	journal = (tmp_path / A.MANIFEST_JOURNAL_FILENAME).read_text(encoding="utf-8").splitlines()
+	assert {"op": "del", "section": "scripts", "key": "S.server.lua"} in [json.loads(line) for line in journal[1:]]
+	assert A.load_manifest(tmp_path)["scripts"] == {"T.server.lua": "2"}
@@ -0,0 +1,51 @@
+import app as A
+
+SOURCE = """
+local RS = game:GetService("ReplicatedStorage")
+local Shared = RS:WaitForChild("Shared")
+-- require(script.Commented)
+--[[ require(script.Block) ]]
+local s = "require(script.InString)"
+local A = require(script.Parent.A)
+local B = require(Shared.B)
+local C = require(game.ReplicatedStorage["Shared"]:WaitForChild("C", 5))
+local D = require(workspace.Lib.D)
+local E = require(script:FindFirstChild("E"))
+local F = require(12345)
+local G = require(script.Parent.Parent.Parent)
+Shared = nil
+local H = require(Shared.H)
+local I = require(RS.Shared.I) :: any
+x.require(script.Nope)
+local J = require(game:GetService("ServerScriptService").Mods.J)
+"""
+
+
+def test_scan_requires_resolves_studio_paths():
+	requires = A.scan_requires(SOURCE, ["ServerScriptService", "Main"])
+	assert [r["path"] for r in requires] == [
+		["ServerScriptService", "A"],
+		["ReplicatedStorage", "Shared", "B"],
+		["ReplicatedStorage", "Shared", "C"],
+		["Workspace", "Lib", "D"],
+		["ServerScriptService", "Main", "E"],
+		None,
+		None,
+		None,
+		["ReplicatedStorage", "Shared", "I"],
+		["ServerScriptService", "Mods", "J"],
+	]
+	assert requires[0]["line"] == 7
+	assert requires[5]["expr"] == "12345"
+	# `Shared` was reassigned, so the alias no longer holds.
+	assert requires[7]["expr"] == "Shared.H"
+
+
+def test_scan_requires_without_calls():
+	assert A.scan_requires("return {}", ["ReplicatedStorage", "M"]) == []
+	assert A.scan_requires("-- require(script.X)\nreturn 1", ["ReplicatedStorage", "M"]) == []
+
+
+def test_script_studio_path():
+	assert A.script_studio_path("ServerScriptService/Main/Main.server.lua") == ["ServerScriptService", "Main"]
+	assert A.script_studio_path("ReplicatedStorage/Shared/B.module.lua") == ["ReplicatedStorage", "Shared", "B"]